@@ -0,0 +1,77 @@
+# Python Version: 3.x
+"""
+the module to provide asyncio interfaces for the synchronous implementations
+
+This is a thread-offload wrapper, not non-blocking I/O. The synchronous methods (and their blocking requests) run on a thread pool shared by the whole process, so each in-flight request occupies a worker thread.
+The pool has a fixed number of workers (:py:data:`default_max_workers` by default), and it also bounds the number of concurrent requests. Use :py:func:`set_max_workers` to change it.
+Since the same :py:class:`requests.Session` object is used, cookies are shared with the synchronous interfaces.
+:py:mod:`asyncio` is imported only in the coroutines, since it is slow to import and users of the synchronous interfaces don't need it.
+"""
+
+import concurrent.futures
+import functools
+import threading
+from typing import *
+
+T = TypeVar('T')
+
+default_max_workers = 16
+
+_MAX_WORKERS = default_max_workers
+_EXECUTOR = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix='onlinejudge')
+        return _EXECUTOR
+
+
+def get_max_workers() -> int:
+    return _MAX_WORKERS
+
+
+def set_max_workers(max_workers: int) -> None:
+    """set_max_workers() sets the number of worker threads, i.e. the upper bound of the number of concurrent calls of asynchronous methods.
+
+    Calls which are already running continue on the old pool.
+    """
+
+    global _MAX_WORKERS, _EXECUTOR
+    assert max_workers >= 1
+    with _EXECUTOR_LOCK:
+        _MAX_WORKERS = max_workers
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+async def run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    import asyncio  # already imported by the running event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def iterate(func: Callable[..., Iterator[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+    """iterate() converts a synchronous iterator to an asynchronous one. Each item is computed on the thread pool, and so is closing the iterator.
+    """
+
+    import asyncio  # already imported by the running event loop
+    loop = asyncio.get_event_loop()
+    executor = get_executor()
+    sentinel = object()
+    iterator = await loop.run_in_executor(executor, lambda: iter(func(*args, **kwargs)))
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, next, iterator, sentinel)
+            if item is sentinel:
+                break
+            yield item  # type: ignore
+    finally:
+        # close() may block, e.g. it runs `finally` clauses of generators which shut down thread pools
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await loop.run_in_executor(executor, close)
@@ -0,0 +1,165 @@
+# Python Version: 3.x
+"""
+the module to record HTTP interactions into cassette files and replay them
+
+A cassette is a gzip-compressed JSON-lines file. Each line is an interaction, which consists of a request (the method, the URL and the SHA-256 of the body) and its response (the status, headers and body).
+Adapters in this module are mounted to :py:class:`requests.Session`, so they work with all code which uses the session, including redirects.
+"""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import pathlib
+import threading
+import time
+from logging import getLogger
+from typing import *
+
+import requests
+import requests.adapters
+
+logger = getLogger(__name__)
+
+# the bodies in cassettes are already decoded
+_IGNORED_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+
+def _hash_body(body: Union[None, str, bytes, Any]) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode()
+    if not isinstance(body, bytes):
+        return None  # e.g. a file object; such bodies are not used for matching
+    return hashlib.sha256(body).hexdigest()
+
+
+def _get_key(request: requests.PreparedRequest) -> Tuple[str, str, Optional[str]]:
+    return (request.method or 'GET', request.url or '', _hash_body(request.body))
+
+
+class RecordingAdapter(requests.adapters.HTTPAdapter):
+    """RecordingAdapter sends requests to the network as usual, and appends the interactions to the cassette.
+    """
+    def __init__(self, path: pathlib.Path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:  # type: ignore
+        start = time.perf_counter()
+        resp = super().send(request, **kwargs)
+        body = resp.content  # this consumes the stream, but the content is still available for the caller
+        elapsed = time.perf_counter() - start
+        method, url, body_hash = _get_key(request)
+        interaction = {
+            'request': {
+                'method': method,
+                'url': url,
+                'body_sha256': body_hash,
+            },
+            'response': {
+                'status': resp.status_code,
+                'reason': resp.reason,
+                'headers': [[name, value] for name, value in resp.headers.items() if name.lower() not in _IGNORED_HEADERS],
+                'body': base64.b64encode(body).decode(),
+            },
+            'elapsed': elapsed,
+        }
+        line = (json.dumps(interaction) + '\n').encode()
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(str(self.path), 'ab') as fh:  # gzip allows concatenated members
+                fh.write(line)
+        logger.debug('cassette: recorded: %s %s', method, url)
+        return resp
+
+
+def load_interactions(path: pathlib.Path) -> List[Dict[str, Any]]:
+    with gzip.open(str(path), 'rb') as fh:
+        return [json.loads(line) for line in fh.read().decode().splitlines() if line.strip()]
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """ReplayAdapter answers requests with the recorded responses without network access.
+
+    When the same request is recorded more than once, the responses are replayed in the recorded order and the last one is repeated.
+
+    :ivar latency: the simulated latency for each response in seconds. If `None`, the recorded durations are used.
+    """
+    def __init__(self, path: pathlib.Path, *, latency: Optional[float] = 0.0):
+        super().__init__()
+        self.path = path
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions = {}  # type: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]]
+        self._counts = {}  # type: Dict[Tuple[str, str, Optional[str]], int]
+        for interaction in load_interactions(path):
+            request = interaction['request']
+            key = (request['method'], request['url'], request['body_sha256'])
+            self._interactions.setdefault(key, []).append(interaction)
+
+    def _find(self, request: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        key = _get_key(request)
+        if key not in self._interactions:
+            # bodies of POST requests often contain volatile values like CSRF tokens
+            candidates = [k for k in self._interactions if k[:2] == key[:2]]
+            if not candidates:
+                return None
+            key = candidates[0]
+        with self._lock:
+            index = self._counts.get(key, 0)
+            self._counts[key] = index + 1
+        interactions = self._interactions[key]
+        return interactions[min(index, len(interactions) - 1)]
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, timeout: Any = None, verify: Any = True, cert: Any = None, proxies: Any = None) -> requests.Response:
+        interaction = self._find(request)
+        if interaction is None:
+            raise requests.exceptions.ConnectionError('cassette: no recorded response for {} {}'.format(request.method, request.url), request=request)
+        logger.debug('cassette: replayed: %s %s', request.method, request.url)
+        latency = interaction.get('elapsed', 0.0) if self.latency is None else self.latency
+        if latency:
+            time.sleep(latency)
+
+        body = base64.b64decode(interaction['response']['body'])
+        resp = requests.Response()
+        resp.status_code = interaction['response']['status']
+        resp.reason = interaction['response']['reason']
+        resp.headers = requests.structures.CaseInsensitiveDict(interaction['response']['headers'])
+        resp.headers['Content-Length'] = str(len(body))
+        resp.raw = io.BytesIO(body)
+        resp.url = request.url or ''
+        resp.request = request
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.connection = self
+        if not stream:
+            resp.content  # pylint: disable=pointless-statement
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+def install(session: requests.Session, *, record: Optional[pathlib.Path] = None, replay: Optional[pathlib.Path] = None, latency: Optional[float] = 0.0) -> requests.Session:
+    """install() mounts an adapter to record or replay to the session.
+
+    :param record: the path of the cassette to append interactions
+    :param replay: the path of the cassette to replay
+    :param latency: the simulated latency for replaying. If `None`, the recorded durations are used.
+    """
+
+    assert record is None or replay is None
+    adapter = None  # type: Optional[requests.adapters.BaseAdapter]
+    if record is not None:
+        logger.info('record HTTP interactions to: %s', record)
+        adapter = RecordingAdapter(record)
+    elif replay is not None:
+        logger.info('replay HTTP interactions from: %s', replay)
+        adapter = ReplayAdapter(replay, latency=latency)
+    if adapter is not None:
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
@@ -0,0 +1,211 @@
+# Python Version: 3.x
+"""
+the module for resumable downloads of large files like archives of system test cases
+
+A download is spooled to a partial file under :py:data:`default_spool_dir`. When the transfer is interrupted, the download resumes with a `Range` request, guarded by `If-Range` so that the file is restarted from the beginning if it has changed on the server.
+Partial files are keyed by the URL and the login state of the session, and locked while they are in use, so concurrent downloads of the same file (in threads or processes) don't write into the same file at the same time.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import re
+from logging import getLogger
+from typing import *
+
+import requests
+
+import onlinejudge._implementation.file_lock as file_lock
+import onlinejudge._implementation.http_cache as http_cache
+import onlinejudge._implementation.utils as utils
+from onlinejudge.utils import user_cache_dir
+
+logger = getLogger(__name__)
+
+default_spool_dir = user_cache_dir / 'downloads'
+default_max_resumes = 5
+default_chunk_size = 64 * 1024
+
+
+class DownloadError(requests.exceptions.RequestException):
+    """DownloadError means the downloaded file is broken, e.g. its length is different from the declared one.
+    """
+
+
+def _parse_content_range(value: Optional[str]) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    :return: the first position and the total length (or `None` if unknown) of a header like `bytes 100-199/200`
+    """
+
+    if value is None:
+        return None
+    m = re.fullmatch(r'bytes\s+(\d+)-\d+/(\d+|\*)', value.strip())
+    if not m:
+        return None
+    return int(m.group(1)), (None if m.group(2) == '*' else int(m.group(2)))
+
+
+def _get_session_identity(url: str, *, session: requests.Session) -> str:
+    """
+    :return: the string which identifies the login state of the session for the URL. Files may be different for users.
+    """
+
+    cookie = session.prepare_request(requests.Request('GET', url)).headers.get('Cookie')
+    return http_cache.get_login_state(url, cookie=cookie) or ''
+
+
+class _Spool:
+    def __init__(self, url: str, *, identity: str, directory: pathlib.Path):
+        name = hashlib.sha256(json.dumps([url, identity]).encode()).hexdigest()
+        self.url = url
+        self.path = directory / (name + '.part')
+        self.meta_path = directory / (name + '.json')
+        self.lock_path = directory / (name + '.lock')
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """lock() takes the exclusive lock of the spool among threads and processes.
+        """
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            with open(str(self.lock_path), 'a') as fh:
+                with file_lock.lock_file(fh):
+                    try:
+                        is_current = os.path.samestat(os.fstat(fh.fileno()), os.stat(str(self.lock_path)))
+                    except FileNotFoundError:
+                        is_current = False
+                    if is_current:
+                        yield
+                        return
+            # the previous owner has removed the lock file after completing the download, so lock a new one
+
+    def remove_lock(self) -> None:
+        """remove_lock() removes the lock file. This must be called while the lock is taken.
+        """
+
+        try:
+            self.lock_path.unlink()
+        except OSError:  # e.g. opened files cannot be removed on Windows
+            pass
+
+    def load_meta(self) -> Dict[str, Any]:
+        try:
+            with open(str(self.meta_path)) as fh:
+                meta = json.load(fh)
+            if meta.get('url') == self.url and self.path.exists():
+                return meta
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def save_meta(self, meta: Dict[str, Any]) -> None:
+        self.meta_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(self.meta_path), 'w') as fh:
+            json.dump({'url': self.url, **meta}, fh)
+
+    def get_size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def remove(self) -> None:
+        for path in (self.path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def download(url: str, *, session: requests.Session, spool_dir: pathlib.Path = default_spool_dir, max_resumes: int = default_max_resumes, chunk_size: int = default_chunk_size) -> bytes:
+    """download() downloads a file, resuming the transfer when it is interrupted.
+
+    Partial files are kept after failures, so the next call for the same URL with the same login state also resumes.
+    While a file is being downloaded, other calls for the same file wait for it.
+
+    :param max_resumes: the maximum number of resumes in this call. Retries of requests themselves are done by :py:func:`onlinejudge._implementation.utils.request`.
+    :raises requests.exceptions.HTTPError: if the server responds with an error
+    :raises DownloadError: if the length of the file is different from the one the server declares
+    """
+
+    spool = _Spool(url, identity=_get_session_identity(url, session=session), directory=spool_dir)
+    with spool.lock():
+        resumes = 0
+        while True:
+            meta = spool.load_meta()
+            offset = spool.get_size() if meta else 0
+            validator = meta.get('etag') or meta.get('last_modified')
+            if meta.get('length') is not None and offset == meta['length']:
+                break  # completed in a previous call
+
+            # content codings make byte ranges meaningless, so request the identity
+            headers = {'Accept-Encoding': 'identity'}
+            if offset and validator:
+                logger.info('resume the download from %d bytes', offset)
+                headers['Range'] = 'bytes={}-'.format(offset)
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+            resp = utils.request('GET', url, session=session, raise_for_status=False, stream=True, headers=headers)
+            try:
+                if resp.status_code == 416:  # Range Not Satisfiable; the partial file is broken
+                    logger.warning('the partial file is not usable. restart the download')
+                    spool.remove()
+                    continue
+                resp.raise_for_status()
+
+                if resp.status_code == 206:
+                    content_range = _parse_content_range(resp.headers.get('Content-Range'))
+                    etag = resp.headers.get('ETag')
+                    if content_range is None or content_range[0] != offset or (etag is not None and meta.get('etag') is not None and etag != meta['etag']):
+                        logger.warning('the server returns an unexpected range. restart the download')
+                        spool.remove()
+                        continue
+                    if meta.get('length') is None and content_range[1] is not None:
+                        meta['length'] = content_range[1]
+                        spool.save_meta(meta)
+                    mode = 'ab'
+                else:
+                    # the server doesn't support ranges, or the file has changed
+                    meta = {'etag': None, 'last_modified': None, 'length': None}
+                    if resp.headers.get('Content-Encoding', 'identity') == 'identity':  # otherwise, offsets in the decoded file are different from byte ranges
+                        meta['etag'] = resp.headers.get('ETag')
+                        meta['last_modified'] = resp.headers.get('Last-Modified')
+                        if resp.headers.get('Content-Length', '').isdigit():
+                            meta['length'] = int(resp.headers['Content-Length'])
+                    spool.save_meta(meta)
+                    mode = 'wb'
+
+                with open(str(spool.path), mode) as fh:
+                    try:
+                        for chunk in resp.iter_content(chunk_size):
+                            fh.write(chunk)
+                    except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+                        if resumes >= max_resumes:
+                            logger.error('the download is interrupted too many times: %s', e)
+                            raise
+                        resumes += 1
+                        logger.warning('the download is interrupted at %d bytes (%d/%d): %s', fh.tell(), resumes, max_resumes, e)
+                        continue
+            finally:
+                resp.close()
+
+            if meta.get('length') is None:
+                break  # the length is unknown, so trust the end of the stream
+            size = spool.get_size()
+            if size == meta['length']:
+                break
+            if size > meta['length'] or resumes >= max_resumes:
+                spool.remove()
+                raise DownloadError('the length of the downloaded file is wrong: expected {} bytes, but got {} bytes'.format(meta['length'], size))
+            resumes += 1
+            logger.warning('the download is incomplete: %d / %d bytes (%d/%d)', size, meta['length'], resumes, max_resumes)
+
+        with open(str(spool.path), 'rb') as fh:
+            content = fh.read()
+        spool.remove()
+        spool.remove_lock()
+    return content
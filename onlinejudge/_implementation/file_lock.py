@@ -0,0 +1,47 @@
+# Python Version: 3.x
+"""
+the module for advisory file locks shared among threads and processes
+"""
+
+import contextlib
+from logging import getLogger
+from typing import *
+
+logger = getLogger(__name__)
+
+
+@contextlib.contextmanager
+def lock_file(fh: IO[Any]) -> Iterator[None]:
+    """lock_file() takes an exclusive lock of an opened file, waiting for other owners.
+
+    :note: If file locking is not available on the platform, this does nothing.
+    """
+
+    try:
+        import fcntl  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        fcntl = None  # type: ignore
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        return
+
+    try:
+        import msvcrt  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        msvcrt = None  # type: ignore
+    if msvcrt is not None:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+        try:
+            yield
+        finally:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
+        return
+
+    logger.debug('file locking is not available; %s is not locked', getattr(fh, 'name', fh))
+    yield
@@ -0,0 +1,383 @@
+# Python Version: 3.x
+"""
+the module for the persistent on-disk cache of HTTP responses
+
+The cache is a private cache in the sense of RFC 7234. It stores bodies and validators (`ETag` and `Last-Modified`) of responses for GET requests, serves fresh entries without network access, and revalidates stale entries with `If-None-Match` and `If-Modified-Since`.
+The cache is disabled by default. Use :py:func:`set_default_cache` to enable it.
+"""
+
+import email.utils
+import hashlib
+import http.client
+import json
+import os
+import pathlib
+import threading
+import time
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+import requests
+
+from onlinejudge.utils import user_cache_dir
+
+logger = getLogger(__name__)
+
+default_cache_dir = user_cache_dir / 'http'
+default_max_bytes = 256 * 1024 * 1024
+
+# these headers are meaningless for the stored bodies, since the bodies are already decoded by the requests library
+_IGNORED_HEADERS = ('Content-Encoding', 'Content-Length', 'Transfer-Encoding', 'Connection', 'Keep-Alive', 'Set-Cookie')
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    :return: a dict from directive names (in lowercase) to their arguments, e.g. `{"max-age": "60", "no-cache": None}` for `max-age=60, no-cache`
+    """
+
+    directives = {}  # type: Dict[str, Optional[str]]
+    for item in (value or '').split(','):
+        name, sep, arg = item.strip().partition('=')
+        if not name:
+            continue
+        directives[name.lower()] = arg.strip('"') if sep else None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed is None:
+        return None
+    return parsed.timestamp()
+
+
+def requires_revalidation(request_headers: Optional[Mapping[str, str]]) -> bool:
+    """requires_revalidation() checks `Cache-Control: no-cache` of a request. Stored responses are not used for such requests without revalidation, even if they are fresh.
+    """
+
+    value = None  # type: Optional[str]
+    for name, header_value in (request_headers or {}).items():
+        if name.lower() == 'cache-control':
+            value = header_value
+    return 'no-cache' in _parse_cache_control(value)
+
+
+def _parse_cookie_header(value: Optional[str]) -> Dict[str, str]:
+    cookies = {}  # type: Dict[str, str]
+    for item in (value or '').split(';'):
+        name, _, cookie_value = item.strip().partition('=')
+        if name:
+            cookies[name] = cookie_value
+    return cookies
+
+
+# functions to get the login states from the cookies of requests, for each hostname
+_login_state_functions = {}  # type: Dict[str, Callable[[Dict[str, str]], Optional[str]]]
+
+
+def register_login_state_function(hostname: str, func: Callable[[Dict[str, str]], Optional[str]]) -> None:
+    """register_login_state_function() registers a function to get the login state of requests to the host from their cookies.
+
+    Some online judges (e.g. AtCoder) renew their session cookies in every response, so the whole `Cookie` header of a request is never sent again.
+    Entries for such hosts are keyed with the login state (e.g. the name of the logged-in user) instead of the header.
+
+    :param func: takes the cookies of a request, and returns the login state. It returns `None` if it doesn't understand the cookies.
+    """
+
+    _login_state_functions[hostname] = func
+
+
+def get_login_state(url: str, *, cookie: Optional[str]) -> Optional[str]:
+    """
+    :param cookie: the value of the `Cookie` header of the request
+    :return: the login state of the request, i.e. the string which identifies responses for the request. This is the `Cookie` header itself for hosts without registered functions.
+    """
+
+    func = _login_state_functions.get(urllib.parse.urlsplit(url).hostname or '')
+    if func is not None and cookie:
+        state = func(_parse_cookie_header(cookie))
+        if state is not None:
+            return 'state:' + state
+    return cookie
+
+
+def _sets_new_cookies(resp: requests.Response) -> bool:
+    """_sets_new_cookies() checks whether the response sets cookies which the request didn't have, e.g. a CSRF token for a new session.
+
+    Renewals of cookies which the request already had (e.g. session cookies which are renewed in every response) don't count.
+    """
+
+    sent = _parse_cookie_header(resp.request.headers.get('Cookie') if resp.request is not None else None)
+    return any(cookie.name not in sent for cookie in resp.cookies)
+
+
+def _get_freshness_lifetime(headers: Mapping[str, str], *, now: float) -> Optional[float]:
+    """
+    :return: the number of seconds for which the response is fresh, or `None` if the response has no explicit freshness information
+    """
+
+    directives = _parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0.0
+    for name in ('s-maxage', 'max-age'):
+        if directives.get(name) is not None:
+            try:
+                max_age = float(directives[name] or '')
+            except ValueError:
+                return 0.0
+            try:
+                age = float(headers.get('Age', '0'))
+            except ValueError:
+                age = 0.0
+            return max(0.0, max_age - age)
+    expires = _parse_http_date(headers.get('Expires'))
+    if expires is not None:
+        date = _parse_http_date(headers.get('Date')) or now
+        return max(0.0, expires - date)
+    return None
+
+
+class CacheEntry:
+    """
+    :ivar url: the requested URL
+    :ivar final_url: the URL after redirects
+    :ivar status_code: :py:class:`int`
+    :ivar headers: :py:class:`Dict` [ :py:class:`str`, :py:class:`str` ]
+    :ivar stored_at: the UNIX time when the entry was stored or revalidated
+    :ivar expires_at: the UNIX time until when the entry is fresh
+    :ivar is_stateful: whether the response set new cookies. :py:attr:`HTTPCache.default_ttl` is not applied to such entries.
+    """
+    def __init__(self, *, key: str, url: str, final_url: str, status_code: int, headers: Dict[str, str], stored_at: float, expires_at: float, body_path: pathlib.Path, is_stateful: bool = False):
+        self.key = key
+        self.url = url
+        self.final_url = final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.body_path = body_path
+        self.is_stateful = is_stateful
+
+    def is_fresh(self, *, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.time()
+        return now < self.expires_at
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        headers = {}  # type: Dict[str, str]
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self, *, request: Optional[requests.PreparedRequest] = None) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = self.status_code
+        resp.reason = http.client.responses.get(self.status_code, '')
+        resp.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        resp.url = self.final_url
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp._content = self.body_path.read_bytes()  # pylint: disable=attribute-defined-outside-init
+        resp.request = request  # type: ignore
+        return resp
+
+    def _to_json(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'final_url': self.final_url,
+            'status_code': self.status_code,
+            'headers': self.headers,
+            'stored_at': self.stored_at,
+            'expires_at': self.expires_at,
+            'is_stateful': self.is_stateful,
+        }
+
+
+class HTTPCache:
+    """
+    :ivar directory: the directory to store entries. Each entry consists of two files `KEY.json` and `KEY.body`.
+    :ivar max_bytes: the upper bound of the total size of bodies. Least recently used entries are evicted when it is exceeded.
+    :ivar default_ttl: the number of seconds for which responses without explicit freshness information (i.e. without `Cache-Control: max-age` and `Expires`) are fresh. Most pages of online judges have no such information, so they are always revalidated when this is `0`. This is not applied to responses which set new cookies, e.g. login forms with CSRF tokens for new sessions, since they depend on the state of sessions. Renewals of cookies don't prevent this.
+    """
+    def __init__(self, directory: pathlib.Path = default_cache_dir, *, max_bytes: int = default_max_bytes, default_ttl: float = 0.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_key(cls, url: str, *, authorization: Optional[str], login_state: Optional[str], allow_redirects: bool) -> str:
+        # Responses for different credentials must not be mixed. Pages of online judges depend on the login state in cookies, and requests with `allow_redirects=False` get different responses.
+        return hashlib.sha256('\0'.join([url, authorization or '', login_state or '', str(allow_redirects)]).encode()).hexdigest()
+
+    def _get_default_ttl(self, *, is_stateful: bool) -> float:
+        return 0.0 if is_stateful else self.default_ttl
+
+    def _get_paths(self, key: str) -> Tuple[pathlib.Path, pathlib.Path]:
+        return (self.directory / (key + '.json'), self.directory / (key + '.body'))
+
+    def lookup(self, url: str, *, authorization: Optional[str] = None, login_state: Optional[str] = None, allow_redirects: bool = True) -> Optional[CacheEntry]:
+        """
+        :param authorization: the value of the `Authorization` header of the request
+        :param login_state: the login state of the request. See :py:func:`get_login_state`.
+        """
+
+        key = self._get_key(url, authorization=authorization, login_state=login_state, allow_redirects=allow_redirects)
+        meta_path, body_path = self._get_paths(key)
+        try:
+            with open(str(meta_path)) as fh:
+                meta = json.load(fh)
+            if not body_path.exists():
+                return None
+            os.utime(str(meta_path))  # for LRU
+        except (OSError, ValueError) as e:
+            logger.debug('failed to read the cache entry for %s: %s', url, e)
+            return None
+        return CacheEntry(
+            key=key,
+            url=meta['url'],
+            final_url=meta['final_url'],
+            status_code=meta['status_code'],
+            headers=meta['headers'],
+            stored_at=meta['stored_at'],
+            expires_at=meta['expires_at'],
+            body_path=body_path,
+            is_stateful=meta.get('is_stateful', False),
+        )
+
+    def store(self, url: str, resp: requests.Response, *, authorization: Optional[str] = None, login_state: Optional[str] = None, allow_redirects: bool = True) -> bool:
+        """
+        :return: `True` if the response is stored
+        """
+
+        if resp.status_code != 200:
+            return False
+        if resp.history:
+            return False  # a redirected response (e.g. to the login page) is not the response for the URL
+        directives = _parse_cache_control(resp.headers.get('Cache-Control'))
+        if 'no-store' in directives or resp.headers.get('Vary', '').strip() == '*':
+            return False
+        now = time.time()
+        lifetime = _get_freshness_lifetime(resp.headers, now=now)
+        is_stateful = _sets_new_cookies(resp)
+        has_validators = 'ETag' in resp.headers or 'Last-Modified' in resp.headers
+        if lifetime is None and not has_validators and (self.default_ttl <= 0 or is_stateful):
+            return False  # such an entry can be neither used as fresh nor revalidated
+        if len(resp.content) > self.max_bytes:
+            return False
+
+        key = self._get_key(url, authorization=authorization, login_state=login_state, allow_redirects=allow_redirects)
+        entry = CacheEntry(
+            key=key,
+            url=url,
+            final_url=resp.url,
+            status_code=resp.status_code,
+            headers={name: value
+                     for name, value in resp.headers.items() if name not in _IGNORED_HEADERS},
+            stored_at=now,
+            expires_at=now + (lifetime if lifetime is not None else self._get_default_ttl(is_stateful=is_stateful)),
+            body_path=self._get_paths(key)[1],
+            is_stateful=is_stateful,
+        )
+        self._write(entry, body=resp.content)
+        self._evict()
+        return True
+
+    def refresh(self, entry: CacheEntry, resp: requests.Response) -> requests.Response:
+        """refresh() updates the entry with a "304 Not Modified" response, and returns the cached response.
+        """
+
+        assert resp.status_code == 304
+        headers = dict(entry.headers)
+        for name, value in resp.headers.items():
+            if name not in _IGNORED_HEADERS:
+                headers[name] = value
+        now = time.time()
+        lifetime = _get_freshness_lifetime(requests.structures.CaseInsensitiveDict(headers), now=now)
+        entry.headers = headers
+        entry.stored_at = now
+        entry.is_stateful = entry.is_stateful or _sets_new_cookies(resp)
+        entry.expires_at = now + (lifetime if lifetime is not None else self._get_default_ttl(is_stateful=entry.is_stateful))
+        self._write(entry, body=None)
+        return entry.to_response(request=resp.request)
+
+    def invalidate(self, url: str, *, authorization: Optional[str] = None, login_state: Optional[str] = None, allow_redirects: bool = True) -> None:
+        for path in self._get_paths(self._get_key(url, authorization=authorization, login_state=login_state, allow_redirects=allow_redirects)):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._list_files():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _list_files(self) -> List[pathlib.Path]:
+        if not self.directory.exists():
+            return []
+        return [path for path in self.directory.iterdir() if path.suffix in ('.json', '.body')]
+
+    def _write(self, entry: CacheEntry, *, body: Optional[bytes]) -> None:
+        meta_path, body_path = self._get_paths(entry.key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        suffix = '.{}.{}.tmp'.format(os.getpid(), threading.get_ident())
+        if body is not None:
+            tmp_path = body_path.with_name(body_path.name + suffix)
+            tmp_path.write_bytes(body)
+            os.replace(str(tmp_path), str(body_path))
+        tmp_path = meta_path.with_name(meta_path.name + suffix)
+        with open(str(tmp_path), 'w') as fh:
+            json.dump(entry._to_json(), fh)
+        os.replace(str(tmp_path), str(meta_path))
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []  # type: List[Tuple[float, int, str]]
+            total = 0
+            for meta_path in self.directory.glob('*.json'):
+                body_path = meta_path.with_suffix('.body')
+                try:
+                    last_used = meta_path.stat().st_mtime
+                    size = body_path.stat().st_size
+                except OSError:
+                    continue
+                entries.append((last_used, size, meta_path.stem))
+                total += size
+            entries.sort()
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                logger.debug('evict the cache entry: %s', key)
+                for path in self._get_paths(key):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                total -= size
+
+
+_DEFAULT_CACHE = None  # type: Optional[HTTPCache]
+
+
+def get_default_cache() -> Optional[HTTPCache]:
+    """
+    :return: the cache used by :py:func:`onlinejudge._implementation.utils.request`, or `None` if the cache is disabled
+    """
+
+    return _DEFAULT_CACHE
+
+
+def set_default_cache(cache: Optional[HTTPCache]) -> None:
+    global _DEFAULT_CACHE
+    _DEFAULT_CACHE = cache
@@ -0,0 +1,142 @@
+# Python Version: 3.x
+"""
+the module for `oj-api --profile`
+
+A :py:class:`Profiler` runs :py:mod:`cProfile` and collects times of named phases recorded with :py:func:`phase`, and network times from :py:mod:`onlinejudge._implementation.telemetry`.
+:py:func:`phase` does nothing when no profiler is running.
+
+:note: :py:mod:`cProfile` profiles only the thread which starts the profiler. Phases and network times are recorded from all threads.
+"""
+
+import contextlib
+import cProfile
+import os
+import pathlib
+import pstats
+import threading
+import time
+from logging import getLogger
+from typing import *
+
+import onlinejudge._implementation.telemetry as telemetry
+
+logger = getLogger(__name__)
+
+# functions which parse responses. Their times are attributed to the functions in this package which call them.
+PARSER_FUNCTIONS = {
+    ('bs4', '__init__.py', '__init__'): 'html',  # bs4.BeautifulSoup
+    ('json', '__init__.py', 'loads'): 'json',
+    ('requests', 'models.py', 'json'): 'json',  # requests.Response.json
+    ('service', 'atcoder.py', '_get_soup'): 'html',  # memoizes bs4.BeautifulSoup
+}  # type: Dict[Tuple[str, str, str], str]
+
+_package_dir = str(pathlib.Path(__file__).resolve().parent.parent)  # the directory of the onlinejudge package
+
+
+class Profiler:
+    def __init__(self):
+        self.phases = {}  # type: Dict[str, Dict[str, Any]]
+        self.network = telemetry.AggregateSink()
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._started_perf = None  # type: Optional[float]
+        self._stopped_perf = None  # type: Optional[float]
+
+    def start(self) -> None:
+        global _current  # pylint: disable=global-statement
+        assert _current is None
+        _current = self
+        telemetry.add_sink(self.network)
+        self._started_perf = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        global _current  # pylint: disable=global-statement
+        self._profile.disable()
+        self._stopped_perf = time.perf_counter()
+        telemetry.remove_sink(self.network)
+        _current = None
+
+    def add_phase(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(name, {'count': 0, 'total_sec': 0.0})
+            entry['count'] += 1
+            entry['total_sec'] += elapsed
+
+    def dump_stats(self, path: pathlib.Path) -> None:
+        """dump_stats() writes the raw profile, which can be read with :py:mod:`pstats` or visualizers like snakeviz.
+        """
+
+        self._profile.dump_stats(str(path))
+
+    def _summarize_parsing(self) -> Dict[str, Dict[str, float]]:
+        stats = pstats.Stats(self._profile).stats  # type: ignore
+        result = {}  # type: Dict[str, Dict[str, float]]
+        for (filename, _, funcname), (_, _, _, _, callers) in stats.items():
+            kind = _get_parser_kind(filename, funcname)
+            if kind is None:
+                continue
+            for caller, (_, _, _, cumtime) in callers.items():
+                caller_filename, caller_lineno, caller_funcname = caller
+                if _get_parser_kind(caller_filename, caller_funcname) is not None:
+                    continue  # counted for the callers of the caller
+                caller_path = os.path.realpath(caller_filename)
+                if not caller_path.startswith(_package_dir + os.sep):
+                    continue  # e.g. json.loads() called by requests
+                name = '{}:{}({})'.format(pathlib.PurePath(os.path.relpath(caller_path, os.path.dirname(_package_dir))).as_posix(), caller_lineno, caller_funcname)
+                entry = result.setdefault(name, {})
+                entry[kind + '_sec'] = entry.get(kind + '_sec', 0.0) + cumtime
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        :return: a dict like `{"total_sec": 1.2, "phases": {"dispatch": {"count": 1, "total_sec": 0.01}, ...}, "network": {"atcoder.jp": ...}, "network_by_caller": {...}, "requests": [...], "parsing": {"onlinejudge/service/atcoder.py:123(download_data)": {"html_sec": 0.2}}}`. `network` and `network_by_caller` are summaries of :py:class:`onlinejudge._implementation.telemetry.AggregateSink`.
+        """
+
+        assert self._started_perf is not None
+        stopped_perf = self._stopped_perf if self._stopped_perf is not None else time.perf_counter()
+        with self._lock:
+            phases = {name: dict(entry) for name, entry in self.phases.items()}
+        return {
+            'total_sec': stopped_perf - self._started_perf,
+            'phases': phases,
+            'network': self.network.summary(),
+            'network_by_caller': self.network.summary(key=lambda record: record.caller or '(unknown)'),
+            'requests': [{
+                'method': record.method,
+                'url': record.url,
+                'status': record.status_code,
+                'cache': record.cache,
+                'total_sec': record.total_sec,
+                'caller': record.caller,
+            } for record in self.network.records],
+            'parsing': self._summarize_parsing(),
+        }
+
+
+def _get_parser_kind(filename: str, funcname: str) -> Optional[str]:
+    parts = pathlib.PurePath(filename).parts
+    return PARSER_FUNCTIONS.get((parts[-2] if len(parts) >= 2 else '', parts[-1] if parts else '', funcname))
+
+
+_current = None  # type: Optional[Profiler]
+
+
+def get_current_profiler() -> Optional[Profiler]:
+    return _current
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """phase() records the time of the block as the named phase of the running profiler.
+    """
+
+    profiler = _current
+    if profiler is None:
+        yield
+        return
+    started_perf = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_phase(name, time.perf_counter() - started_perf)
@@ -0,0 +1,141 @@
+# Python Version: 3.x
+"""
+the module for the per-host politeness scheduler
+
+Each host has its own token bucket. A bucket is shared among threads, and optionally among processes through a JSON file protected with a file lock.
+The scheduler is disabled by default. Use :py:func:`set_default_limiter` to enable it.
+"""
+
+import json
+import pathlib
+import threading
+import time
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+import onlinejudge._implementation.file_lock as file_lock
+from onlinejudge.utils import user_cache_dir
+
+logger = getLogger(__name__)
+
+default_lock_dir = user_cache_dir / 'rate-limit'
+
+
+class TokenBucket:
+    """
+    :ivar rate: the number of tokens added per second
+    :ivar burst: the capacity of the bucket
+    :ivar path: the path of the file to share the state among processes, or `None`
+    """
+    def __init__(self, *, rate: float, burst: float = 1.0, path: Optional[pathlib.Path] = None):
+        assert rate > 0
+        assert burst >= 1
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.time()
+
+    def _reserve(self, tokens: float, updated: float, *, now: float) -> Tuple[float, float, float]:
+        """
+        :return: the new state and the duration to wait. The token is consumed in advance, so the number of tokens may become negative while someone is waiting.
+        """
+
+        tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+        tokens -= 1
+        wait = max(0.0, -tokens / self.rate)
+        return tokens, now, wait
+
+    def _reserve_with_file(self, path: pathlib.Path, *, now: float) -> float:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(path), 'a+') as fh:
+            with file_lock.lock_file(fh):
+                fh.seek(0)
+                try:
+                    state = json.loads(fh.read() or '{}')
+                    tokens = float(state['tokens'])
+                    updated = float(state['updated'])
+                except (ValueError, KeyError, TypeError):
+                    tokens, updated = self.burst, now
+                tokens, updated, wait = self._reserve(tokens, updated, now=now)
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps({'tokens': tokens, 'updated': updated}))
+                fh.flush()
+        return wait
+
+    def acquire(self) -> float:
+        """acquire() takes a token, sleeping until it becomes available.
+
+        :return: the duration slept in seconds
+        """
+
+        with self._lock:
+            now = time.time()
+            if self.path is not None:
+                try:
+                    wait = self._reserve_with_file(self.path, now=now)
+                except OSError as e:
+                    logger.debug('failed to use the lock file %s: %s', self.path, e)
+                    self._tokens, self._updated, wait = self._reserve(self._tokens, self._updated, now=now)
+            else:
+                self._tokens, self._updated, wait = self._reserve(self._tokens, self._updated, now=now)
+        if wait > 0:
+            logger.info('sleep %f sec', wait)
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    :ivar interval: the default interval between requests to the same host in seconds
+    :ivar burst: the default number of requests which can be sent without waiting
+    :ivar shared: share the state among processes with files in `lock_dir`
+    """
+    def __init__(self, *, interval: float, burst: float = 1.0, shared: bool = False, lock_dir: pathlib.Path = default_lock_dir):
+        assert interval > 0
+        self.interval = interval
+        self.burst = burst
+        self.shared = shared
+        self.lock_dir = lock_dir
+        self._config = {}  # type: Dict[str, Tuple[float, float]]
+        self._buckets = {}  # type: Dict[str, TokenBucket]
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, *, interval: float, burst: float = 1.0) -> None:
+        """configure() overwrites the interval for a specific host, e.g. `codeforces.com`.
+        """
+
+        with self._lock:
+            self._config[host] = (interval, burst)
+            self._buckets.pop(host, None)
+
+    def get_bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                interval, burst = self._config.get(host, (self.interval, self.burst))
+                path = self.lock_dir / (host + '.json') if self.shared else None
+                self._buckets[host] = TokenBucket(rate=1.0 / interval, burst=burst, path=path)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        host = urllib.parse.urlparse(url).hostname or ''
+        return self.get_bucket(host).acquire()
+
+
+_DEFAULT_LIMITER = None  # type: Optional[RateLimiter]
+
+
+def get_default_limiter() -> Optional[RateLimiter]:
+    """
+    :return: the limiter used by :py:func:`onlinejudge._implementation.utils.request`, or `None` if requests are not throttled
+    """
+
+    return _DEFAULT_LIMITER
+
+
+def set_default_limiter(limiter: Optional[RateLimiter]) -> None:
+    global _DEFAULT_LIMITER
+    _DEFAULT_LIMITER = limiter
@@ -0,0 +1,126 @@
+# Python Version: 3.x
+"""
+the module for retrying idempotent requests with jittered exponential backoff
+
+:py:func:`onlinejudge._implementation.utils.request` uses the policy given as its argument, the policy set for the host with :py:func:`set_policy`, or :py:data:`default_policy`, in this order.
+"""
+
+import collections
+import email.utils
+import random
+import threading
+import time
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+import requests
+
+logger = getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[float] = None) -> Optional[float]:
+    """parse_retry_after() parses the value of `Retry-After` header, which is either a number of seconds or an HTTP-date.
+
+    :return: the number of seconds to wait, or `None` if the value is invalid
+    """
+
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    if now is None:
+        now = time.time()
+    return max(0.0, date.timestamp() - now)
+
+
+class RetryPolicy:
+    """
+    :ivar max_retries: the maximum number of retries for each request
+    :ivar backoff_factor: the base of the backoff. The n-th retry (0-based) waits about `backoff_factor * 2 ** n` seconds.
+    :ivar max_backoff: the upper bound of a backoff
+    :ivar total_budget: the upper bound of the total duration to wait for each request
+    :ivar status_forcelist: status codes to retry
+    :ivar methods: HTTP methods to retry. Only idempotent methods should be used.
+    """
+    def __init__(self, *, max_retries: int = 3, backoff_factor: float = 1.0, max_backoff: float = 60.0, total_budget: float = 120.0, status_forcelist: Iterable[int] = (429, 502, 503, 504), methods: Iterable[str] = ('GET', )):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.total_budget = total_budget
+        self.status_forcelist = tuple(status_forcelist)
+        self.methods = tuple(methods)
+
+    def get_backoff(self, attempt: int) -> float:
+        backoff = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)  # equal jitter
+
+    def get_wait(self, method: str, *, attempt: int, slept: float, response: Optional[requests.Response]) -> Optional[float]:
+        """get_wait() decides whether the request should be retried.
+
+        :param attempt: the number of retries already done
+        :param slept: the total duration already waited
+        :param response: the response, or `None` if the connection failed
+        :return: the duration to wait before the next try, or `None` to give up
+        """
+
+        if method not in self.methods or attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code not in self.status_forcelist:
+            return None
+        wait = self.get_backoff(attempt)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                wait = retry_after
+        if slept + wait > self.total_budget:
+            logger.warning('network: give up retrying: the retry budget %f sec is exhausted', self.total_budget)
+            return None
+        return wait
+
+
+no_retry = RetryPolicy(max_retries=0)
+default_policy = RetryPolicy()
+
+_policies = {}  # type: Dict[str, RetryPolicy]
+
+
+def set_policy(host: str, policy: RetryPolicy) -> None:
+    """set_policy() sets the policy for a host, e.g. `judgedat.u-aizu.ac.jp`.
+    """
+
+    _policies[host] = policy
+
+
+def get_policy(url: str) -> RetryPolicy:
+    host = urllib.parse.urlparse(url).hostname or ''
+    return _policies.get(host, default_policy)
+
+
+_statistics_lock = threading.Lock()
+_statistics = collections.defaultdict(collections.Counter)  # type: Dict[str, Counter[str]]
+
+
+def record(url: str, event: str) -> None:
+    """record() counts an event like `retry` or `give-up` for the host of the URL.
+    """
+
+    host = urllib.parse.urlparse(url).hostname or ''
+    with _statistics_lock:
+        _statistics[host][event] += 1
+
+
+def get_statistics() -> Dict[str, Dict[str, int]]:
+    """
+    :return: the counts of events per host, e.g. `{"atcoder.jp": {"retry": 2, "give-up": 0}}`
+    """
+
+    with _statistics_lock:
+        return {host: dict(counter) for host, counter in _statistics.items()}
@@ -0,0 +1,60 @@
+# Python Version: 3.x
+"""
+the module to coalesce identical concurrent calls
+
+While a call for a key is in flight, other calls for the same key wait for it and share its result, instead of doing the same work again.
+"""
+
+import copy
+import threading
+from typing import *
+
+T = TypeVar('T')
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, _Call]
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        :return: the result and whether the result is shared with another call
+        :raises: the exception raised by the call in flight. Waiters get copies of it.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                # give each waiter its own exception object, since raising the same object in many threads mixes up their tracebacks
+                try:
+                    error = copy.copy(call.error)
+                except Exception:  # pylint: disable=broad-except
+                    raise call.error
+                raise error from call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
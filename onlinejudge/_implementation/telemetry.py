@@ -0,0 +1,217 @@
+# Python Version: 3.x
+"""
+the module for per-request telemetry of :py:func:`onlinejudge._implementation.utils.request`
+
+Records are emitted to the sinks registered with :py:func:`add_sink`. Nothing is measured when no sinks are registered.
+
+:note: The `requests` package doesn't expose DNS, connect or TLS timings. `ttfb_sec` is the time until the response headers are parsed (i.e. it includes DNS, connect and TLS), and `transfer_sec` is the remaining time to read the body.
+"""
+
+import json
+import pathlib
+import sys
+import threading
+import time
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+logger = getLogger(__name__)
+
+RequestRecord = NamedTuple('RequestRecord', [
+    ('method', str),
+    ('url', str),
+    ('host', str),
+    ('status_code', Optional[int]),
+    ('started_at', float),
+    ('total_sec', float),
+    ('ttfb_sec', Optional[float]),
+    ('transfer_sec', Optional[float]),
+    ('request_bytes', int),
+    ('response_bytes', Optional[int]),
+    ('redirects', int),
+    ('cache', str),
+    ('retries', int),
+    ('caller', Optional[str]),
+    ('error', Optional[str]),
+])
+"""
+:ivar cache: one of `bypass` (the cache is disabled or unusable), `miss`, `hit`, `revalidated`, or `shared` (shared with a concurrent identical request)
+:ivar caller: the method of the service which made the request, e.g. `onlinejudge.service.atcoder.AtCoderProblem.download_sample_cases`
+"""
+
+
+class Sink:
+    def emit(self, record: RequestRecord) -> None:
+        raise NotImplementedError
+
+
+class CallbackSink(Sink):
+    def __init__(self, callback: Callable[[RequestRecord], None]):
+        self.callback = callback
+
+    def emit(self, record: RequestRecord) -> None:
+        self.callback(record)
+
+
+class JSONLinesSink(Sink):
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, record: RequestRecord) -> None:
+        line = json.dumps(record._asdict())
+        with self._lock:
+            with open(str(self.path), 'a') as fh:
+                print(line, file=fh)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """
+    :param values: must be sorted and non-empty
+    """
+
+    assert values
+    index = q * (len(values) - 1)
+    lower = int(index)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+class AggregateSink(Sink):
+    """AggregateSink keeps records in memory and summarizes them.
+    """
+    def __init__(self):
+        self.records = []  # type: List[RequestRecord]
+        self._lock = threading.Lock()
+
+    def emit(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self, *, key: Callable[[RequestRecord], str] = lambda record: record.host) -> Dict[str, Dict[str, Any]]:
+        """
+        :param key: the function to group records. Records are grouped by hosts by default.
+        :return: a dict like `{"atcoder.jp": {"count": 3, "errors": 0, "bytes": 123456, "cache": {"miss": 3}, "retries": 0, "total_sec": {"sum": 1.2, "p50": 0.3, "p90": 0.5, "p99": 0.6, "max": 0.6}}}`
+        """
+
+        with self._lock:
+            records = list(self.records)
+        groups = {}  # type: Dict[str, List[RequestRecord]]
+        for record in records:
+            groups.setdefault(key(record), []).append(record)
+        result = {}  # type: Dict[str, Dict[str, Any]]
+        for name, group in groups.items():
+            durations = sorted(record.total_sec for record in group)
+            cache = {}  # type: Dict[str, int]
+            for record in group:
+                cache[record.cache] = cache.get(record.cache, 0) + 1
+            result[name] = {
+                'count': len(group),
+                'errors': sum(1 for record in group if record.error is not None),
+                'bytes': sum(record.response_bytes or 0 for record in group),
+                'cache': cache,
+                'retries': sum(record.retries for record in group),
+                'total_sec': {
+                    'sum': sum(durations),
+                    'p50': _percentile(durations, 0.5),
+                    'p90': _percentile(durations, 0.9),
+                    'p99': _percentile(durations, 0.99),
+                    'max': durations[-1],
+                },
+            }
+        return result
+
+
+_sinks = []  # type: List[Sink]
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink: Sink) -> None:
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink: Sink) -> None:
+    with _sinks_lock:
+        _sinks.remove(sink)
+
+
+def is_enabled() -> bool:
+    return bool(_sinks)
+
+
+def emit(record: RequestRecord) -> None:
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.emit(record)
+        except Exception as e:
+            logger.debug('failed to emit a telemetry record: %s', e)
+
+
+def find_caller() -> Optional[str]:
+    """find_caller() returns the name of the innermost method in the call stack which is defined in :py:mod:`onlinejudge.service`.
+
+    Private module-level helpers like `onlinejudge.service.atcoder._request` are skipped.
+    """
+
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('onlinejudge.service.'):
+            self = frame.f_locals.get('self')
+            cls = frame.f_locals.get('cls')
+            owner = type(self) if self is not None else cls
+            if isinstance(owner, type):
+                return '{}.{}.{}'.format(module, owner.__name__, frame.f_code.co_name)
+            if not frame.f_code.co_name.startswith('_'):
+                return '{}.{}'.format(module, frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+def make_record(*, method: str, url: str, started_at: float, started_perf: float, resp: Any, info: Dict[str, Any], caller: Optional[str], error: Optional[BaseException]) -> RequestRecord:
+    """
+    :param resp: a :py:class:`requests.Response` or `None`
+    :param info: a dict with keys `cache` and `retries`, filled by :py:func:`onlinejudge._implementation.utils.request`
+    """
+
+    total_sec = time.perf_counter() - started_perf
+    ttfb_sec = None  # type: Optional[float]
+    transfer_sec = None  # type: Optional[float]
+    request_bytes = 0
+    response_bytes = None  # type: Optional[int]
+    redirects = 0
+    status_code = None  # type: Optional[int]
+    if resp is not None:
+        status_code = resp.status_code
+        redirects = len(resp.history)
+        if info.get('cache') in ('miss', 'bypass') and resp.elapsed is not None:
+            ttfb_sec = resp.elapsed.total_seconds() + sum(r.elapsed.total_seconds() for r in resp.history)
+            transfer_sec = max(0.0, total_sec - ttfb_sec)
+        body = getattr(resp.request, 'body', None)
+        if isinstance(body, (bytes, str)):
+            request_bytes = len(body)
+        if isinstance(resp._content, bytes):  # pylint: disable=protected-access
+            response_bytes = len(resp._content)  # pylint: disable=protected-access
+        elif resp.headers.get('Content-Length', '').isdigit():
+            response_bytes = int(resp.headers['Content-Length'])
+    return RequestRecord(
+        method=method,
+        url=url,
+        host=urllib.parse.urlparse(url).hostname or '',
+        status_code=status_code,
+        started_at=started_at,
+        total_sec=total_sec,
+        ttfb_sec=ttfb_sec,
+        transfer_sec=transfer_sec,
+        request_bytes=request_bytes,
+        response_bytes=response_bytes,
+        redirects=redirects,
+        cache=info.get('cache', 'bypass'),
+        retries=info.get('retries', 0),
+        caller=caller,
+        error=None if error is None else '{}: {}'.format(type(error).__name__, error),
+    )
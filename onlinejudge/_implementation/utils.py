@@ -3,39 +3,53 @@ import datetime
 import http.client
 import http.cookiejar
 import posixpath
+import time
 import urllib.parse
 from logging import getLogger
 from typing import *
 
-import bs4
-
+import onlinejudge._implementation.http_cache as http_cache
+import onlinejudge._implementation.rate_limit as rate_limit
+import onlinejudge._implementation.retry as retry
+import onlinejudge._implementation.single_flight as single_flight
+import onlinejudge._implementation.telemetry as telemetry
+from onlinejudge.service import parse_url  # re-export
 from onlinejudge.type import *
 from onlinejudge.utils import *  # re-export
 
+if TYPE_CHECKING:
+    import bs4  # imported lazily, since this module is used even by services which don't parse HTML
+
 logger = getLogger(__name__)
 HTML_PARSER = 'lxml'
 
 
-def previous_sibling_tag(tag: bs4.Tag) -> bs4.Tag:
+def previous_sibling_tag(tag: 'bs4.Tag') -> 'bs4.Tag':
+    import bs4  # pylint: disable=import-outside-toplevel
+
     tag = tag.previous_sibling
     while tag and not isinstance(tag, bs4.Tag):
         tag = tag.previous_sibling
     return tag
 
 
-def next_sibling_tag(tag: bs4.Tag) -> bs4.Tag:
+def next_sibling_tag(tag: 'bs4.Tag') -> 'bs4.Tag':
+    import bs4  # pylint: disable=import-outside-toplevel
+
     tag = tag.next_sibling
     while tag and not isinstance(tag, bs4.Tag):
         tag = tag.next_sibling
     return tag
 
 
-def get_direct_children_text(tag: bs4.Tag) -> str:
+def get_direct_children_text(tag: 'bs4.Tag') -> str:
     """get_direct_children_text collects the text which are direct children of the given tag.
 
     For example, this returns "A - Hello world " for a tag `<h2>A - Hello world <a href="...">Editorial</a></h2>`.
     """
 
+    import bs4  # pylint: disable=import-outside-toplevel
+
     assert isinstance(tag, bs4.Tag)
     text = ''
     for child in tag.children:
@@ -49,13 +63,15 @@ def get_direct_children_text(tag: bs4.Tag) -> str:
 
 
 # TODO: Why this returns bs4.NavigableString?
-def parse_content(parent: Union[bs4.NavigableString, bs4.Tag, bs4.Comment]) -> bs4.NavigableString:
+def parse_content(parent: Union['bs4.NavigableString', 'bs4.Tag', 'bs4.Comment']) -> 'bs4.NavigableString':
     """parse_content convert a tag to a string with interpretting `<br>` and ignoring other tags.
 
     .. seealso::
         https://github.com/kmyk/online-judge-tools/issues/553
     """
 
+    import bs4  # pylint: disable=import-outside-toplevel
+
     res = ''
     if isinstance(parent, bs4.Comment):
         pass
@@ -73,7 +89,9 @@ def parse_content(parent: Union[bs4.NavigableString, bs4.Tag, bs4.Comment]) -> b
 
 
 class FormSender:
-    def __init__(self, form: bs4.Tag, url: str):
+    def __init__(self, form: 'bs4.Tag', url: str):
+        import bs4  # pylint: disable=import-outside-toplevel
+
         assert isinstance(form, bs4.Tag)
         assert form.name == 'form'
         self.form = form
@@ -114,6 +132,27 @@ class FormSender:
         return request(method, url, session=session, raise_for_status=raise_for_status, data=self.payload, files=self.files, headers=headers, **kwargs)
 
 
+class HostBearerAuth(requests.auth.AuthBase):
+    """HostBearerAuth adds a bearer token only to requests to the given hosts.
+
+    Unlike setting the `Authorization` header of a session, this doesn't leak the token to other hosts, and the session can be shared among requests to various services.
+    """
+    def __init__(self, token: str, *, hosts: Container[str]):
+        self.token = token
+        self.hosts = hosts
+
+    def get_authorization(self, url: str) -> Optional[str]:
+        if urllib.parse.urlparse(url).hostname in self.hosts:
+            return 'Bearer {}'.format(self.token)
+        return None
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        authorization = self.get_authorization(r.url or '')
+        if authorization is not None:
+            r.headers['Authorization'] = authorization
+        return r
+
+
 def dos2unix(s: str) -> str:
     """
     .. deprecated:: 10.1.0
@@ -160,21 +199,179 @@ def normpath(path: str) -> str:
     return path
 
 
-def request(method: str, url: str, session: requests.Session, raise_for_status: bool = True, **kwargs) -> requests.Response:
+def _get_timeout(session: requests.Session, timeout: Any) -> Any:
+    """
+    :raises DeadlineExceededError:
+    """
+
+    if timeout is None:
+        timeout = (default_connect_timeout, default_read_timeout)
+    remaining = get_remaining_time(session)
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceededError
+    if isinstance(timeout, tuple):
+        connect_timeout, read_timeout = timeout
+        return (min(connect_timeout or remaining, remaining), min(read_timeout or remaining, remaining))
+    else:
+        return min(timeout, remaining)
+
+
+def _send(method: str, url: str, session: requests.Session, *, retry_policy: retry.RetryPolicy, info: Dict[str, Any], **kwargs) -> requests.Response:
+    """`_send()` sends a request to the network, with throttling, retrying and the deadline of the session.
+
+    :raises DeadlineExceededError:
+    """
+
+    limiter = rate_limit.get_default_limiter()
+    timeout = kwargs.pop('timeout', None)
+    attempt = 0
+    slept = 0.0
+    while True:
+        if limiter is not None:
+            limiter.acquire(url)
+        logger.info('network: %s: %s', method, url)
+        if 'data' in kwargs:
+            logger.debug('network: data: %s', repr(kwargs['data']))  # TODO: prepare a nice filter. This may contain credentials.
+        try:
+            resp = session.request(method, url, timeout=_get_timeout(session, timeout), **kwargs)  # type: Optional[requests.Response]
+        except DeadlineExceededError:
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            logger.info('network: %s', e)
+            error = e  # type: Optional[Exception]
+            resp = None
+        else:
+            assert resp is not None
+            error = None
+            if resp.url != url:
+                logger.info('network: redirected to: %s', resp.url)
+            logger.info('network: %s %s', resp.status_code, http.client.responses.get(resp.status_code, ''))  # e.g. "200 OK" or "503 Service Unavailable"
+
+        wait = retry_policy.get_wait(method, attempt=attempt, slept=slept, response=resp)
+        remaining = get_remaining_time(session)
+        if wait is not None and remaining is not None and wait >= remaining:
+            logger.warning('network: give up retrying: the deadline comes in %f sec', remaining)
+            wait = None
+        if wait is None:
+            if attempt and (resp is None or resp.status_code in retry_policy.status_forcelist):
+                retry.record(url, 'give-up')
+            if error is not None:
+                raise error
+            assert resp is not None
+            return resp
+        if resp is not None:
+            resp.close()
+        attempt += 1
+        slept += wait
+        info['retries'] = attempt
+        retry.record(url, 'retry')
+        logger.warning('network: retry %d/%d after %f sec: %s %s', attempt, retry_policy.max_retries, wait, method, url)
+        time.sleep(wait)
+
+
+def _request_with_cache(method: str, url: str, session: requests.Session, *, retry_policy: retry.RetryPolicy, info: Dict[str, Any], **kwargs) -> requests.Response:
+    """
+    :param info: is a dict to write the status of the cache and the number of retries, for telemetry
+    """
+
+    cache = http_cache.get_default_cache()
+    vary = {}  # type: Dict[str, Any]
+    if cache is not None:
+        # responses depend on the credentials and the login state, so they are cached separately
+        prepared = session.prepare_request(requests.Request(method, url, headers=kwargs.get('headers'), cookies=kwargs.get('cookies'), auth=kwargs.get('auth')))
+        vary = {
+            'authorization': prepared.headers.get('Authorization'),
+            'login_state': http_cache.get_login_state(url, cookie=prepared.headers.get('Cookie')),
+            'allow_redirects': kwargs.get('allow_redirects', True),
+        }
+    entry = None  # type: Optional[http_cache.CacheEntry]
+    if cache is not None and method == 'GET' and not kwargs.get('stream'):
+        entry = cache.lookup(url, **vary)
+        if entry is not None and entry.is_fresh() and not http_cache.requires_revalidation(kwargs.get('headers')):
+            logger.info('network: %s: %s (cached)', method, url)
+            info['cache'] = 'hit'
+            return entry.to_response()
+        if entry is not None:
+            kwargs['headers'] = {**entry.get_conditional_headers(), **(kwargs.get('headers') or {})}
+    resp = _send(method, url, session, retry_policy=retry_policy, info=info, **kwargs)
+    if cache is not None:
+        if entry is not None and resp.status_code == 304:
+            logger.info('network: use the cached response')
+            info['cache'] = 'revalidated'
+            resp = cache.refresh(entry, resp)
+        elif method == 'GET' and not kwargs.get('stream'):
+            info['cache'] = 'miss'
+            cache.store(url, resp, **vary)
+        elif method != 'GET':
+            cache.invalidate(url, **vary)
+    return resp
+
+
+_single_flight = single_flight.SingleFlight()
+
+
+def _copy_response(resp: requests.Response) -> requests.Response:
+    """_copy_response() copies a response shared with a concurrent request.
+
+    Only the attributes of `requests` are copied, so memoized states like parsed trees (which are not thread-safe) are not shared. Mutable headers and cookies are copied too.
+    """
+
+    copied = requests.Response()
+    for attr in requests.Response.__attrs__:
+        setattr(copied, attr, getattr(resp, attr))
+    copied.headers = resp.headers.copy()
+    copied.cookies = resp.cookies.copy()
+    copied.history = list(resp.history)
+    copied._content_consumed = True  # pylint: disable=protected-access
+    copied.raw = None
+    return copied
+
+
+def request(method: str, url: str, session: requests.Session, raise_for_status: bool = True, *, retry_policy: Optional[retry.RetryPolicy] = None, **kwargs) -> requests.Response:
     """`request()` is a wrapper of the `requests` package with logging.
 
     There is a way to bring logs from `requests` via `urllib3`, but we don't use it, because it's not very intended feature ant not very customizable. See https://2.python-requests.org/en/master/api/#api-changes
+
+    When the cache is enabled with :py:func:`onlinejudge._implementation.http_cache.set_default_cache`, GET requests are served from or revalidated against the cache.
+    When the limiter is enabled with :py:func:`onlinejudge._implementation.rate_limit.set_default_limiter`, requests which actually go out to the network are throttled per host.
+    Idempotent requests which fail transiently (e.g. "503 Service Unavailable") are retried with :py:class:`onlinejudge._implementation.retry.RetryPolicy`.
+    Identical GET requests made concurrently with the same session share one response.
+
+    :param retry_policy: the policy to retry. If `None`, the policy for the host is used.
     """
 
     assert method in ['GET', 'POST']
     kwargs.setdefault('allow_redirects', True)
-    logger.info('network: %s: %s', method, url)
-    if 'data' in kwargs:
-        logger.debug('network: data: %s', repr(kwargs['data']))  # TODO: prepare a nice filter. This may contain credentials.
-    resp = session.request(method, url, **kwargs)
-    if resp.url != url:
-        logger.info('network: redirected to: %s', resp.url)
-    logger.info('network: %s %s', resp.status_code, http.client.responses[resp.status_code])  # e.g. "200 OK" or "503 Service Unavailable"
+    if retry_policy is None:
+        retry_policy = retry.get_policy(url)
+
+    is_measured = telemetry.is_enabled()
+    if is_measured:
+        started_at = time.time()
+        started_perf = time.perf_counter()
+        caller = telemetry.find_caller()
+    info = {'cache': 'bypass', 'retries': 0}  # type: Dict[str, Any]
+    resp = None  # type: Optional[requests.Response]
+    try:
+        if method == 'GET' and not kwargs.get('stream') and 'data' not in kwargs and 'files' not in kwargs:
+            key = (id(session), url, repr(sorted((kwargs.get('headers') or {}).items())), repr(kwargs.get('params')), kwargs['allow_redirects'])
+            resp, is_shared = _single_flight.do(key, lambda: _request_with_cache(method, url, session, retry_policy=retry_policy, info=info, **kwargs))
+            if is_shared:
+                logger.info('network: %s: %s (shared with a concurrent request)', method, url)
+                info = {'cache': 'shared', 'retries': 0}
+                resp = _copy_response(resp)  # callers may modify attributes like `encoding`
+        else:
+            resp = _request_with_cache(method, url, session, retry_policy=retry_policy, info=info, **kwargs)
+    except Exception as e:
+        if is_measured:
+            telemetry.emit(telemetry.make_record(method=method, url=url, started_at=started_at, started_perf=started_perf, resp=None, info=info, caller=caller, error=e))
+        raise
+    if is_measured:
+        telemetry.emit(telemetry.make_record(method=method, url=url, started_at=started_at, started_perf=started_perf, resp=resp, info=info, caller=caller, error=None))
+
+    assert resp is not None
     if raise_for_status:
         resp.raise_for_status()
     return resp
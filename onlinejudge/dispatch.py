@@ -17,24 +17,64 @@
     :type: :py:class:`List` [ :py:class:`Type` [ :py:class:`onlinejudge.type.Submission` ] ]
 
     contains classes to use for :py:func:`submission_from_url`
+
+.. note::
+    Service modules are imported lazily (see :py:mod:`onlinejudge.service`), so these lists contain only classes of imported modules.
+    Call :py:func:`onlinejudge.service.import_all` before iterating them directly.
+
+Lookups are indexed by hosts: only classes of the service modules for the host of a URL (and classes registered by other packages) are tried.
+The parsed URL is memoized (see :py:func:`onlinejudge.service.parse_url`) and shared by all lookups and `from_url()` of classes.
 """
 
 from logging import getLogger
-from typing import List, Optional, Type
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type, TypeVar
 
+import onlinejudge.service
 from onlinejudge.type import Contest, Problem, Service, Submission
 
 logger = getLogger(__name__)
 
+T = TypeVar('T')
+
+_candidates_cache = {}  # type: Dict[Tuple[Tuple[type, ...], Tuple[str, ...]], List[type]]
+
+
+def _get_candidates(classes: Sequence[Type[T]], url: str) -> List[Type[T]]:
+    """_get_candidates() returns the classes which may recognize the URL, keeping the order of registration.
+    """
+
+    onlinejudge.service.import_modules_for_url(url)  # this may register classes
+    names = onlinejudge.service.get_module_names_for_url(url)
+    key = (tuple(classes), names)
+    candidates = _candidates_cache.get(key)
+    if candidates is None:
+        candidates = []
+        for cls in classes:
+            package, _, name = cls.__module__.rpartition('.')
+            if package != onlinejudge.service.__name__ or name not in onlinejudge.service.manifest:
+                candidates.append(cls)  # a class of another package, whose hosts are unknown
+            elif name in names:
+                candidates.append(cls)
+        _candidates_cache[key] = candidates
+    return candidates  # type: ignore
+
+
+def _find(classes: Sequence[Type[T]], url: str) -> Optional[T]:
+    for cls in _get_candidates(classes, url):
+        obj = cls.from_url(url)  # type: ignore
+        if obj is not None:
+            return obj
+    return None
+
+
 submissions = []  # type: List[Type['Submission']]
 
 
 def submission_from_url(url: str) -> Optional[Submission]:
-    for cls in submissions:
-        submission = cls.from_url(url)
-        if submission is not None:
-            logger.info('submission recognized: %s: %s', str(submission), url)
-            return submission
+    submission = _find(submissions, url)
+    if submission is not None:
+        logger.info('submission recognized: %s: %s', str(submission), url)
+        return submission
     logger.error('unknown submission: %s', url)
     return None
 
@@ -51,11 +91,10 @@ def problem_from_url(url: str) -> Optional[Problem]:
     <onlinejudge.service.codeforces.CodeforcesProblem object at 0x7fa05a916710>
     """
 
-    for cls in problems:
-        problem = cls.from_url(url)
-        if problem is not None:
-            logger.info('problem recognized: %s: %s', str(problem), url)
-            return problem
+    problem = _find(problems, url)
+    if problem is not None:
+        logger.info('problem recognized: %s: %s', str(problem), url)
+        return problem
     logger.error('unknown problem: %s', url)
     return None
 
@@ -64,11 +103,10 @@ contests = []  # type: List[Type['Contest']]
 
 
 def contest_from_url(url: str) -> Optional[Contest]:
-    for cls in contests:
-        contest = cls.from_url(url)
-        if contest is not None:
-            logger.info('contest recognized: %s: %s', str(contest), url)
-            return contest
+    contest = _find(contests, url)
+    if contest is not None:
+        logger.info('contest recognized: %s: %s', str(contest), url)
+        return contest
     logger.error('unknown contest: %s', url)
     return None
 
@@ -76,17 +114,72 @@ def contest_from_url(url: str) -> Optional[Contest]:
 services = []  # type: List[Type['Service']]
 
 
-def service_from_url(url: str) -> Optional[Service]:
-    for cls in services:
-        service = cls.from_url(url)
-        if service is not None:
-            logger.info('service recognized: %s: %s', str(service), url)
-            return service
-    submission = submission_from_url(url)
+def _service_from_url(url: str, *, find_submission: Callable[[], Optional[Submission]], find_problem: Callable[[], Optional[Problem]]) -> Optional[Service]:
+    """
+    :param find_submission: is called only when no services recognize the URL
+    :param find_problem: is called only when neither services nor submissions recognize the URL
+    """
+
+    service = _find(services, url)
+    if service is not None:
+        return service
+    submission = find_submission()
     if submission is not None:
         return submission.get_service()
-    problem = problem_from_url(url)
+    problem = find_problem()
     if problem is not None:
         return problem.get_service()
+    return None
+
+
+def service_from_url(url: str) -> Optional[Service]:
+    service = _service_from_url(url, find_submission=lambda: _find(submissions, url), find_problem=lambda: _find(problems, url))
+    if service is not None:
+        logger.info('service recognized: %s: %s', str(service), url)
+        return service
     logger.error('unknown service: %s', url)
     return None
+
+
+ClassifiedURL = NamedTuple('ClassifiedURL', [
+    ('url', str),
+    ('service', Optional[Service]),
+    ('contest', Optional[Contest]),
+    ('problem', Optional[Problem]),
+    ('submission', Optional[Submission]),
+])
+"""
+:ivar service: the same to the result of :py:func:`service_from_url`
+"""
+
+
+def classify_url(url: str) -> ClassifiedURL:
+    """classify_url() recognizes the URL as all of a service, a contest, a problem and a submission at once.
+
+    Unlike :py:func:`problem_from_url` and others, this doesn't log errors for kinds which the URL is not of, since it is usual that a URL is not of some kinds.
+    """
+
+    submission = _find(submissions, url)
+    problem = _find(problems, url)
+    classified = ClassifiedURL(
+        url=url,
+        service=_service_from_url(url, find_submission=lambda: submission, find_problem=lambda: problem),
+        contest=_find(contests, url),
+        problem=problem,
+        submission=submission,
+    )
+    logger.debug('URL classified: %s', classified)
+    return classified
+
+
+def classify_urls(urls: Iterable[str]) -> List[ClassifiedURL]:
+    """classify_urls() is the bulk version of :py:func:`classify_url`. Duplicated URLs are recognized only once.
+    """
+
+    memo = {}  # type: Dict[str, ClassifiedURL]
+    result = []  # type: List[ClassifiedURL]
+    for url in urls:
+        if url not in memo:
+            memo[url] = classify_url(url)
+        result.append(memo[url])
+    return result
@@ -1,18 +1,132 @@
 # Python Version: 3.x
-import onlinejudge.service.anarchygolf
-import onlinejudge.service.aoj
-import onlinejudge.service.atcoder
-import onlinejudge.service.codechef
-import onlinejudge.service.codeforces
-import onlinejudge.service.csacademy
-import onlinejudge.service.facebook
-import onlinejudge.service.google
-import onlinejudge.service.hackerrank
-import onlinejudge.service.kagamiz
-import onlinejudge.service.kattis
-import onlinejudge.service.library_checker
-import onlinejudge.service.poj
-import onlinejudge.service.spoj
-import onlinejudge.service.topcoder
-import onlinejudge.service.toph
-import onlinejudge.service.yukicoder
+"""
+the registry of service modules
+
+Service modules are imported lazily. Each module is imported when a URL for one of its hosts is dispatched by :py:mod:`onlinejudge.dispatch`, so `import onlinejudge` doesn't pay for modules and parsers of unused services.
+You can still import a module explicitly, e.g. `import onlinejudge.service.atcoder`.
+
+.. py:data:: manifest
+
+    :type: :py:class:`Dict` [ :py:class:`str`, :py:class:`Tuple` [ :py:class:`str`, ... ] ]
+
+    maps the names of service modules to their hostnames. A hostname which starts with `.` matches its subdomains.
+"""
+
+import functools
+import importlib
+import sys
+import types
+import urllib.parse
+from typing import *
+
+manifest = {
+    'anarchygolf': ('golf.shinh.org', ),
+    'aoj': ('judge.u-aizu.ac.jp', 'onlinejudge.u-aizu.ac.jp'),
+    'atcoder': ('atcoder.jp', 'beta.atcoder.jp', '.contest.atcoder.jp'),
+    'codechef': ('www.codechef.com', ),
+    'codeforces': ('codeforces.com', 'm1.codeforces.com', 'm2.codeforces.com', 'm3.codeforces.com'),
+    'csacademy': ('csacademy.com', 'www.csacademy.com'),
+    'facebook': ('www.facebook.com', ),
+    'google': ('codingcompetitions.withgoogle.com', 'code.google.com'),
+    'hackerrank': ('hackerrank.com', 'www.hackerrank.com'),
+    'kagamiz': ('kcs.miz-miz.biz', ),
+    'kattis': ('.kattis.com', ),
+    'library_checker': ('judge.yosupo.jp', ),
+    'poj': ('poj.org', ),
+    'spoj': ('www.spoj.com', ),
+    'topcoder': ('topcoder.com', 'arena.topcoder.com', 'community.topcoder.com'),
+    'toph': ('toph.co', ),
+    'yukicoder': ('yukicoder.me', ),
+}  # type: Dict[str, Tuple[str, ...]]
+
+
+def _match_hostname(hostname: str, pattern: str) -> bool:
+    if pattern.startswith('.'):
+        return hostname.endswith(pattern)
+    return hostname == pattern
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_url(url: str) -> urllib.parse.ParseResult:
+    """parse_url() is a memoized :py:func:`urllib.parse.urlparse`. The same URL is parsed repeatedly by :py:mod:`onlinejudge.dispatch` and `from_url()` of classes, so they share the result of this.
+
+    :raises ValueError:
+    """
+
+    return urllib.parse.urlparse(url)
+
+
+def get_hostname(url: str) -> Optional[str]:
+    """get_hostname() returns the normalized (lowercased) hostname of the URL.
+    """
+
+    try:
+        return parse_url(url).hostname
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def get_module_names_for_hostname(hostname: Optional[str]) -> Tuple[str, ...]:
+    """
+    :return: the names of the modules for the host. If the host is not in :py:data:`manifest`, all modules are returned, because a service may accept it in a way which the manifest doesn't describe.
+    """
+
+    if not hostname:
+        return ()  # services recognize only URLs with hosts
+    names = tuple(name for name, patterns in manifest.items() if any(_match_hostname(hostname, pattern) for pattern in patterns))
+    return names or tuple(manifest.keys())
+
+
+def get_module_names_for_url(url: str) -> Tuple[str, ...]:
+    """get_module_names_for_url() returns the names of service modules which may recognize the URL.
+    """
+
+    return get_module_names_for_hostname(get_hostname(url))
+
+
+def import_module(name: str) -> types.ModuleType:
+    """import_module() imports a service module, e.g. `import_module('atcoder')`. Importing a module registers its classes to :py:mod:`onlinejudge.dispatch`.
+    """
+
+    return importlib.import_module(__name__ + '.' + name)
+
+
+def import_modules_for_url(url: str) -> None:
+    for name in get_module_names_for_url(url):
+        import_module(name)
+
+
+def import_all() -> None:
+    """import_all() imports all service modules. Use this before iterating the lists of classes in :py:mod:`onlinejudge.dispatch` directly.
+    """
+
+    for name in manifest:
+        import_module(name)
+
+
+def lazy_isinstance(obj: Any, qualname: str) -> bool:
+    """lazy_isinstance() is :py:func:`isinstance` which doesn't import the module of the class.
+
+    An object can't be an instance of a class which is not defined yet, so this returns `False` in that case.
+
+    :param qualname: the full name of the class, e.g. `onlinejudge.service.atcoder.AtCoderProblem`
+    """
+
+    module_name, _, class_name = qualname.rpartition('.')
+    cls = getattr(sys.modules.get(module_name), class_name, None)  # the module may be being imported by another thread
+    if cls is None:
+        return False
+    return isinstance(obj, cls)
+
+
+class _LazyModule(types.ModuleType):
+    # keep `import onlinejudge; onlinejudge.service.atcoder.AtCoderProblem` working
+    # NOTE: a module-level __getattr__ (PEP 562) is not available in Python 3.6, so we replace the class of this module instead
+    def __getattr__(self, name: str) -> types.ModuleType:
+        if name in manifest:
+            return import_module(name)
+        raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+
+sys.modules[__name__].__class__ = _LazyModule
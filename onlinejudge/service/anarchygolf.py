@@ -3,7 +3,6 @@
 the module for Anarchy Golf (http://golf.shinh.org/)
 """
 
-import urllib.parse
 from typing import *
 
 import bs4
@@ -25,7 +24,7 @@ class AnarchyGolfService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['AnarchyGolfService']:
         # example: http://golf.shinh.org/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'golf.shinh.org':
             return cls()
@@ -79,7 +78,7 @@ class AnarchyGolfProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, url: str) -> Optional['AnarchyGolfProblem']:
         # example: http://golf.shinh.org/p.rb?The+B+Programming+Language
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'golf.shinh.org' \
                 and utils.normpath(result.path) == '/p.rb' \
@@ -35,7 +35,7 @@ class AOJService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['AOJService']:
         # example: http://judge.u-aizu.ac.jp/onlinejudge/
         # example: https://onlinejudge.u-aizu.ac.jp/home
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('judge.u-aizu.ac.jp', 'onlinejudge.u-aizu.ac.jp'):
             return cls()
@@ -135,7 +135,7 @@ class AOJProblem(onlinejudge.type.Problem):
 
     @classmethod
     def from_url(cls, url: str) -> Optional['AOJProblem']:
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
 
         # example: http://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=1169
         # example: http://judge.u-aizu.ac.jp/onlinejudge/description.jsp?id=DSL_1_A&lang=jp
@@ -221,7 +221,7 @@ class AOJArenaProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, url: str) -> Optional['AOJArenaProblem']:
         # example: https://onlinejudge.u-aizu.ac.jp/services/room.html#RitsCamp19Day2/problems/A
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'onlinejudge.u-aizu.ac.jp' \
                 and utils.normpath(result.path) == '/services/room.html':
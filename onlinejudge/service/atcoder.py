@@ -13,7 +13,13 @@ the module for AtCoder (https://atcoder.jp/)
 :note: Some methods not inherited from classes :py:mod:`onlinejudge.type` may be modified in future, because the specification is not fixed yet.
 """
 
+import collections
+import concurrent.futures
+import hashlib
 import itertools
+import json
+import os
+import pathlib
 import posixpath
 import re
 import urllib.parse
@@ -22,6 +28,7 @@ from typing import *
 
 import bs4
 
+import onlinejudge._implementation.http_cache as http_cache
 import onlinejudge._implementation.testcase_zipper
 import onlinejudge._implementation.utils as utils
 import onlinejudge.dispatch
@@ -31,9 +38,27 @@ from onlinejudge.type import *
 logger = getLogger(__name__)
 
 
-def _list_alert(resp: requests.Response, soup: Optional[bs4.BeautifulSoup] = None, print_: bool = False) -> List[str]:
+def _get_soup(resp: requests.Response, *, keep: bool = False) -> bs4.BeautifulSoup:
+    """_get_soup() parses the response as HTML, at most once for each response.
+
+    A tree parsed with `keep=True` is memoized on the response and handed to the next call. The next call takes it away, so data objects which hold the response don't keep the tree alive.
+
+    :note: The tree may be shared with other parsers. Don't modify it.
+    """
+
+    soup = resp.__dict__.pop('_onlinejudge_soup', None)  # type: Optional[bs4.BeautifulSoup]
     if soup is None:
         soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+    if keep:
+        resp._onlinejudge_soup = soup  # type: ignore  # pylint: disable=protected-access
+    return soup
+
+
+def _list_alert(resp: requests.Response, soup: Optional[bs4.BeautifulSoup] = None, print_: bool = False) -> List[str]:
+    if soup is None:
+        if b'alert' not in resp.content:
+            return []  # skip parsing, since most pages have no alerts
+        soup = _get_soup(resp, keep=True)
     msgs = []  # type: List[str]
     for alert in soup.find_all('div', attrs={'role': 'alert'}):
         msg = ' '.join([s.strip() for s in alert.strings if s.strip()])
@@ -43,6 +68,33 @@ def _list_alert(resp: requests.Response, soup: Optional[bs4.BeautifulSoup] = Non
     return msgs
 
 
+def _get_login_state(cookies: Dict[str, str]) -> Optional[str]:
+    """_get_login_state() returns the screen name of the logged-in user in the session cookie, or an empty string if not logged in.
+
+    AtCoder renews the session cookie `REVEL_SESSION` in every response, so the HTTP cache uses this instead of the cookie itself.
+    The value of the cookie is like `SIGNATURE-%00csrf_token%3A...%00%00UserScreenName%3Akimiyuki%00%00_TS%3A1600000000%00`.
+    """
+
+    value = cookies.get('REVEL_SESSION')
+    if value is None:
+        return ''
+    _, sep, data = value.partition('-')
+    if not sep:
+        return None
+    fields = {}  # type: Dict[str, str]
+    for item in urllib.parse.unquote(data).split('\0'):
+        key, sep, field_value = item.partition(':')
+        if sep:
+            fields[key] = field_value
+    if '_TS' not in fields:
+        return None  # an unknown format
+    return fields.get('UserScreenName', '')
+
+
+for _hostname in ('atcoder.jp', 'beta.atcoder.jp'):
+    http_cache.register_login_state_function(_hostname, _get_login_state)
+
+
 def _request(*args, **kwargs):
     """
     This is a workaround. AtCoder's servers sometime fail to send "Content-Type" field.
@@ -51,7 +103,7 @@ def _request(*args, **kwargs):
     resp = utils.request(*args, **kwargs)
     logger.debug('AtCoder\'s server said "Content-Type: %s"', resp.headers.get('Content-Type', '(not sent)'))
     resp.encoding = 'UTF-8'
-    _list_alert(resp, print_=True)
+    _list_alert(resp, print_=True)  # this keeps the parsed tree for the caller
     return resp
 
 
@@ -67,10 +119,10 @@ class AtCoderService(onlinejudge.type.Service):
 
         # get
         url = 'https://atcoder.jp/login'
-        resp = _request('GET', url, session=session, allow_redirects=False)
+        resp = _request('GET', url, session=session, allow_redirects=False, headers={'Cache-Control': 'no-cache'})  # the CSRF token in the form must be for this session
 
         # parse
-        soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+        soup = _get_soup(resp)
         form = soup.find('form', action='')
         if not form:
             raise LoginError('something wrong')
@@ -114,39 +166,72 @@ class AtCoderService(onlinejudge.type.Service):
         -   http://agc012.contest.atcoder.jp/
         """
 
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and (result.netloc in ('atcoder.jp', 'beta.atcoder.jp') or result.netloc.endswith('.contest.atcoder.jp')):
             return cls()
         return None
 
-    def iterate_contest_data(self, *, lang: str = 'ja', session: Optional[requests.Session] = None) -> Iterator['AtCoderContestData']:
+    def _download_archive_page(self, page: int, *, lang: str, session: requests.Session) -> Tuple[List['AtCoderContestData'], int]:
+        """
+        :return: the contests in the page, and the number of the last page
+        """
+
+        # get
+        url = 'https://atcoder.jp/contests/archive?lang={}&page={}'.format(lang, page)
+        resp = _request('GET', url, session=session)
+        timestamp = datetime.datetime.now(datetime.timezone.utc).astimezone()
+
+        # parse
+        soup = _get_soup(resp)
+        last_page = int(soup.find('ul', class_='pagination').find_all('li')[-1].text)
+        tbody = soup.find('tbody')
+        return [AtCoderContestData._from_table_row(tr, lang=lang, response=resp, session=session, timestamp=timestamp) for tr in tbody.find_all('tr')], last_page
+
+    def iterate_contest_data(self, *, lang: str = 'ja', since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None, jobs: int = 4, session: Optional[requests.Session] = None) -> Iterator['AtCoderContestData']:
         """
         :param lang: must be `ja` (default) or `en`.
+        :param since: list only contests which start at or after this time. Pages after the first contest before this time are not fetched, since the archive lists newer contests first.
+        :param until: list only contests which start at or before this time.
+        :param jobs: the number of pages fetched concurrently. Contests are still listed in the order of the archive, and the interval of requests to the host still applies.
         :note: `lang=ja` is required to see some Japanese-local contests.
         :note: You can use `lang=en` to see the English names of contests.
         """
 
         assert lang in ('ja', 'en')
+        assert jobs >= 1
         session = session or utils.get_default_session()
-        last_page = None
-        for page in itertools.count(1):  # 1-based
-            if last_page is not None and page > last_page:
-                break
 
-            # get
-            url = 'https://atcoder.jp/contests/archive?lang={}&page={}'.format(lang, page)
-            resp = _request('GET', url, session=session)
-            timestamp = datetime.datetime.now(datetime.timezone.utc).astimezone()
-
-            # parse
-            soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
-            if last_page is None:
-                last_page = int(soup.find('ul', class_='pagination').find_all('li')[-1].text)
-                logger.debug('last page: %s', last_page)
-            tbody = soup.find('tbody')
-            for tr in tbody.find_all('tr'):
-                yield AtCoderContestData._from_table_row(tr, lang=lang, response=resp, session=session, timestamp=timestamp)
+        contests, last_page = self._download_archive_page(1, lang=lang, session=session)
+        logger.debug('last page: %s', last_page)
+        next_page = 2
+        executor = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+        window = collections.deque()  # type: Deque[concurrent.futures.Future]
+        try:
+            while True:
+                # fetch following pages ahead, unless the current page already reaches the bound
+                if since is None or not contests or contests[-1].start_time >= since:
+                    while len(window) < jobs and next_page <= last_page:
+                        if executor is None:
+                            executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+                        window.append(executor.submit(self._download_archive_page, next_page, lang=lang, session=session))
+                        next_page += 1
+
+                for data in contests:
+                    if since is not None and data.start_time < since:
+                        return
+                    if until is not None and data.start_time > until:
+                        continue
+                    yield data
+
+                if not window:
+                    break
+                contests, _ = window.popleft().result()
+        finally:
+            if executor is not None:
+                for future in window:
+                    future.cancel()
+                executor.shutdown()
 
     def iterate_contests(self, *, lang: str = 'ja', session: Optional[requests.Session] = None) -> Iterator['AtCoderContest']:
         for data in self.iterate_contest_data(lang=lang, session=session):
@@ -262,7 +347,7 @@ class AtCoderContestDetailedData(AtCoderContestData):
 
     @classmethod
     def _from_response(cls, *, contest: 'AtCoderContest', lang: str, session: requests.Session, response: requests.Response, timestamp: datetime.datetime):
-        soup = bs4.BeautifulSoup(response.content.decode(response.encoding), utils.HTML_PARSER)
+        soup = _get_soup(response)
         name, _, _ = soup.find('title').text.rpartition(' - ')
         contest_duration = soup.find('small', class_='contest-duration')
         start_time, end_time = [cls._parse_start_time(a['href']) for a in contest_duration.find_all('a')]
@@ -326,7 +411,7 @@ class AtCoderContest(onlinejudge.type.Contest):
         -   https://atcoder.jp/contests/agc030
         """
 
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.hostname is None:
             return None
 
@@ -366,10 +451,39 @@ class AtCoderContest(onlinejudge.type.Contest):
         timestamp = datetime.datetime.now(datetime.timezone.utc).astimezone()
 
         # parse
-        soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+        soup = _get_soup(resp)
         tbody = soup.find('tbody')
         return [AtCoderProblemData._from_table_row(tr, session=session, response=resp, timestamp=timestamp) for tr in tbody.find_all('tr')]
 
+    def download_all_sample_cases(self, *, session: Optional[requests.Session] = None) -> Dict[str, Optional[List[TestCase]]]:
+        """download_all_sample_cases() downloads sample cases of all problems in the contest with a single request to the printable page of all tasks (e.g. https://atcoder.jp/contests/abc160/tasks_print ).
+
+        :return: a dict from alphabets of problems (e.g. `A`) to their sample cases. Problems whose samples are failed to be parsed are mapped to `None`, and problems which are not on the page are omitted.
+        :raises Exception: if logging in is required to see the tasks
+        """
+
+        # get
+        session = session or utils.get_default_session()
+        url = 'https://atcoder.jp/contests/{}/tasks_print'.format(self.contest_id)
+        resp = _request('GET', url, session=session)
+
+        # parse
+        soup = _get_soup(resp)
+        result = {}  # type: Dict[str, Optional[List[TestCase]]]
+        for task_statement in soup.find_all(id='task-statement'):
+            # each task is a block of "span.h2" (e.g. "A - Xor Sum"), "p" (limits) and "div#task-statement"
+            h2 = task_statement.find_previous('span', class_='h2')
+            if h2 is None:
+                logger.warning('the title of a task is not found. something wrong')
+                continue
+            alphabet, _, _ = utils.get_direct_children_text(h2).strip().partition(' - ')
+            try:
+                result[alphabet] = AtCoderProblemDetailedData._parse_sample_cases(task_statement)
+            except SampleParseError as e:
+                logger.warning('failed to parse samples of problem %s: %s', alphabet, e)
+                result[alphabet] = None
+        return result
+
     def list_problems(self, *, session: Optional[requests.Session] = None) -> Sequence['AtCoderProblem']:
         # Even without logging in, we can list problems of some contests via standings pages, but some contests have no standings pages
         return tuple([data.problem for data in self.list_problem_data(session=session)])
@@ -435,8 +549,93 @@ class AtCoderContest(onlinejudge.type.Contest):
                 break
             yield from submissions
 
+    def _get_default_checkpoint_path(self, **filters: Any) -> pathlib.Path:
+        key = json.dumps({'contest_id': self.contest_id, **filters}, sort_keys=True)
+        return utils.user_cache_dir / 'atcoder-submissions' / (hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    # yapf: disable
+    def iterate_new_submission_data_where(
+            self,
+            *,
+            me: bool = False,
+            problem_id: Optional[str] = None,
+            language_id: Optional[LanguageId] = None,
+            status: Optional[str] = None,
+            user_glob: Optional[str] = None,
+            lang: Optional[str] = None,
+            checkpoint_path: Optional[pathlib.Path] = None,
+            session: Optional[requests.Session] = None  # TODO: in Python 3.5, you cannnot use both "*" and trailing ","
+    ) -> Iterator['AtCoderSubmissionData']:
+        # yapf: enable
+        """iterate_new_submission_data_where() lists only submissions which are not listed by the previous calls with the same filters, newest first.
+
+        The checkpoint file records the newest submission of the last completed crawl. Pages are fetched with "ORDER BY created DESC" until they reach it.
+        The progress of the current crawl (the page and the lowest submission ID listed) is also recorded after each page is consumed and when the iteration is stopped (e.g. by `break`, :py:meth:`generator.close` or an exception), so an interrupted crawl resumes from the first submission which is not listed yet.
+        Submissions which are shifted to later pages by new submissions while crawling are skipped.
+
+        :param checkpoint_path: the JSON file to record the progress. By default, a file in the cache directory determined by the contest and the filters is used.
+        :note: Other parameters are the same as :py:meth:`iterate_submission_data_where`.
+        :note: Submissions are listed only once, so results of judging after they are listed (e.g. `WJ` to `AC`) are not reflected.
+        """
+
+        filters = {
+            'me': me,
+            'problem_id': problem_id,
+            'language_id': language_id,
+            'status': status,
+            'user_glob': user_glob,
+            'lang': lang,
+        }  # type: Dict[str, Any]
+        path = checkpoint_path or self._get_default_checkpoint_path(**filters)
+        try:
+            with open(str(path)) as fh:
+                checkpoint = json.load(fh)
+        except FileNotFoundError:
+            checkpoint = {}
+        top_id = checkpoint.get('top_id')  # type: Optional[int]
+        crawl = checkpoint.get('crawl') or {'page': 0, 'top_id': None, 'lowest_id': None}  # type: Dict[str, Any]
+        if crawl['page'] or crawl['lowest_id'] is not None:
+            logger.info('resume the crawl of submissions from page %d', crawl['page'] + 1)
+
+        def save(checkpoint: Dict[str, Any]) -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.{}.tmp'.format(os.getpid()))
+            with open(str(tmp_path), 'w') as fh:
+                json.dump(checkpoint, fh)
+            os.replace(str(tmp_path), str(path))
+
+        is_completed = False
+        try:
+            for page in itertools.count(crawl['page'] + 1):
+                submissions = list(self.iterate_submission_data_where(order='created', desc=True, pages=iter([page]), session=session, **filters))
+                is_reached = not submissions
+                for data in submissions:
+                    submission_id = data.submission.submission_id
+                    if top_id is not None and submission_id <= top_id:
+                        is_reached = True
+                        break
+                    if crawl['lowest_id'] is not None and submission_id >= crawl['lowest_id']:
+                        continue  # already listed in an earlier page or before the interruption
+                    if crawl['top_id'] is None:
+                        crawl['top_id'] = submission_id
+                    crawl['lowest_id'] = submission_id
+                    yield data
+                if is_reached:
+                    break
+                crawl['page'] = page
+                save({'top_id': top_id, 'crawl': crawl})
+            is_completed = True
+        finally:
+            if not is_completed:
+                # the current page is fetched again when resumed, and the submissions already listed are skipped with lowest_id
+                save({'top_id': top_id, 'crawl': crawl})
+
+        if crawl['top_id'] is not None:
+            top_id = crawl['top_id']
+        save({'top_id': top_id, 'crawl': None})
+
     def _iterate_submission_data_from_response(self, *, resp: requests.Response, session: requests.Session, timestamp: datetime.datetime) -> Iterator['AtCoderSubmissionData']:
-        soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+        soup = _get_soup(resp)
         tbodies = soup.find_all('tbody')
         if len(tbodies) == 0:
             return  # No Submissions
@@ -556,8 +755,9 @@ class AtCoderProblemData(ProblemData):
         )
 
     @classmethod
-    def _from_html(cls, html: bytes, *, problem: 'AtCoderProblem', session: Optional[requests.Session] = None, response: Optional[requests.Response] = None, timestamp: Optional[datetime.datetime] = None) -> 'AtCoderProblemData':
-        soup = bs4.BeautifulSoup(html, utils.HTML_PARSER)
+    def _from_html(cls, html: bytes, *, problem: 'AtCoderProblem', session: Optional[requests.Session] = None, response: Optional[requests.Response] = None, timestamp: Optional[datetime.datetime] = None, soup: Optional[bs4.BeautifulSoup] = None) -> 'AtCoderProblemData':
+        if soup is None:
+            soup = bs4.BeautifulSoup(html, utils.HTML_PARSER)
         h2 = soup.find('span', class_='h2')
 
         alphabet, _, name = utils.get_direct_children_text(h2).strip().partition(' - ')
@@ -606,6 +806,7 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
     :note: :py:class:`AtCoderProblemDetailedData` is obtained the problem page (e.g. https://atcoder.jp/contests/agc001/tasks/agc001_a )
 
     :ivar available_languages: :py:class:`Optional` [ :py:class:`List` [ :py:class:`Language` ] ]
+    :ivar contest_name: :py:class:`Optional` [ :py:class:`str` ] the name of the contest in the header of the page
     :ivar input_format: :py:class:`Optional` [ :py:class:`str` ]
     :ivar sample_cases: :py:class:`Optional` [ :py:class:`List` [ :py:class:`TestCase` ] ]
     :ivar score: :py:class:`Optional` [ :py:class:`float` ]
@@ -616,6 +817,7 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
             self,
             *,
             available_languages: Optional[List[Language]],
+            contest_name: Optional[str],
             input_format: Optional[str],
             sample_cases: Optional[List[TestCase]],
             score: Optional[int],
@@ -624,6 +826,7 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
         # yapf: enable
         super().__init__(**kwargs)
         self.available_languages = available_languages
+        self.contest_name = contest_name
         self.input_format = input_format
         self._sample_cases = sample_cases
         self.score = score
@@ -642,7 +845,7 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
         return None
 
     @classmethod
-    def _find_sample_tags(cls, soup: bs4.BeautifulSoup) -> Iterator[Tuple[bs4.Tag, bs4.Tag]]:
+    def _find_sample_tags(cls, soup: bs4.Tag) -> Iterator[Tuple[bs4.Tag, bs4.Tag]]:
         expected_strings = ('入力例', '出力例', 'Sample Input', 'Sample Output')
 
         def get_header(tag, expected_tag_name):
@@ -650,7 +853,9 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
                 return tag
             return None
 
-        for pre in soup.find(id='task-statement').find_all('pre'):
+        # the soup may be the div#task-statement itself, for the printable page which has many tasks
+        task_statement = soup if soup.get('id') == 'task-statement' else soup.find(id='task-statement')
+        for pre in task_statement.find_all('pre'):
             logger.debug('pre tag: %s', str(pre))
 
             # the standard format: #task-statement h3+pre
@@ -685,7 +890,7 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
                     continue
 
     @classmethod
-    def _parse_sample_cases(cls, soup: bs4.BeautifulSoup) -> List[onlinejudge.type.TestCase]:
+    def _parse_sample_cases(cls, soup: bs4.Tag) -> List[onlinejudge.type.TestCase]:
         """
         :raises SampleParseError:
         """
@@ -733,6 +938,13 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
                 languages += [Language(option.attrs['value'], option.string)]
         return languages
 
+    @classmethod
+    def _parse_contest_name(cls, soup: bs4.BeautifulSoup) -> Optional[str]:
+        a = soup.find('a', class_='contest-title')
+        if a is None:
+            return None
+        return a.text.strip() or None
+
     @classmethod
     def _parse_score(cls, soup: bs4.BeautifulSoup) -> Optional[int]:
         task_statement = soup.find('div', id='task-statement')
@@ -748,27 +960,31 @@ class AtCoderProblemDetailedData(AtCoderProblemData):
         return None
 
     @classmethod
-    def from_html(cls, html: bytes, *, problem: 'AtCoderProblem', session: Optional[requests.Session] = None, response: Optional[requests.Response] = None, timestamp: Optional[datetime.datetime] = None) -> 'AtCoderProblemDetailedData':
+    def from_html(cls, html: bytes, *, problem: 'AtCoderProblem', session: Optional[requests.Session] = None, response: Optional[requests.Response] = None, timestamp: Optional[datetime.datetime] = None, soup: Optional[bs4.BeautifulSoup] = None) -> 'AtCoderProblemDetailedData':
         """
         :param html: must be a HTML of the new (beta) version of AtCoder
+        :param soup: the parsed tree of `html`, if already available. The tree is only read.
 
         .. versionadded:: 6.2.0
 
         """
 
-        soup = bs4.BeautifulSoup(html, utils.HTML_PARSER)
+        if soup is None:
+            soup = bs4.BeautifulSoup(html, utils.HTML_PARSER)
         try:
             sample_cases = cls._parse_sample_cases(soup)  # type: Optional[List[TestCase]]
         except SampleParseError:
             sample_cases = None
         input_format = cls._parse_input_format(soup)
         available_languages = cls._parse_available_languages(soup, problem=problem)
+        contest_name = cls._parse_contest_name(soup)
         score = cls._parse_score(soup)
 
-        data = AtCoderProblemData._from_html(html, problem=problem, session=session, response=response, timestamp=timestamp)
+        data = AtCoderProblemData._from_html(html, problem=problem, session=session, response=response, timestamp=timestamp, soup=soup)
         return AtCoderProblemDetailedData(
             alphabet=data.alphabet,
             available_languages=available_languages,
+            contest_name=contest_name,
             html=data.html,
             input_format=input_format,
             memory_limit_byte=data.memory_limit_byte,
@@ -802,11 +1018,12 @@ class AtCoderProblem(onlinejudge.type.Problem):
         session = session or utils.get_default_session()
         resp = _request('GET', self.get_url(type='beta'), raise_for_status=False, session=session)
         timestamp = datetime.datetime.now(datetime.timezone.utc).astimezone()
-        if _list_alert(resp):
+        soup = _get_soup(resp)
+        if _list_alert(resp, soup=soup):
             logger.warning('are you logged in?')
         resp.raise_for_status()
         html = resp.content.decode(resp.encoding).encode()  # ensure UTF-8
-        return AtCoderProblemDetailedData.from_html(html, problem=self, session=session, response=resp, timestamp=timestamp)
+        return AtCoderProblemDetailedData.from_html(html, problem=self, session=session, response=resp, timestamp=timestamp, soup=soup)
 
     def download_sample_cases(self, *, session: Optional[requests.Session] = None) -> List[onlinejudge.type.TestCase]:
         """
@@ -815,7 +1032,7 @@ class AtCoderProblem(onlinejudge.type.Problem):
         """
         session = session or utils.get_default_session()
         resp = _request('GET', self.get_url(type='beta'), session=session)
-        soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+        soup = _get_soup(resp)
         return AtCoderProblemDetailedData._parse_sample_cases(soup)
 
     def get_url(self, *, type: Optional[str] = None, lang: Optional[str] = None) -> str:
@@ -838,7 +1055,7 @@ class AtCoderProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, s: str) -> Optional['AtCoderProblem']:
         # example: http://agc012.contest.atcoder.jp/tasks/agc012_d
-        result = urllib.parse.urlparse(s)
+        result = utils.parse_url(s)
         dirname, basename = posixpath.split(utils.normpath(result.path))
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc.count('.') == 3 \
@@ -895,7 +1112,7 @@ class AtCoderProblem(onlinejudge.type.Problem):
             raise NotLoggedInError
 
         # parse
-        soup = bs4.BeautifulSoup(resp.content.decode(resp.encoding), utils.HTML_PARSER)
+        soup = _get_soup(resp)
         form = soup.find('form', action='/contests/{}/submit'.format(self.contest_id))
         if not form:
             raise SubmissionError('something wrong')
@@ -1085,7 +1302,7 @@ class AtCoderSubmission(onlinejudge.type.Submission):
         submission_id = None  # type: Optional[int]
 
         # example: http://agc001.contest.atcoder.jp/submissions/1246803
-        result = urllib.parse.urlparse(s)
+        result = utils.parse_url(s)
         dirname, basename = posixpath.split(utils.normpath(result.path))
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc.count('.') == 3 \
@@ -4,12 +4,12 @@ the module for CodeChef (https://www.codechef.com/)
 """
 
 import re
-import urllib.parse
 from typing import *
 
 import requests
 
 import onlinejudge._implementation.testcase_zipper
+import onlinejudge._implementation.utils as utils
 import onlinejudge.dispatch
 import onlinejudge.type
 from onlinejudge.type import SampleParseError
@@ -25,7 +25,7 @@ class CodeChefService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['CodeChefService']:
         # example: https://www.codechef.com/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'www.codechef.com':
             return cls()
@@ -51,7 +51,7 @@ class CodeChefProblem(onlinejudge.type.Problem):
         # example: https://www.codechef.com/JAN20A/problems/DYNAMO
         # example: https://www.codechef.com/JAN20A/submit/DYNAMO
         # example: https://www.codechef.com/JAN20A/status/DYNAMO
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'www.codechef.com':
             m = re.match(r'/([0-9A-Z_a-z-]+)/(?:problems|submit|status)/([0-9A-Z_a-z-]+)/?', result.path)
@@ -9,7 +9,6 @@ import datetime
 import json
 import re
 import string
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -75,7 +74,7 @@ class CodeforcesService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['CodeforcesService']:
         # example: https://codeforces.com/
         # example: http://codeforces.com/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in _CODEFORCES_DOMAINS:
             return cls()
@@ -187,7 +186,7 @@ class CodeforcesContest(onlinejudge.type.Contest):
 
     @classmethod
     def from_url(cls, url: str) -> Optional['CodeforcesContest']:
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in _CODEFORCES_DOMAINS:
             table = {}
@@ -381,7 +380,7 @@ class CodeforcesProblem(onlinejudge.type.Problem):
 
     @classmethod
     def from_url(cls, url: str) -> Optional['CodeforcesProblem']:
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in _CODEFORCES_DOMAINS:
             # "0" is needed. example: https://codeforces.com/contest/1000/problem/0
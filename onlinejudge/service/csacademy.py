@@ -5,7 +5,6 @@ the module for CS Academy (https://csacademy.com/)
 
 import json
 import re
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -28,7 +27,7 @@ class CSAcademyService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['CSAcademyService']:
         # example: https://csacademy.com/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('csacademy.com', 'www.csacademy.com'):
             return cls()
@@ -112,7 +111,7 @@ class CSAcademyProblem(onlinejudge.type.Problem):
         # example: https://csacademy.com/contest/round-38/task/path-union/discussion/
         # example: https://csacademy.com/contest/archive/task/swap_permutation/
         # example: https://csacademy.com/contest/archive/task/swap_permutation/statement/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('csacademy.com', 'www.csacademy.com'):
             m = re.match(r'^/contest/([0-9A-Za-z_-]+)/task/([0-9A-Za-z_-]+)(|/statement|/solution|/discussion|/statistics|/submissions)/?$', utils.normpath(result.path))
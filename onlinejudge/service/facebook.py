@@ -7,7 +7,6 @@ the module for Facebook Hacker Cup (https://www.facebook.com/hackercup/)
 """
 
 import json
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -31,7 +30,7 @@ class FacebookHackerCupService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['FacebookHackerCupService']:
         # old format
         # example: https://www.facebook.com/hackercup/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'www.facebook.com' \
                 and utils.normpath(result.path).startswith('/hackercup'):
@@ -115,7 +114,7 @@ class FacebookHackerCupProblem(onlinejudge.type.Problem):
     def from_url(cls, url: str) -> Optional['FacebookHackerCupProblem']:
         # removed format
         # example: https://www.facebook.com/hackercup/problem/448364075989193/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'www.facebook.com' \
                 and utils.normpath(result.path).startswith('/hackercup/problem/'):
@@ -8,7 +8,6 @@ import base64
 import json
 import re
 import string
-import urllib.parse
 from itertools import islice
 from logging import getLogger
 from typing import *
@@ -34,7 +33,7 @@ class GoogleCodeJamService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['GoogleCodeJamService']:
         # example: https://codingcompetitions.withgoogle.com/
         # example: https://code.google.com/codejam
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https'):
             if result.netloc == 'codingcompetitions.withgoogle.com':
                 return cls()
@@ -132,7 +131,7 @@ class GoogleCodeJamProblem(onlinejudge.type.Problem):
         # example: https://codingcompetitions.withgoogle.com/kickstart/round/000000000019ffc7/00000000001d3f56
         # example: https://code.google.com/codejam/contest/7234486/dashboard
         # example: https://code.google.com/codejam/contest/7234486/dashboard#s=p0
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https'):
             dirs = utils.normpath(result.path).split('/')
             if result.netloc == 'codingcompetitions.withgoogle.com':
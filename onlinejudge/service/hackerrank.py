@@ -5,13 +5,13 @@ the module for HackerRank (https://www.hackerrank.com/)
 
 import json
 import re
-import urllib.parse
 from logging import getLogger
 from typing import *
 
 import bs4
 import requests
 
+import onlinejudge._implementation.download
 import onlinejudge._implementation.testcase_zipper
 import onlinejudge._implementation.utils as utils
 import onlinejudge.dispatch
@@ -40,7 +40,7 @@ class HackerRankService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['HackerRankService']:
         # example: https://www.hackerrank.com/dashboard
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('hackerrank.com', 'www.hackerrank.com'):
             return cls()
@@ -63,12 +63,13 @@ class HackerRankProblem(onlinejudge.type.Problem):
         session = session or utils.get_default_session()
         # example: https://www.hackerrank.com/rest/contests/hourrank-1/challenges/beautiful-array/download_testcases
         url = 'https://www.hackerrank.com/rest/contests/{}/challenges/{}/download_testcases'.format(self.contest_slug, self.challenge_slug)
-        resp = utils.request('GET', url, session=session, raise_for_status=False)
-        if resp.status_code == 403:
-            logger.debug('HTML: %s', resp.content.decode())
-            raise onlinejudge.type.SampleParseError("Access Denied. Did you set your User-Agent?")
-        resp.raise_for_status()
-        return onlinejudge._implementation.testcase_zipper.extract_from_zip(resp.content, '%eput/%eput%s.txt')
+        try:
+            content = onlinejudge._implementation.download.download(url, session=session)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 403:
+                raise onlinejudge.type.SampleParseError("Access Denied. Did you set your User-Agent?")
+            raise
+        return onlinejudge._implementation.testcase_zipper.extract_from_zip(content, '%eput/%eput%s.txt')
 
     def get_url(self) -> str:
         if self.contest_slug == 'master':
@@ -83,7 +84,7 @@ class HackerRankProblem(onlinejudge.type.Problem):
     def from_url(cls, url: str) -> Optional['HackerRankProblem']:
         # example: https://www.hackerrank.com/contests/university-codesprint-2/challenges/the-story-of-a-tree
         # example: https://www.hackerrank.com/challenges/fp-hello-world
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('hackerrank.com', 'www.hackerrank.com'):
             m = re.match(r'^/contests/([0-9A-Za-z-]+)/challenges/([0-9A-Za-z-]+)(/problem)?/?$', utils.normpath(result.path))
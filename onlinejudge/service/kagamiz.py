@@ -3,7 +3,6 @@ the module for Kagamiz Contest System (https://kcs.miz-miz.biz/)
 """
 
 import json
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -27,7 +26,7 @@ class KagamizContestSystemService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['KagamizContestSystemService']:
         # example: https://kcs.miz-miz.biz/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') and result.netloc == 'kcs.miz-miz.biz':
             return cls()
         return None
@@ -132,7 +131,7 @@ class KagamizContestSystemProblem(onlinejudge.type.Problem):
 
     @classmethod
     def from_url(cls, url: str) -> Optional['KagamizContestSystemProblem']:
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
 
         # example: https://kcs.miz-miz.biz/contest/2000/view/A
         # example: https://kcs.miz-miz.biz/contest/2000/view/%5C
@@ -4,7 +4,6 @@ the module for Kattis (https://open.kattis.com/)
 """
 
 import re
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -33,7 +32,7 @@ class KattisService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['KattisService']:
         # example: https://open.kattis.com/
         # example: https://hanoi18.kattis.com/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc.endswith('.kattis.com'):
             # NOTE: ignore the subdomain
@@ -75,7 +74,7 @@ class KattisProblem(onlinejudge.type.Problem):
     def from_url(cls, url: str) -> Optional['KattisProblem']:
         # example: https://open.kattis.com/problems/hello
         # example: https://open.kattis.com/contests/asiasg15prelwarmup/problems/8queens
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc.endswith('.kattis.com'):
             m = re.match(r'(?:/contests/([0-9A-Z_a-z-]+))?/problems/([0-9A-Z_a-z-]+)/?', result.path)
@@ -9,7 +9,6 @@ import pathlib
 import re
 import subprocess
 import sys
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -33,7 +32,7 @@ class LibraryCheckerService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['LibraryCheckerService']:
         # example: https://judge.yosupo.jp/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'judge.yosupo.jp':
             return cls()
@@ -127,7 +126,7 @@ class LibraryCheckerProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, url: str) -> Optional['LibraryCheckerProblem']:
         # example: https://judge.yosupo.jp/problem/unionfind
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'judge.yosupo.jp':
             m = re.match(r'/problem/(\w+)/?', result.path)
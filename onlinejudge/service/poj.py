@@ -28,7 +28,7 @@ class POJService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['POJService']:
         # example: http://poj.org/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'poj.org':
             return cls()
@@ -93,7 +93,7 @@ class POJProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, url: str) -> Optional['POJProblem']:
         # example: http://poj.org/problem?id=2104
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'poj.org' \
                 and utils.normpath(result.path) == '/problem':
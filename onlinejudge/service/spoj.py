@@ -6,7 +6,6 @@ the module for Sphere Online Judge (https://www.spoj.com/)
 """
 
 import re
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -31,7 +30,7 @@ class SPOJService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['SPOJService']:
         # example: https://www.spoj.com/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc in ('www.spoj.com',):
             return cls()
@@ -87,7 +86,7 @@ class SPOJProblem(onlinejudge.type.Problem):
     @classmethod
     def from_url(cls, url: str) -> Optional['SPOJProblem']:
         # example: https://www.spoj.com/problems/PRIME1/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'www.spoj.com':
             m = re.match(r'/(?:problems)/([0-9A-Z_a-z-]+)/?', result.path)
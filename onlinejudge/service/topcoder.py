@@ -29,7 +29,7 @@ class TopcoderService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['TopcoderService']:
         # example: https://arena.topcoder.com/
         # example: https://community.topcoder.com/stat?c=problem_statement&pm=10760
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https'):
             if result.netloc in ('topcoder.com', 'arena.topcoder.com', 'community.topcoder.com'):
                 return cls()
@@ -177,7 +177,7 @@ class TopcoderProblem(onlinejudge.type.Problem):
     def from_url(cls, url: str) -> Optional['TopcoderProblem']:
         # example: https://arena.topcoder.com/index.html#/u/practiceCode/14230/10838/10760/1/303803
         # example: https://community.topcoder.com/stat?c=problem_statement&pm=10760
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https'):
             if result.netloc == 'arena.topcoder.com' and utils.normpath(result.path) in ('/', '/index.html'):
                 dirs = utils.normpath(result.fragment).split('/')
@@ -5,7 +5,6 @@ the module for Toph (https://toph.co/)
 
 import posixpath
 import re
-import urllib.parse
 from logging import getLogger
 from typing import *
 
@@ -41,7 +40,7 @@ class TophService(onlinejudge.type.Service):
     def from_url(cls, url: str) -> Optional['TophService']:
         # example: https://toph.co/
         # example: http://toph.co/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'toph.co':
             return cls()
@@ -138,7 +137,7 @@ class TophProblem(onlinejudge.type.Problem):
 
     @classmethod
     def from_url(cls, url: str) -> Optional['TophProblem']:
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         dirname, basename = posixpath.split(utils.normpath(result.path))
         # example: https://toph.co/p/new-year-couple
         if result.scheme in ('', 'http', 'https') \
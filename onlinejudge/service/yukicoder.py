@@ -8,12 +8,12 @@ the module for yukicoder (https://yukicoder.me/)
 
 import json
 import posixpath
-import urllib.parse
 from logging import getLogger
 from typing import *
 
 import bs4
 
+import onlinejudge._implementation.download
 import onlinejudge._implementation.testcase_zipper
 import onlinejudge._implementation.utils as utils
 import onlinejudge.dispatch
@@ -42,7 +42,7 @@ class YukicoderService(onlinejudge.type.Service):
     @classmethod
     def from_url(cls, url: str) -> Optional['YukicoderService']:
         # example: http://yukicoder.me/
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'yukicoder.me':
             return cls()
@@ -115,7 +115,7 @@ class YukicoderContest(onlinejudge.type.Contest):
     def from_url(cls, url: str) -> Optional['Contest']:
         # example: https://yukicoder.me/contests/276
         # example: http://yukicoder.me/contests/276/all
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         dirs = utils.normpath(result.path).split('/')
         if result.scheme in ('', 'http', 'https') and result.netloc == 'yukicoder.me':
             if len(dirs) >= 3 and dirs[1] == 'contests':
@@ -160,9 +160,9 @@ class YukicoderProblem(onlinejudge.type.Problem):
         if not self.get_service().is_logged_in(session=session):
             raise NotLoggedInError
         url = '{}/testcase.zip'.format(self.get_url())
-        resp = utils.request('GET', url, session=session)
+        content = onlinejudge._implementation.download.download(url, session=session)
         fmt = 'test_%e/%s'
-        return onlinejudge._implementation.testcase_zipper.extract_from_zip(resp.content, fmt, ignore_unmatched_samples=True)  # NOTE: yukicoder's test sets sometimes contain garbages. The owner insists that this is an intended behavior, so we need to ignore them.
+        return onlinejudge._implementation.testcase_zipper.extract_from_zip(content, fmt, ignore_unmatched_samples=True)  # NOTE: yukicoder's test sets sometimes contain garbages. The owner insists that this is an intended behavior, so we need to ignore them.
 
     def _parse_sample_tag(self, tag: bs4.Tag) -> Optional[Tuple[str, str]]:
         assert isinstance(tag, bs4.Tag)
@@ -233,7 +233,7 @@ class YukicoderProblem(onlinejudge.type.Problem):
     def from_url(cls, url: str) -> Optional['YukicoderProblem']:
         # example: https://yukicoder.me/problems/no/499
         # example: http://yukicoder.me/problems/1476
-        result = urllib.parse.urlparse(url)
+        result = utils.parse_url(url)
         dirname, basename = posixpath.split(utils.normpath(result.path))
         if result.scheme in ('', 'http', 'https') \
                 and result.netloc == 'yukicoder.me':
@@ -4,14 +4,18 @@ the module containing base types
 
 :note: Some methods are not implemented in subclasses.
     Please check the definitions of subclasses under :py:mod:`onlinejudge.service`.
+:note: Some methods have asynchronous variants with the suffix `_async` (e.g. :py:meth:`Problem.download_sample_cases_async`). They are not non-blocking I/O; they run the synchronous implementations on a shared thread pool with a fixed number of workers, which bounds the number of concurrent requests. Use :py:func:`onlinejudge.utils.set_async_max_workers` to change it.
+:note: To bound the time of methods which make many requests, use :py:func:`onlinejudge.utils.with_deadline` with the session given to them.
 """
 
 import datetime
 from abc import ABC, abstractmethod
-from typing import Callable, Iterator, List, NamedTuple, NewType, Optional, Sequence, Tuple
+from typing import AsyncIterator, Callable, Iterator, List, NamedTuple, NewType, Optional, Sequence, Tuple
 
 import requests
 
+import onlinejudge._implementation.async_utils as async_utils
+
 CredentialsProvider = Callable[[], Tuple[str, str]]
 
 
@@ -71,6 +75,12 @@ class Service(ABC):
         """
         raise NotImplementedError
 
+    def iterate_contests_async(self, *, session: Optional[requests.Session] = None) -> AsyncIterator['Contest']:
+        """
+        an asynchronous variant of :py:meth:`iterate_contests`
+        """
+        return async_utils.iterate(self.iterate_contests, session=session)
+
 
 TestCase = NamedTuple('TestCase', [
     ('name', str),
@@ -190,6 +200,24 @@ class Contest(ABC):
         """
         raise NotImplementedError
 
+    async def list_problems_async(self, *, session: Optional[requests.Session] = None) -> Sequence['Problem']:
+        """
+        an asynchronous variant of :py:meth:`list_problems`
+        """
+        return await async_utils.run(self.list_problems, session=session)
+
+    async def download_data_async(self, *, session: Optional[requests.Session] = None) -> ContestData:
+        """
+        an asynchronous variant of :py:meth:`download_data`
+        """
+        return await async_utils.run(self.download_data, session=session)
+
+    def iterate_submissions_async(self, *, session: Optional[requests.Session] = None) -> AsyncIterator['Submission']:
+        """
+        an asynchronous variant of :py:meth:`iterate_submissions`
+        """
+        return async_utils.iterate(self.iterate_submissions, session=session)
+
     @abstractmethod
     def get_url(self) -> str:
         raise NotImplementedError
@@ -274,6 +302,28 @@ class Problem(ABC):
     def get_available_languages(self, *, session: Optional[requests.Session] = None) -> List[Language]:
         raise NotImplementedError
 
+    async def download_sample_cases_async(self, *, session: Optional[requests.Session] = None) -> List[TestCase]:
+        """
+        an asynchronous variant of :py:meth:`download_sample_cases`
+
+        :raises SampleParseError:
+        """
+        return await async_utils.run(self.download_sample_cases, session=session)
+
+    async def download_system_cases_async(self, *, session: Optional[requests.Session] = None) -> List[TestCase]:
+        """
+        an asynchronous variant of :py:meth:`download_system_cases`
+
+        :raises NotLoggedInError:
+        """
+        return await async_utils.run(self.download_system_cases, session=session)
+
+    async def get_available_languages_async(self, *, session: Optional[requests.Session] = None) -> List[Language]:
+        """
+        an asynchronous variant of :py:meth:`get_available_languages`
+        """
+        return await async_utils.run(self.get_available_languages, session=session)
+
     @abstractmethod
     def get_url(self) -> str:
         raise NotImplementedError
@@ -291,6 +341,12 @@ class Problem(ABC):
         """
         raise NotImplementedError
 
+    async def download_data_async(self, *, session: Optional[requests.Session] = None) -> ProblemData:
+        """
+        an asynchronous variant of :py:meth:`download_data`
+        """
+        return await async_utils.run(self.download_data, session=session)
+
     def __repr__(self) -> str:
         return '{}.from_url({})'.format(self.__class__.__name__, repr(self.get_url()))
 
@@ -337,6 +393,12 @@ class Submission(ABC):
         """
         raise NotImplementedError
 
+    async def download_data_async(self, *, session: Optional[requests.Session] = None) -> SubmissionData:
+        """
+        an asynchronous variant of :py:meth:`download_data`
+        """
+        return await async_utils.run(self.download_data, session=session)
+
     @abstractmethod
     def get_url(self) -> str:
         raise NotImplementedError
@@ -6,11 +6,15 @@ the module for those who make programs using online-judge-tools as a library
 import contextlib
 import http
 import pathlib
+import time
+import weakref
 from logging import getLogger
 from typing import *
 
 import appdirs
 
+import onlinejudge._implementation.async_utils as async_utils
+import onlinejudge._implementation.profiling as profiling
 from onlinejudge.type import *
 
 logger = getLogger(__name__)
@@ -51,9 +55,70 @@ def with_cookiejar(session: requests.Session, *, path: pathlib.Path = default_co
     session.cookies = http.cookiejar.LWPCookieJar(str(path))  # type: ignore
     if path.exists():
         logger.info('load cookie from: %s', path)
-        session.cookies.load(ignore_discard=True)  # type: ignore
+        with profiling.phase('cookie.load'):
+            session.cookies.load(ignore_discard=True)  # type: ignore
     yield session
     logger.info('save cookie to: %s', path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    session.cookies.save(ignore_discard=True)  # type: ignore
-    path.chmod(0o600)  # NOTE: to make secure a little bit
+    with profiling.phase('cookie.save'):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        session.cookies.save(ignore_discard=True)  # type: ignore
+        path.chmod(0o600)  # NOTE: to make secure a little bit
+
+
+default_connect_timeout = 10.0  # in seconds
+default_read_timeout = 60.0  # in seconds; this bounds each read from the socket, not the whole transfer
+
+
+class DeadlineExceededError(requests.exceptions.Timeout):
+    def __init__(self, message: str = 'deadline exceeded'):
+        super().__init__(message)
+
+
+_DEADLINES = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+
+@contextlib.contextmanager
+def with_deadline(session: requests.Session, timeout: Optional[float]) -> Iterator[requests.Session]:
+    """
+    set a deadline to all requests made with the session in the with-block. Methods which make many requests (e.g. :py:meth:`onlinejudge.type.Problem.download_system_cases`) share the same deadline, and the remaining time is used as the connect and read timeouts of each request.
+
+    :param session: the session to set a deadline
+    :param timeout: the duration in seconds from now. If `None`, this does nothing.
+    :note: A nested deadline cannot extend the outer one.
+    """
+
+    if timeout is None:
+        yield session
+        return
+    previous = _DEADLINES.get(session)
+    deadline = time.monotonic() + timeout
+    if previous is not None:
+        deadline = min(deadline, previous)
+    _DEADLINES[session] = deadline
+    try:
+        yield session
+    finally:
+        if previous is None:
+            _DEADLINES.pop(session, None)
+        else:
+            _DEADLINES[session] = previous
+
+
+def get_remaining_time(session: requests.Session) -> Optional[float]:
+    """
+    :return: the remaining time in seconds until the deadline set with :py:func:`with_deadline`, or `None` if no deadline is set
+    """
+
+    deadline = _DEADLINES.get(session)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def set_async_max_workers(max_workers: int) -> None:
+    """set_async_max_workers() sets the number of threads for the asynchronous methods (e.g. :py:meth:`onlinejudge.type.Problem.download_sample_cases_async`).
+
+    They run the synchronous methods on a shared thread pool, so this is also the upper bound of the number of concurrent requests from them. The default is 16.
+    """
+
+    async_utils.set_max_workers(max_workers)
@@ -0,0 +1,125 @@
+import argparse
+import collections
+import concurrent.futures
+import json
+import sys
+import threading
+import urllib.parse
+from logging import getLogger
+from typing import *
+
+import onlinejudge_api.serve as serve
+import requests
+
+import onlinejudge._implementation.utils as utils
+
+logger = getLogger(__name__)
+
+METHODS = ('get-problem', 'get-contest', 'get-service')
+
+default_jobs = 8
+default_jobs_per_host = 2
+
+
+def get_host(args: List[str]) -> str:
+    """get_host() returns the host of the URL in the arguments of a subcommand. Requests are scheduled with this.
+    """
+
+    for arg in args:
+        if not arg.startswith('-'):
+            return urllib.parse.urlparse(arg).hostname or ''
+    return ''
+
+
+class HostScheduler:
+    """HostScheduler runs tasks with a thread pool, limiting the number of running tasks for each host.
+
+    Tasks waiting for busy hosts don't occupy threads, so tasks for other hosts are not blocked by them.
+    """
+    def __init__(self, *, jobs: int, jobs_per_host: int):
+        self.jobs_per_host = jobs_per_host
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        self._lock = threading.Lock()
+        self._running = collections.Counter()  # type: Counter[str]
+        self._pending = collections.defaultdict(collections.deque)  # type: Dict[str, Deque[Callable[[], None]]]
+        self._unfinished = 0
+        self._finished = threading.Condition(self._lock)
+
+    def submit(self, host: str, func: Callable[[], None]) -> None:
+        with self._lock:
+            self._unfinished += 1
+            if self._running[host] < self.jobs_per_host:
+                self._start(host, func)
+            else:
+                self._pending[host].append(func)
+
+    def _start(self, host: str, func: Callable[[], None]) -> None:
+        # this must be called with the lock
+        self._running[host] += 1
+        self._executor.submit(self._run, host, func)
+
+    def _run(self, host: str, func: Callable[[], None]) -> None:
+        try:
+            func()
+        except Exception:
+            logger.exception('an unexpected error in a task')
+        finally:
+            with self._lock:
+                self._running[host] -= 1
+                self._unfinished -= 1
+                if self._pending[host]:
+                    self._start(host, self._pending[host].popleft())
+                self._finished.notify_all()
+
+    def wait(self) -> None:
+        with self._lock:
+            while self._unfinished:
+                self._finished.wait()
+        self._executor.shutdown()
+
+
+def main(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser, session: requests.Session, run: Callable[..., Dict[str, Any]]) -> None:
+    """
+    :param parsed: the parsed global options. They are shared by all requests.
+    :param run: :py:func:`onlinejudge_api.main.run`
+    """
+
+    reader = sys.stdin if parsed.input is None else open(str(parsed.input))
+    writer = sys.stdout  # keep the original one, since parsing arguments redirects stdout
+    writer_lock = threading.Lock()
+
+    def write(response: Dict[str, Any]) -> None:
+        with writer_lock:
+            writer.write(json.dumps(response) + '\n')
+            writer.flush()
+
+    with utils.with_cookiejar(session, path=parsed.cookie) as session, utils.with_deadline(session, parsed.timeout):
+        scheduler = HostScheduler(jobs=parsed.jobs, jobs_per_host=parsed.jobs_per_host)
+        for line in reader:
+            if not line.strip():
+                continue
+            request = serve.parse_request(line, methods=METHODS)
+            if 'error' in request:
+                write(request)
+                continue
+            parsed_request = serve.parse_arguments(parser, [request['method'], *request['params']], namespace=parsed)
+            if isinstance(parsed_request, dict):
+                write(serve.make_response(request.get('id'), parsed_request))
+                continue
+            parsed_request.timeout = None  # the deadline is set for the whole batch
+
+            def task(request: Dict[str, Any] = request, parsed_request: argparse.Namespace = parsed_request) -> None:
+                try:
+                    result = run(parsed_request, parser=parser, session=session)
+                except BaseException as e:  # run() catches usual exceptions, but keep other requests running in any case
+                    result = {
+                        "status": "error",
+                        "messages": ['{}: {}'.format(type(e).__name__, e)],
+                        "result": None,
+                    }
+                write(serve.make_response(request.get('id'), result))
+
+            scheduler.submit(get_host(request['params']), task)
+        scheduler.wait()
+    if reader is not sys.stdin:
+        reader.close()
@@ -1,9 +1,17 @@
+from logging import getLogger
 from typing import *
 
-from onlinejudge.service.atcoder import AtCoderContest
-from onlinejudge.service.codeforces import CodeforcesContest
+import onlinejudge_api.stream as stream
+
+from onlinejudge.service import lazy_isinstance
 from onlinejudge.type import *
 
+if TYPE_CHECKING:
+    from onlinejudge.service.atcoder import AtCoderContest
+    from onlinejudge.service.codeforces import CodeforcesContest
+
+logger = getLogger(__name__)
+
 schema_example = {
     "url": "https://atcoder.jp/contests/cf16-exhibition",
     "name": "CODE FESTIVAL 2016 Exhibition",
@@ -73,6 +81,22 @@ schema = {
                             },
                         },
                     },
+                    "tests": {
+                        "type": "array",
+                        "description": "sample cases, when --with-samples is given",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "input": {
+                                    "type": "string",
+                                },
+                                "output": {
+                                    "type": "string",
+                                },
+                            },
+                            "required": ["input", "output"],
+                        },
+                    },
                 },
                 "required": ["url", "name", "context"],
             },
@@ -82,21 +106,42 @@ schema = {
 }  # type: Dict[str, Any]
 
 
-def main(contest: Contest, *, is_full: bool, session: requests.Session) -> Dict[str, Any]:
+def _get_tests(tests: Sequence[TestCase]) -> List[Dict[str, str]]:
+    return [{
+        "input": test.input_data.decode(),
+        "output": test.output_data.decode(),
+    } for test in tests]
+
+
+def _download_tests(problem: Problem, *, session: requests.Session) -> Optional[List[Dict[str, str]]]:
+    try:
+        return _get_tests(problem.download_sample_cases(session=session))
+    except SampleParseError as e:
+        logger.warning('failed to parse samples of %s: %s', problem.get_url(), e)
+        return None
+
+
+def main(contest: Contest, *, is_full: bool, session: requests.Session, emit: Optional[stream.EmitFunction] = None, with_samples: bool = False) -> Dict[str, Any]:
     """
+    :param emit: stream problems with this, instead of putting them into the result
+    :param with_samples: add sample cases to problems. For AtCoder, they are downloaded from the printable page of all tasks with a single request. `tests` is omitted for problems whose samples cannot be parsed.
     :raises Exception:
     """
 
     result = {
         "url": contest.get_url(),
-        "problems": [],
     }  # type: Dict[str, Any]
+    append_problem = stream.get_appender(result, 'problems', emit=emit)
 
     data = None  # type: Optional[ContestData]
     problem_data = None  # type: Optional[ProblemData]
-    if isinstance(contest, AtCoderContest):
+    if lazy_isinstance(contest, 'onlinejudge.service.atcoder.AtCoderContest'):
+        contest = cast('AtCoderContest', contest)
         data = contest.download_data(session=session)
         result["name"] = data.name
+        all_sample_cases = {}  # type: Dict[str, Optional[List[TestCase]]]
+        if with_samples:
+            all_sample_cases = contest.download_all_sample_cases(session=session)
         for problem_data in contest.list_problem_data(session=session):
             problem = problem_data.problem  # type: Problem
             data_ = {
@@ -110,13 +155,23 @@ def main(contest: Contest, *, is_full: bool, session: requests.Session) -> Dict[
                     "alphabet": problem_data.alphabet,
                 },
             }  # type: Dict[str, Any]
-            result["problems"].append(data_)
+            if with_samples:
+                # fall back to the page of the problem only when it is missing on the printable page
+                if problem_data.alphabet in all_sample_cases:
+                    sample_cases = all_sample_cases[problem_data.alphabet]
+                    tests = None if sample_cases is None else _get_tests(sample_cases)
+                else:
+                    tests = _download_tests(problem, session=session)
+                if tests is not None:
+                    data_["tests"] = tests
+            append_problem(data_)
         if is_full:
             result["raw"] = {
                 "html": data.html.decode(),
             }
 
-    elif isinstance(contest, CodeforcesContest):
+    elif lazy_isinstance(contest, 'onlinejudge.service.codeforces.CodeforcesContest'):
+        contest = cast('CodeforcesContest', contest)
         data = contest.download_data(session=session)
         result["name"] = data.name
         for problem_data in contest.list_problem_data(session=session):
@@ -131,8 +186,12 @@ def main(contest: Contest, *, is_full: bool, session: requests.Session) -> Dict[
                     },
                     "alphabet": problem.index,
                 },
-            }
-            result["problems"].append(data_)
+            }  # type: Dict[str, Any]
+            if with_samples:
+                tests = _download_tests(problem, session=session)
+                if tests is not None:
+                    data_["tests"] = tests
+            append_problem(data_)
         if is_full:
             result["raw"] = {
                 "json": data.json.decode(),
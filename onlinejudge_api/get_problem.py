@@ -1,13 +1,22 @@
+import pathlib
 from logging import getLogger
 from typing import *
 
-from onlinejudge.service.atcoder import AtCoderProblem
-from onlinejudge.service.codeforces import CodeforcesProblem
-from onlinejudge.service.topcoder import TopcoderProblem
+import onlinejudge_api.stream as stream
+
+import onlinejudge._implementation.format_utils as format_utils
+from onlinejudge.service import lazy_isinstance
 from onlinejudge.type import *
 
+if TYPE_CHECKING:
+    from onlinejudge.service.atcoder import AtCoderProblem, AtCoderProblemDetailedData
+    from onlinejudge.service.codeforces import CodeforcesProblem
+    from onlinejudge.service.topcoder import TopcoderProblem
+
 logger = getLogger()
 
+default_format = '%s.%e'
+
 schema_example = {
     "url": "https://atcoder.jp/contests/abc160/tasks/abc160_c",
     "name": "Traveling Salesman around Lake",
@@ -87,8 +96,31 @@ schema = {
                     "output": {
                         "type": "string",
                     },
+                    "inputPath": {
+                        "type": "string",
+                        "description": "the path of the file of the input, when --output-dir is given",
+                    },
+                    "outputPath": {
+                        "type": "string",
+                        "description": "the path of the file of the output, when --output-dir is given",
+                    },
+                    "inputSize": {
+                        "type": "integer",
+                        "description": "in bytes",
+                    },
+                    "outputSize": {
+                        "type": "integer",
+                        "description": "in bytes",
+                    },
                 },
-                "required": ["input", "output"],
+                "anyOf": [
+                    {
+                        "required": ["input", "output"],
+                    },
+                    {
+                        "required": ["inputPath", "outputPath", "inputSize", "outputSize"],
+                    },
+                ],
             },
             "examples": [
                 [
@@ -280,40 +312,95 @@ def translate_to_competitive_companion_format(data: Dict[str, Any]) -> Dict[str,
     }
 
 
-def main(problem: Problem, *, is_system: bool, is_compatibility: bool, is_full: bool, session: requests.Session) -> Dict[str, Any]:
+def write_test_cases(tests: Sequence[TestCase], *, directory: pathlib.Path, format: str, is_system: bool) -> Iterator[Dict[str, Any]]:
+    """write_test_cases() writes test cases to files with the same layout as `oj download`, and yields their paths and sizes one by one.
+
+    The data are written as bytes, so this works for test cases which are not valid UTF-8.
+
+    :param format: the format of paths like `%s.%e`. `%s` is the name of the test case and `%e` is `in` or `out`.
+    :raises FileExistsError: if some files already exist. Nothing is written in this case.
+    """
+    def get_path(name: str, ext: str) -> pathlib.Path:
+        path = format_utils.path_from_format(directory, format, name=name, ext=ext)
+        if directory.resolve() not in path.resolve().parents:
+            raise ValueError('the path of a test case is out of the directory: {}'.format(path))
+        return path
+
+    names = [test.name if is_system else 'sample-{}'.format(i + 1) for i, test in enumerate(tests)]
+    for name in names:
+        for ext in ('in', 'out'):
+            path = get_path(name, ext)
+            if path.exists():
+                raise FileExistsError('the file already exists: {}'.format(path))
+
+    for name, test in zip(names, tests):
+        result = {}  # type: Dict[str, Any]
+        if is_system:
+            result['name'] = test.name
+        for ext, key, data in (('in', 'input', test.input_data), ('out', 'output', test.output_data)):
+            path = get_path(name, ext)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(str(path), 'wb') as fh:
+                fh.write(data)
+            logger.info('saved: %s', path)
+            result[key + 'Path'] = str(path)
+            result[key + 'Size'] = len(data)
+        yield result
+
+
+def main(problem: Problem, *, is_system: bool, is_compatibility: bool, is_full: bool, session: requests.Session, output_dir: Optional[pathlib.Path] = None, format: str = default_format, emit: Optional[stream.EmitFunction] = None) -> Dict[str, Any]:
     """
+    :param output_dir: write test cases to files in the directory, and put only their paths and sizes into the result
+    :param emit: stream test cases with this, instead of putting them into the result. Test cases are emitted before other data are downloaded.
     :raises Exception:
     """
 
     result = {
         "url": problem.get_url(),
-        "tests": [],
     }  # type: Dict[str, Any]
+    append_test = stream.get_appender(result, 'tests', emit=emit)
 
     # download test cases
+    data = None  # type: Optional[ProblemData]
+    contest_data = None  # type: Optional[ContestData]
     if is_system:
         tests = problem.download_system_cases(session=session)
+    elif lazy_isinstance(problem, 'onlinejudge.service.atcoder.AtCoderProblem'):
+        # the task page has samples, metadata and the contest name, so get it only once
+        data = cast('AtCoderProblem', problem).download_data(session=session)
+        if data.sample_cases is not None:
+            tests = data.sample_cases
+        else:
+            tests = problem.download_sample_cases(session=session)  # raise the error of parsing
     else:
         tests = problem.download_sample_cases(session=session)
-    for test in tests:
-        result_ = {
-            "input": test.input_data.decode(),
-            "output": test.output_data.decode(),
-        }
-        if is_system:
-            result_['name'] = test.name
-        result['tests'].append(result_)
+    if output_dir is not None:
+        for result_ in write_test_cases(tests, directory=output_dir, format=format, is_system=is_system):
+            append_test(result_)
+    else:
+        for test in tests:
+            result_ = {
+                "input": test.input_data.decode(),
+                "output": test.output_data.decode(),
+            }
+            if is_system:
+                result_['name'] = test.name
+            append_test(result_)
 
     # download detailed result
-    data = None  # type: Optional[ProblemData]
-    contest_data = None  # type: Optional[ContestData]
-    if isinstance(problem, AtCoderProblem):
-        data = problem.download_data(session=session)
-        contest_data = problem.get_contest().download_data(session=session)
+    if lazy_isinstance(problem, 'onlinejudge.service.atcoder.AtCoderProblem'):
+        problem = cast('AtCoderProblem', problem)
+        if data is None:
+            data = problem.download_data(session=session)
+        data = cast('AtCoderProblemDetailedData', data)
+        contest_name = data.contest_name
+        if contest_name is None:
+            contest_data = problem.get_contest().download_data(session=session)
+            contest_name = contest_data.name
         result["name"] = data.name
         result["context"] = {
             "contest": {
-                "name": contest_data.name,
+                "name": contest_name,
                 "url": problem.get_contest().get_url(),
             },
             "alphabet": data.alphabet,
@@ -325,32 +412,35 @@ def main(problem: Problem, *, is_system: bool, is_compatibility: bool, is_full:
                 "html": data.html.decode(),
             }
 
-    elif isinstance(problem, CodeforcesProblem) and problem.kind not in {'problemset', 'edu'}:
-        try:
-            data = problem.download_data(session=session)
-        except Exception as e:
-            logger.exception(e)
-        try:
-            contest_data = problem.get_contest().download_data(session=session)
-        except Exception as e:
-            logger.exception(e)
-        result["context"] = {
-            "contest": {
-                "url": problem.get_contest().get_url(),
-            },
-            "alphabet": problem.index,
-        }
-        if data is not None:
-            result["name"] = data.name
-        if contest_data is not None:
-            result["context"]["contest"]["name"] = contest_data.name
-        if is_full:
-            if data is not None and data.json is not None:
-                result["raw"] = {
-                    "json": data.json.decode(),
-                }
+    elif lazy_isinstance(problem, 'onlinejudge.service.codeforces.CodeforcesProblem'):
+        problem = cast('CodeforcesProblem', problem)
+        if problem.kind not in {'problemset', 'edu'}:
+            try:
+                data = problem.download_data(session=session)
+            except Exception as e:
+                logger.exception(e)
+            try:
+                contest_data = problem.get_contest().download_data(session=session)
+            except Exception as e:
+                logger.exception(e)
+            result["context"] = {
+                "contest": {
+                    "url": problem.get_contest().get_url(),
+                },
+                "alphabet": problem.index,
+            }
+            if data is not None:
+                result["name"] = data.name
+            if contest_data is not None:
+                result["context"]["contest"]["name"] = contest_data.name
+            if is_full:
+                if data is not None and data.json is not None:
+                    result["raw"] = {
+                        "json": data.json.decode(),
+                    }
 
-    elif isinstance(problem, TopcoderProblem):
+    elif lazy_isinstance(problem, 'onlinejudge.service.topcoder.TopcoderProblem'):
+        problem = cast('TopcoderProblem', problem)
         definition = problem._download_data(session=session).definition
         result["name"] = definition["class"]
         if is_full:
@@ -363,7 +453,13 @@ def main(problem: Problem, *, is_system: bool, is_compatibility: bool, is_full:
 
     if is_full:
         try:
-            available_languages = problem.get_available_languages(session=session)
+            if lazy_isinstance(data, 'onlinejudge.service.atcoder.AtCoderProblemDetailedData'):
+                # reuse the task page, as AtCoderProblem.get_available_languages() does
+                available_languages = cast('AtCoderProblemDetailedData', data).available_languages
+                if available_languages is None:
+                    raise NotLoggedInError
+            else:
+                available_languages = problem.get_available_languages(session=session)
         except Exception as e:
             logger.warning("failed to list available languages: %s", e)
         else:
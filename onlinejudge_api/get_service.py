@@ -1,10 +1,21 @@
+import collections
+import concurrent.futures
+import datetime
 from logging import getLogger
 from typing import *
 
+import onlinejudge_api.stream as stream
+
+from onlinejudge.service import lazy_isinstance
 from onlinejudge.type import *
 
+if TYPE_CHECKING:
+    from onlinejudge.service.atcoder import AtCoderService
+
 logger = getLogger()
 
+default_jobs = 4  # the number of concurrent requests to get names of contests which are not in the lists of contests
+
 schema_example = {
     "url": "https://atcoder.jp/",
     "name": "AtCoder",
@@ -59,8 +70,79 @@ schema = {
 }  # type: Dict[str, Any]
 
 
-def main(service: Service, *, does_list_contests: bool, session: requests.Session) -> Dict[str, Any]:
+def _iterate_atcoder_contests_with_english_names(service: 'AtCoderService', *, session: requests.Session) -> Iterator[Tuple[Contest, Optional[str]]]:
+    """_iterate_atcoder_contests_with_english_names() lists contests in the archive with `lang=ja`, which includes some Japanese-local contests, and takes their names from the archive with `lang=en` by contest ids.
+
+    Both archives list newer contests first, so they are read side by side, and the English one is read only as far as the current contest.
+    Names of contests which are not in the English archive are left in Japanese.
+    """
+
+    english = service.iterate_contest_data(lang='en', session=session)
+    english_names = {}  # type: Dict[str, str]
+    english_oldest = None  # type: Optional[datetime.datetime]
+    try:
+        for data in service.iterate_contest_data(lang='ja', session=session):
+            while data.contest.contest_id not in english_names and (english_oldest is None or english_oldest >= data.start_time):
+                english_data = next(english, None)
+                if english_data is None:
+                    english_oldest = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)  # the end of the archive
+                    break
+                english_names[english_data.contest.contest_id] = english_data.name
+                english_oldest = english_data.start_time
+            yield data.contest, english_names.pop(data.contest.contest_id, data.name)
+    finally:
+        english.close()
+
+
+def _iterate_contests_with_names(service: Service, *, session: requests.Session, jobs: int) -> Iterator[Tuple[Contest, str]]:
+    """_iterate_contests_with_names() lists contests with their names, in the order of the service.
+
+    Names in the lists of contests (`iterate_contest_data()`) are used if available. Otherwise, the data of contests are downloaded concurrently with at most `jobs` requests.
+    """
+
+    iterate_contest_data = getattr(service, 'iterate_contest_data', None)
+    if lazy_isinstance(service, 'onlinejudge.service.atcoder.AtCoderService'):
+        items = _iterate_atcoder_contests_with_english_names(cast('AtCoderService', service), session=session)  # type: Iterator[Tuple[Contest, Optional[str]]]
+    elif iterate_contest_data is not None:
+        items = ((data.contest, data.name) for data in iterate_contest_data(session=session))
+    else:
+        items = ((contest, None) for contest in service.iterate_contests(session=session))
+
+    executor = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+    window = collections.deque()  # type: Deque[Tuple[Contest, Union[str, concurrent.futures.Future]]]
+    running = 0
+    try:
+        for contest, name in items:
+            if name:
+                window.append((contest, name))
+            else:
+                if executor is None:
+                    executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+                window.append((contest, executor.submit(lambda contest: contest.download_data(session=session).name, contest)))
+                running += 1
+
+            # yield contests in order, waiting for the oldest request only when too many requests are running
+            while window and (isinstance(window[0][1], str) or window[0][1].done() or running >= jobs):
+                contest, name_or_future = window.popleft()
+                if not isinstance(name_or_future, str):
+                    running -= 1
+                    name_or_future = name_or_future.result()
+                yield contest, name_or_future
+
+        while window:
+            contest, name_or_future = window.popleft()
+            yield contest, (name_or_future if isinstance(name_or_future, str) else name_or_future.result())
+    finally:
+        if executor is not None:
+            for _, name_or_future in window:
+                if not isinstance(name_or_future, str):
+                    name_or_future.cancel()
+            executor.shutdown()
+
+
+def main(service: Service, *, does_list_contests: bool, session: requests.Session, emit: Optional[stream.EmitFunction] = None, jobs: int = default_jobs) -> Dict[str, Any]:
     """
+    :param emit: stream contests with this, instead of putting them into the result
     :raises Exception:
     """
 
@@ -70,12 +152,11 @@ def main(service: Service, *, does_list_contests: bool, session: requests.Sessio
     }  # type: Dict[str, Any]
 
     if does_list_contests:
-        contests = []
-        for contest in service.iterate_contests(session=session):
-            contests.append({
+        append_contest = stream.get_appender(result, 'contests', emit=emit)
+        for contest, name in _iterate_contests_with_names(service, session=session, jobs=jobs):
+            append_contest({
                 "url": contest.get_url(),
-                "name": contest.download_data().name,
+                "name": name,
             })
-        result['contests'] = contests
 
     return result
@@ -22,40 +22,108 @@ import os
 import pathlib
 import sys
 import textwrap
-import time
 import traceback
 from logging import DEBUG, INFO, basicConfig, getLogger
 from typing import *
 
-import jsonschema
+import onlinejudge_api.batch as batch
 import onlinejudge_api.get_contest as get_contest
 import onlinejudge_api.get_problem as get_problem
 import onlinejudge_api.get_service as get_service
 import onlinejudge_api.guess_language_id as guess_language_id
 import onlinejudge_api.login_service as login_service
+import onlinejudge_api.prefetch as prefetch
+import onlinejudge_api.serve as serve
+import onlinejudge_api.stream as stream
 import onlinejudge_api.submit_code as submit_code
 import requests
 
+import onlinejudge._implementation.cassette as cassette
+import onlinejudge._implementation.http_cache as http_cache
+import onlinejudge._implementation.profiling as profiling
+import onlinejudge._implementation.rate_limit as rate_limit
 import onlinejudge._implementation.utils as utils
 import onlinejudge.dispatch as dispatch
 from onlinejudge.__about__ import __package_name__, __version__
-from onlinejudge.service.yukicoder import YukicoderProblem, YukicoderService
 from onlinejudge.type import *
 
 logger = getLogger(__name__)
 
 
+class _HelpFormatter(argparse.RawTextHelpFormatter):
+    """_HelpFormatter accepts functions as texts, to build long epilogs only when they are printed.
+    """
+    def add_text(self, text: Union[None, str, Callable[[], str]]) -> None:
+        if callable(text):
+            text = text()
+        super().add_text(text)
+
+
+def _lazy_epilog(template: str, *, schema: Dict[str, Any], schema_example: Dict[str, Any]) -> Callable[[], str]:
+    def format_epilog() -> str:
+        return template.format(
+            textwrap.indent(json.dumps(schema, indent=2), '  '),
+            textwrap.indent(json.dumps(schema_example, indent=2), '  '),
+        )
+
+    return format_epilog
+
+
+def check_schema_examples() -> None:
+    """check_schema_examples() checks that the JSON examples in help messages satisfy the JSON schemas.
+
+    :raises jsonschema.exceptions.ValidationError:
+    """
+
+    import jsonschema  # pylint: disable=import-outside-toplevel
+
+    for module in (get_problem, get_contest, get_service, login_service, submit_code, guess_language_id, prefetch):
+        jsonschema.validate(module.schema_example, module.schema)
+
+
+_validators = {}  # type: Dict[int, Any]
+
+
+def _validate_result(result: Any, schema: Dict[str, Any]) -> None:
+    """_validate_result() checks the result only in the verbose mode, since violations are only logged.
+    """
+
+    if not logger.isEnabledFor(DEBUG):
+        return
+    import jsonschema  # pylint: disable=import-outside-toplevel
+
+    validator = _validators.get(id(schema))
+    if validator is None:
+        validator = jsonschema.validators.validator_for(schema)(schema)
+        _validators[id(schema)] = validator
+    error = jsonschema.exceptions.best_match(validator.iter_errors(result))
+    if error is not None:
+        logger.debug('%s', error)
+
+
 def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description='Tools for online judge services')
     parser.add_argument('-v', '--verbose', action='store_true')
     parser.add_argument('--cookie', type=pathlib.Path, default=utils.default_cookie_path, help='specify the path to the cookie.jar. (default: {})'.format(utils.default_cookie_path))
-    parser.add_argument('--wait', type=float, default=1.0, help='specify the duration to sleep to prevent impolite scraping. Please set --wait=0.0 after understanding why this option exists.  (default: 1.0)')
+    parser.add_argument('--wait', type=float, default=1.0, help='specify the minimum interval between requests to the same host, to prevent impolite scraping. This is shared among processes, and requests served from --http-cache are not delayed. Please set --wait=0.0 after understanding why this option exists.  (default: 1.0)')
+    parser.add_argument('--http-cache', action='store_true', help='cache HTTP responses on disk and revalidate them with ETag and Last-Modified')
+    parser.add_argument('--http-cache-dir', type=pathlib.Path, default=http_cache.default_cache_dir, help='specify the directory for --http-cache.  (default: {})'.format(http_cache.default_cache_dir))
+    parser.add_argument('--http-cache-size', type=float, default=http_cache.default_max_bytes / 1024 / 1024, help='specify the maximum size of --http-cache in MiB. Least recently used responses are evicted.  (default: {})'.format(http_cache.default_max_bytes // 1024 // 1024))
+    parser.add_argument('--http-cache-ttl', type=float, default=0.0, help='treat responses cached with --http-cache as fresh for the given seconds, i.e. use them without revalidation, unless they specify their own lifetimes with Cache-Control or Expires. Responses which set new cookies (e.g. login forms for new sessions) are always revalidated, and redirected responses are not cached.  (default: 0.0)')
+    parser.add_argument('--stream', action='store_true', help='print the result as newline-delimited JSON records; a header, items of lists (test cases, problems or contests) as soon as they are available, and a trailer with the status. This is ignored by serve and batch.')
+    parser.add_argument('--profile', action='store_true', help='print the profile as JSON to stderr; the time of each phase (dispatch, cookie.load, cookie.save, validation, encoding), network requests, and HTML/JSON parsing in each function')
+    parser.add_argument('--profile-output', type=pathlib.Path, help='write the raw cProfile data to the file, to read it with pstats or snakeviz. This implies --profile.')
+    parser.add_argument('--timeout', type=float, help='specify the deadline of the whole command in seconds. Each request also has connect/read timeouts.  (default: no deadline)')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', type=pathlib.Path, default=os.environ.get('OJ_API_RECORD'), help='record HTTP interactions to the given cassette file.  (default: $OJ_API_RECORD)')
+    group.add_argument('--replay', type=pathlib.Path, default=os.environ.get('OJ_API_REPLAY'), help='replay HTTP interactions from the given cassette file instead of accessing the network.  (default: $OJ_API_REPLAY)')
+    parser.add_argument('--replay-latency', type=float, default=0.0, help='specify the simulated latency for --replay in seconds. Use a negative value to use the recorded latencies.  (default: 0.0)')
     parser.add_argument('--user-agent', help="specify the User Agent. We recommend you set this because some websites ban the default User Agent of Python's requests library.  (default: {})".format(requests.utils.default_user_agent()))
     parser.add_argument('--yukicoder-token', help='specify the token of yukicoder. This option is a dummy. For a security reason, use the $YUKICODER_TOKEN envvar.  (default: $YUKICODER_TOKEN)')
     subparsers = parser.add_subparsers(dest='subcommand', help='for details, see "{} COMMAND --help"'.format(sys.argv[0]))
 
     # get-problem
-    epilog = textwrap.dedent("""\
+    epilog = _lazy_epilog(textwrap.dedent("""\
         supported services:
           Aizu Online Judge
           Anarchy Golf
@@ -84,21 +152,19 @@ def get_parser() -> argparse.ArgumentParser:
 
         JSON sample:
         {}
-        """).format(
-        textwrap.indent(json.dumps(get_problem.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(get_problem.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(get_problem.schema_example, get_problem.schema)
+        """), schema=get_problem.schema, schema_example=get_problem.schema_example)
 
-    subparser = subparsers.add_parser('get-problem', help='get information about a problem', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('get-problem', help='get information about a problem', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url')
     subparser.add_argument('--system', action='store_true', help='download system testcases')
     group = subparser.add_mutually_exclusive_group()
     group.add_argument('--full', action='store_true')
     group.add_argument('--compatibility', action='store_true', help='add and fix some fields for compatibility to competitive-companion')
+    subparser.add_argument('--output-dir', type=pathlib.Path, help='write test cases as files into the directory, and print only their paths and sizes. Test cases which are not valid UTF-8 are also available with this.')
+    subparser.add_argument('--format', default=get_problem.default_format, help='specify the format of paths of test cases for --output-dir, like `oj download`.  (default: {})'.format(get_problem.default_format.replace('%', '%%')))
 
     # get-contest
-    epilog = textwrap.dedent('''\
+    epilog = _lazy_epilog(textwrap.dedent('''\
         supported services:
           AtCoder
           Codeforces
@@ -109,18 +175,15 @@ def get_parser() -> argparse.ArgumentParser:
 
         JSON example:
         {}
-        ''').format(
-        textwrap.indent(json.dumps(get_contest.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(get_contest.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(get_contest.schema_example, get_contest.schema)
+        '''), schema=get_contest.schema, schema_example=get_contest.schema_example)
 
-    subparser = subparsers.add_parser('get-contest', help='get information about a contest', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('get-contest', help='get information about a contest', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url')
     subparser.add_argument('--full', action='store_true')
+    subparser.add_argument('--with-samples', action='store_true', help='add sample cases to problems. For AtCoder, they are downloaded with a single request.')
 
     # get-service
-    epilog = textwrap.dedent('''\
+    epilog = _lazy_epilog(textwrap.dedent('''\
         supported services:
           all services
 
@@ -129,18 +192,14 @@ def get_parser() -> argparse.ArgumentParser:
 
         JSON example:
         {}
-        ''').format(
-        textwrap.indent(json.dumps(get_service.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(get_service.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(get_service.schema_example, get_service.schema)
+        '''), schema=get_service.schema, schema_example=get_service.schema_example)
 
-    subparser = subparsers.add_parser('get-service', help='get information about a service', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('get-service', help='get information about a service', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url')
     subparser.add_argument('--list-contests', action='store_true')
 
     # login-service
-    epilog = textwrap.dedent('''\
+    epilog = _lazy_epilog(textwrap.dedent('''\
         supported services (password):
           AtCoder
           Codeforces
@@ -150,20 +209,16 @@ def get_parser() -> argparse.ArgumentParser:
 
         JSON example:
         {}
-        ''').format(
-        textwrap.indent(json.dumps(login_service.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(login_service.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(login_service.schema_example, login_service.schema)
+        '''), schema=login_service.schema, schema_example=login_service.schema_example)
 
-    subparser = subparsers.add_parser('login-service', help='login to a service', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('login-service', help='login to a service', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url')
     subparser.add_argument('--username', default=os.environ.get('USERNAME'), help='specify the username.  (default: $USERNAME)')
     subparser.add_argument('--password', help="specify the password. This option is a dummy. For a security reason, use the $PASSWORD envvar.  (default: $PASSWORD)")
     subparser.add_argument('--check', action='store_true', help='check whether you are logged in or not')
 
     # submit-code
-    epilog = textwrap.dedent('''\
+    epilog = _lazy_epilog(textwrap.dedent('''\
         supported services:
           AtCoder
           Codeforces
@@ -177,40 +232,92 @@ def get_parser() -> argparse.ArgumentParser:
 
         JSON example:
         {}
-        ''').format(
-        textwrap.indent(json.dumps(submit_code.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(submit_code.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(submit_code.schema_example, submit_code.schema)
+        '''), schema=submit_code.schema, schema_example=submit_code.schema_example)
 
-    subparser = subparsers.add_parser('submit-code', help='submit your solution', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('submit-code', help='submit your solution', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url', help='the URL of the problem to submit')
     subparser.add_argument('--file', required=True, type=pathlib.Path)
     subparser.add_argument('--language', required=True, type=LanguageId, help='''a language ID; you can get the values from "availableLanguages" field of "get-problem" subcommand with "--full" option''')
 
     # guess-language-id
-    epilog = textwrap.dedent('''\
+    epilog = _lazy_epilog(textwrap.dedent('''\
         JSON schema:
         {}
 
         JSON example:
         {}
-        ''').format(
-        textwrap.indent(json.dumps(guess_language_id.schema, indent=2), '  '),
-        textwrap.indent(json.dumps(guess_language_id.schema_example, indent=2), '  '),
-    )
-    jsonschema.validate(guess_language_id.schema_example, guess_language_id.schema)
+        '''), schema=guess_language_id.schema, schema_example=guess_language_id.schema_example)
 
-    subparser = subparsers.add_parser('guess-language-id', help='guess the language id for your solution', formatter_class=argparse.RawTextHelpFormatter, epilog=epilog)
+    subparser = subparsers.add_parser('guess-language-id', help='guess the language id for your solution', formatter_class=_HelpFormatter, epilog=epilog)
     subparser.add_argument('url', help='the URL of the problem to submit')
     subparser.add_argument('--file', required=True, type=pathlib.Path)
 
+    # prefetch
+    epilog = _lazy_epilog(textwrap.dedent('''\
+        This downloads everything which "get-problem --full" downloads for all problems in the contest, and stores the responses into the HTTP cache. --http-cache is implied.
+        Use --http-cache-ttl both here and for later commands to use the stored responses without revalidation.
+
+        example:
+          $ oj-api --http-cache-ttl 3600 prefetch https://atcoder.jp/contests/abc160
+          $ oj-api --http-cache --http-cache-ttl 3600 get-problem https://atcoder.jp/contests/abc160/tasks/abc160_a
+
+        supported services:
+          AtCoder
+          Codeforces
+          yukicoder
+
+        JSON schema:
+        {}
+
+        JSON example:
+        {}
+        '''), schema=prefetch.schema, schema_example=prefetch.schema_example)
+
+    subparser = subparsers.add_parser('prefetch', help='download all problems in a contest into the HTTP cache', formatter_class=_HelpFormatter, epilog=epilog)
+    subparser.add_argument('url', help='the URL of the contest')
+    subparser.add_argument('-j', '--jobs', type=int, default=prefetch.default_jobs, help='the number of problems downloaded concurrently.  (default: {})'.format(prefetch.default_jobs))
+    subparser.add_argument('--jobs-per-host', type=int, default=prefetch.default_jobs_per_host, help='the number of problems downloaded concurrently for each host. Note that --wait still applies.  (default: {})'.format(prefetch.default_jobs_per_host))
+
+    # serve
+    epilog = textwrap.dedent('''\
+        protocol:
+          JSON-RPC 2.0, one message per line.
+          The method is the name of a subcommand, and the params are the arguments after the subcommand.
+          The result is the same object which the subcommand prints.
+
+        example:
+          --> {"jsonrpc": "2.0", "id": 1, "method": "get-problem", "params": ["https://atcoder.jp/contests/abc160/tasks/abc160_a"]}
+          <-- {"jsonrpc": "2.0", "id": 1, "result": {"status": "ok", "messages": [], "result": {"url": "https://atcoder.jp/contests/abc160/tasks/abc160_a", ...}}}
+        ''')
+
+    subparser = subparsers.add_parser('serve', help='run as a daemon which accepts subcommands with JSON-RPC', formatter_class=_HelpFormatter, epilog=epilog)
+    subparser.add_argument('--socket', type=pathlib.Path, help='listen on the Unix domain socket instead of stdin/stdout')
+
+    # batch
+    epilog = textwrap.dedent('''\
+        format:
+          The input is JSON lines of requests in the same format as "serve" subcommand.
+          Available methods are: {}
+          The results are printed as JSON lines in the order of completion. Use "id" fields to match them with requests.
+
+        example:
+          $ cat requests.jsonl
+          {{"jsonrpc": "2.0", "id": 1, "method": "get-problem", "params": ["https://atcoder.jp/contests/abc160/tasks/abc160_a"]}}
+          {{"jsonrpc": "2.0", "id": 2, "method": "get-contest", "params": ["https://codeforces.com/contest/1333"]}}
+          $ oj-api batch --input requests.jsonl
+        ''').format(', '.join(batch.METHODS))
+
+    subparser = subparsers.add_parser('batch', help='run many subcommands concurrently', formatter_class=_HelpFormatter, epilog=epilog)
+    subparser.add_argument('--input', type=pathlib.Path, help='read requests from the file instead of stdin')
+    subparser.add_argument('-j', '--jobs', type=int, default=batch.default_jobs, help='the number of requests processed concurrently.  (default: {})'.format(batch.default_jobs))
+    subparser.add_argument('--jobs-per-host', type=int, default=batch.default_jobs_per_host, help='the number of requests processed concurrently for each host. Note that --wait still applies.  (default: {})'.format(batch.default_jobs_per_host))
+
     return parser
 
 
-def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str, Any]:
-    parser = get_parser()
-    parsed = parser.parse_args(args=args)
+def configure(parsed: argparse.Namespace) -> None:
+    """configure() sets the process-wide configurations, i.e. logging, throttling and the HTTP cache.
+    """
 
     # configure logging
     level = INFO
@@ -221,27 +328,58 @@ def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str,
     # print the version to help to support users
     logger.info('%s %s', __package_name__, __version__)
 
-    # do sleep to prevent impolite scraping
-    logger.info('sleep %f sec', parsed.wait)
-    time.sleep(parsed.wait)
+    # throttle requests to prevent impolite scraping
+    if parsed.wait > 0:
+        rate_limit.set_default_limiter(rate_limit.RateLimiter(interval=parsed.wait, shared=True))
+    else:
+        rate_limit.set_default_limiter(None)
+
+    # configure the HTTP cache
+    if parsed.http_cache or parsed.subcommand == 'prefetch':
+        http_cache.set_default_cache(http_cache.HTTPCache(parsed.http_cache_dir, max_bytes=int(parsed.http_cache_size * 1024 * 1024), default_ttl=parsed.http_cache_ttl))
+    else:
+        http_cache.set_default_cache(None)
 
-    # parse the URL
-    problem = dispatch.problem_from_url(getattr(parsed, 'url', ''))
-    contest = dispatch.contest_from_url(getattr(parsed, 'url', ''))
-    service = dispatch.service_from_url(getattr(parsed, 'url', ''))
 
-    # prepare a session
+def prepare_session(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser) -> requests.Session:
     session = requests.Session()
     session.headers['User-Agent'] = parsed.user_agent
+    if parsed.record is not None and parsed.replay is not None:
+        parser.error('--record and --replay cannot be used at the same time')
+    cassette.install(session, record=parsed.record, replay=parsed.replay, latency=(parsed.replay_latency if parsed.replay_latency >= 0 else None))
 
     # set yukicoder's token
     if parsed.yukicoder_token is not None:
         parser.error("don't use --yukicoder-token. use $YUKICODER_TOKEN")
-    else:
-        parsed.yukicoder_token = os.environ.get('YUKICODER_TOKEN')
-        is_yukicoder = isinstance(problem, YukicoderProblem) or isinstance(service, YukicoderService)
-        if parsed.yukicoder_token and is_yukicoder:
-            session.headers['Authorization'] = 'Bearer {}'.format(parsed.yukicoder_token)
+    yukicoder_token = os.environ.get('YUKICODER_TOKEN')
+    if yukicoder_token:
+        session.auth = utils.HostBearerAuth(yukicoder_token, hosts=onlinejudge.service.manifest['yukicoder'])
+    return session
+
+
+def _wrap_exception() -> Dict[str, Any]:
+    etype, evalue, _ = sys.exc_info()
+    logger.exception('%s', evalue)
+    return {
+        "status": "error",
+        "messages": [*map(lambda line: line.strip(), traceback.format_exception_only(etype, evalue))],
+        "result": None,
+    }
+
+
+def run(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser, session: requests.Session, emit: Optional[stream.EmitFunction] = None) -> Dict[str, Any]:
+    """run() runs the subcommand with a prepared session, and returns the wrapped result.
+
+    :param emit: stream items of lists in the result with this. See :py:mod:`onlinejudge_api.stream`.
+    :note: This is used by both of the usual command and the daemon mode (`serve` subcommand). The session may be reused.
+    """
+
+    # parse the URL
+    with profiling.phase('dispatch'):
+        classified = dispatch.classify_url(getattr(parsed, 'url', ''))
+    problem = classified.problem
+    contest = classified.contest
+    service = classified.service
 
     # set password to login from the environment variable
     if parsed.subcommand == 'login-service':
@@ -251,14 +389,18 @@ def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str,
             parsed.password = os.environ.get('PASSWORD')
 
     try:
-        with utils.with_cookiejar(session, path=parsed.cookie) as session:
+        with utils.with_deadline(session, parsed.timeout):
             result = None  # type: Optional[Dict[str, Any]]
             schema = {}  # type: Dict[str, Any]
 
             if parsed.subcommand == 'get-problem':
                 if problem is None:
                     raise ValueError("unsupported URL: {}".format(repr(parsed.url)))
-                result = get_problem.main(problem, is_system=parsed.system, is_full=parsed.full, is_compatibility=parsed.compatibility, session=session)
+                if parsed.output_dir is not None and parsed.compatibility:
+                    raise ValueError("--output-dir is not available with --compatibility")
+                if emit is not None and parsed.compatibility:
+                    raise ValueError("--stream is not available with --compatibility")
+                result = get_problem.main(problem, is_system=parsed.system, is_full=parsed.full, is_compatibility=parsed.compatibility, session=session, output_dir=parsed.output_dir, format=parsed.format, emit=emit)
                 if parsed.compatibility:
                     schema = get_problem.schema_compatibility
                 else:
@@ -267,13 +409,13 @@ def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str,
             elif parsed.subcommand == 'get-contest':
                 if contest is None:
                     raise ValueError("unsupported URL: {}".format(repr(parsed.url)))
-                result = get_contest.main(contest, is_full=parsed.full, session=session)
+                result = get_contest.main(contest, is_full=parsed.full, session=session, emit=emit, with_samples=parsed.with_samples)
                 schema = get_contest.schema
 
             elif parsed.subcommand == 'get-service':
                 if service is None:
                     raise ValueError("unsupported URL: {}".format(repr(parsed.url)))
-                result = get_service.main(service, does_list_contests=parsed.list_contests, session=session)
+                result = get_service.main(service, does_list_contests=parsed.list_contests, session=session, emit=emit)
                 schema = get_service.schema
 
             elif parsed.subcommand == 'login-service':
@@ -294,57 +436,96 @@ def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str,
                 result = guess_language_id.main(problem, path=parsed.file, session=session)
                 schema = guess_language_id.schema
 
-            elif parsed.subcommand is None:
-                parser.print_help()
-                result = None
+            elif parsed.subcommand == 'prefetch':
+                if contest is None:
+                    raise ValueError("unsupported URL: {}".format(repr(parsed.url)))
+                result = prefetch.main(contest, session=session, jobs=parsed.jobs, jobs_per_host=parsed.jobs_per_host, emit=emit)
+                schema = prefetch.schema
 
             else:
                 assert False
 
     except:
-        etype, evalue, _ = sys.exc_info()
-        logger.exception('%s', evalue)
-        wrapped = {
-            "status": "error",
-            "messages": [*map(lambda line: line.strip(), traceback.format_exception_only(etype, evalue))],
-            "result": None,
-        }  # type: Dict[str, Any]
-        if debug:
-            return wrapped
-        else:
-            print(json.dumps(wrapped))
-            raise SystemExit(1)
+        return _wrap_exception()
 
-    else:
-        if result is None:
-            # no subcommand given
-            if debug:
-                return {
-                    "status": "ok",
-                    "messages": [],
-                    "result": None,
-                }
-            else:
-                raise SystemExit(0)
+    with profiling.phase('validation'):
+        _validate_result(result, schema)
+
+    return {
+        "status": "ok",
+        "messages": [],
+        "result": result,
+    }
 
-        wrapped = {
-            "status": "ok",
-            "messages": [],
-            "result": result,
-        }
-        if not debug:
-            print(json.dumps(wrapped))
 
-        try:
-            jsonschema.validate(result, schema)
-        except jsonschema.exceptions.ValidationError as e:
-            logger.debug('%s', e)
+def main(args: Optional[List[str]] = None, *, debug: bool = False) -> Dict[str, Any]:
+    parser = get_parser()
+    parsed = parser.parse_args(args=args)
+    configure(parsed)
 
+    if not parsed.profile and parsed.profile_output is None:
+        return _main(parsed, parser=parser, debug=debug)
+    profiler = profiling.Profiler()
+    profiler.start()
+    try:
+        return _main(parsed, parser=parser, debug=debug)
+    finally:
+        profiler.stop()
+        if parsed.profile_output is not None:
+            profiler.dump_stats(parsed.profile_output)
+        print(json.dumps(profiler.summary()), file=sys.stderr)
+
+
+def _main(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser, debug: bool) -> Dict[str, Any]:
+    session = prepare_session(parsed, parser=parser)
+
+    if parsed.subcommand is None:
+        parser.print_help()
         if debug:
-            return wrapped
+            return {
+                "status": "ok",
+                "messages": [],
+                "result": None,
+            }
         else:
             raise SystemExit(0)
 
+    if parsed.subcommand in ('serve', 'batch'):
+        if parsed.subcommand == 'serve':
+            serve.main(parsed, parser=parser, session=session, run=run)
+        else:
+            batch.main(parsed, parser=parser, session=session, run=run)
+        if debug:
+            return {
+                "status": "ok",
+                "messages": [],
+                "result": None,
+            }
+        else:
+            raise SystemExit(0)
+
+    writer = None  # type: Optional[stream.Writer]
+    if parsed.stream:
+        writer = stream.Writer(sys.stdout)
+        writer.write_header(subcommand=parsed.subcommand)
+
+    try:
+        with utils.with_cookiejar(session, path=parsed.cookie) as session:
+            wrapped = run(parsed, parser=parser, session=session, emit=(writer.emit if writer is not None else None))
+    except:
+        wrapped = _wrap_exception()
+
+    if writer is not None:
+        writer.write_trailer(wrapped)
+    if debug:
+        return wrapped
+    else:
+        if writer is None:
+            with profiling.phase('encoding'):
+                output = json.dumps(wrapped)
+            print(output)
+        raise SystemExit(0 if wrapped["status"] == "ok" else 1)
+
 
 if __name__ == '__main__':
     main()
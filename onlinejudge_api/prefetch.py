@@ -0,0 +1,107 @@
+from logging import getLogger
+from typing import *
+
+import onlinejudge_api.batch as batch
+import onlinejudge_api.get_problem as get_problem
+import onlinejudge_api.stream as stream
+import requests
+
+import onlinejudge._implementation.http_cache as http_cache
+from onlinejudge.type import *
+
+logger = getLogger(__name__)
+
+default_jobs = 4
+default_jobs_per_host = 2
+
+schema_example = {
+    "url": "https://atcoder.jp/contests/abc160",
+    "problems": [
+        {
+            "url": "https://atcoder.jp/contests/abc160/tasks/abc160_a",
+            "status": "ok",
+        },
+        {
+            "url": "https://atcoder.jp/contests/abc160/tasks/abc160_b",
+            "status": "error",
+            "message": "HTTPError: 503 Server Error: Service Unavailable for url: https://atcoder.jp/contests/abc160/tasks/abc160_b",
+        },
+    ],
+}  # type: Dict[str, Any]
+
+schema = {
+    "$schema": "http://json-schema.org/schema#",
+    "type": "object",
+    "properties": {
+        "url": {
+            "type": "string",
+            "format": "uri",
+        },
+        "problems": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "format": "uri",
+                    },
+                    "status": {
+                        "type": "string",
+                        "enum": ["ok", "error"],
+                    },
+                    "message": {
+                        "type": "string",
+                    },
+                },
+                "required": ["url", "status"],
+            },
+        },
+    },
+    "required": ["url", "problems"],
+}  # type: Dict[str, Any]
+
+
+def main(contest: Contest, *, session: requests.Session, jobs: int = default_jobs, jobs_per_host: int = default_jobs_per_host, emit: Optional[stream.EmitFunction] = None) -> Dict[str, Any]:
+    """main() downloads everything which `get-problem --full` downloads for all problems in the contest, to store the responses into the HTTP cache.
+
+    Problems are downloaded concurrently with :py:class:`onlinejudge_api.batch.HostScheduler`. The per-host interval of requests (`--wait`) still applies.
+
+    :param emit: stream the statuses of problems with this, instead of putting them into the result
+    :raises Exception:
+    """
+
+    if http_cache.get_default_cache() is None:
+        logger.warning('the HTTP cache is disabled, so nothing will be kept')
+
+    result = {
+        "url": contest.get_url(),
+    }  # type: Dict[str, Any]
+    append_problem = stream.get_appender(result, 'problems', emit=emit)
+
+    problems = contest.list_problems(session=session)
+    statuses = [None] * len(problems)  # type: List[Optional[Dict[str, Any]]]
+
+    def task(i: int, problem: Problem) -> None:
+        status = {
+            "url": problem.get_url(),
+        }  # type: Dict[str, Any]
+        try:
+            get_problem.main(problem, is_system=False, is_compatibility=False, is_full=True, session=session)
+        except Exception as e:
+            logger.exception('failed to prefetch %s', problem.get_url())
+            status["status"] = "error"
+            status["message"] = '{}: {}'.format(type(e).__name__, e)
+        else:
+            status["status"] = "ok"
+        statuses[i] = status
+
+    scheduler = batch.HostScheduler(jobs=jobs, jobs_per_host=jobs_per_host)
+    for i, problem in enumerate(problems):
+        scheduler.submit(batch.get_host([problem.get_url()]), lambda i=i, problem=problem: task(i, problem))  # type: ignore
+    scheduler.wait()
+
+    for status in statuses:
+        assert status is not None
+        append_problem(status)
+    return result
@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import copy
+import io
+import json
+import pathlib
+import socket
+import socketserver
+import sys
+import threading
+from logging import getLogger
+from typing import *
+
+import requests
+
+import onlinejudge._implementation.utils as utils
+
+logger = getLogger(__name__)
+
+# error codes defined in JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+METHODS = ('get-problem', 'get-contest', 'get-service', 'login-service', 'submit-code', 'guess-language-id')
+
+
+def _make_error(id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": id,
+        "error": {
+            "code": code,
+            "message": message,
+        },
+    }
+
+
+def make_response(id: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": id,
+        "result": result,
+    }
+
+
+def parse_request(line: str, *, methods: Container[str]) -> Dict[str, Any]:
+    """parse_request() parses and validates a request.
+
+    :return: the request, or an error response
+    """
+
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return _make_error(None, PARSE_ERROR, 'Parse error: {}'.format(e))
+    if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+        return _make_error(request.get('id') if isinstance(request, dict) else None, INVALID_REQUEST, 'Invalid Request')
+    if request['method'] not in methods:
+        return _make_error(request.get('id'), METHOD_NOT_FOUND, 'Method not found: {}'.format(request['method']))
+    request.setdefault('params', [])
+    if not isinstance(request['params'], list) or not all(isinstance(param, str) for param in request['params']):
+        return _make_error(request.get('id'), INVALID_PARAMS, 'Invalid params: params must be a list of command-line arguments')
+    return request
+
+
+def _wrap_output(output: io.StringIO) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "messages": [line.strip() for line in output.getvalue().splitlines() if line.strip()],
+        "result": None,
+    }
+
+
+def parse_arguments(parser: argparse.ArgumentParser, args: List[str], *, namespace: argparse.Namespace) -> Union[argparse.Namespace, Dict[str, Any]]:
+    """parse_arguments() parses arguments of a request without printing anything nor exiting.
+
+    :return: the parsed arguments, or the wrapped error
+    """
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            return parser.parse_args(args, namespace=copy.copy(namespace))
+    except SystemExit:
+        return _wrap_output(output)
+
+
+class Server:
+    """Server processes JSON-RPC requests one by one.
+
+    :ivar handle: a function which takes a subcommand and its arguments, and returns the same object as the command prints
+    """
+    def __init__(self, handle: Callable[[str, List[str]], Dict[str, Any]]):
+        self.handle = handle
+        self._lock = threading.Lock()  # commands share the session and redirect stdout, so they are processed one by one
+
+    def process(self, line: str) -> Optional[Dict[str, Any]]:
+        """process() processes a request.
+
+        :return: the response, or `None` for a notification
+        """
+
+        request = parse_request(line, methods=METHODS)
+        if 'error' in request:
+            return request
+        with self._lock:
+            result = self.handle(request['method'], request['params'])
+        if 'id' not in request:
+            return None
+        return make_response(request['id'], result)
+
+    def serve_stream(self, reader: IO[str], writer: IO[str]) -> None:
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.process(line)
+            if response is not None:
+                writer.write(json.dumps(response) + '\n')
+                writer.flush()
+
+    def serve_unix_socket(self, path: pathlib.Path) -> None:
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = io.TextIOWrapper(self.rfile, encoding='utf-8')
+                writer = io.TextIOWrapper(self.wfile, encoding='utf-8')
+                server.serve_stream(reader, writer)
+
+        if path.exists():
+            path.unlink()  # a stale socket of the previous daemon
+        with socketserver.ThreadingUnixStreamServer(str(path), Handler) as unix_server:  # type: ignore
+            unix_server.daemon_threads = True
+            path.chmod(0o600)  # NOTE: the socket can use your cookies
+            logger.info('listening on %s', path)
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                path.unlink()
+
+
+def main(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser, session: requests.Session, run: Callable[..., Dict[str, Any]]) -> None:
+    """
+    :param parsed: the parsed global options. They are shared by all requests.
+    :param run: :py:func:`onlinejudge_api.main.run`
+    """
+
+    if parsed.socket is not None and not hasattr(socket, 'AF_UNIX'):
+        parser.error('Unix domain sockets are not supported on this platform')
+
+    with utils.with_cookiejar(session, path=parsed.cookie) as session:
+
+        def handle(subcommand: str, args: List[str]) -> Dict[str, Any]:
+            parsed_request = parse_arguments(parser, [subcommand, *args], namespace=parsed)
+            if isinstance(parsed_request, dict):
+                return parsed_request
+            output = io.StringIO()
+            try:
+                with contextlib.redirect_stderr(output):
+                    return run(parsed_request, parser=parser, session=session)
+            except SystemExit:  # parser.error() for --password
+                return _wrap_output(output)
+            finally:
+                # save cookies for other processes, as the usual command does
+                parsed.cookie.parent.mkdir(parents=True, exist_ok=True)
+                session.cookies.save(ignore_discard=True)  # type: ignore
+                parsed.cookie.chmod(0o600)  # NOTE: to make secure a little bit, as utils.with_cookiejar() does
+
+        server = Server(handle)
+        if parsed.socket is None:
+            logger.info('reading requests from stdin')
+            server.serve_stream(sys.stdin, sys.stdout)  # NOTE: this is the original stdout, even while it is redirected
+        else:
+            server.serve_unix_socket(parsed.socket)
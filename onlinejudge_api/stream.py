@@ -0,0 +1,65 @@
+"""
+the streaming output of `oj-api --stream`
+
+The output is newline-delimited JSON. The first record is the header, each item of the list in the result is printed as a record as soon as it is available, and the last record is the trailer::
+
+    {"type": "header", "subcommand": "get-problem", "version": "10.7.0"}
+    {"type": "item", "key": "tests", "value": {"input": "1 2\\n", "output": "3\\n"}}
+    {"type": "item", "key": "tests", "value": {"input": "3 4\\n", "output": "7\\n"}}
+    {"type": "trailer", "status": "ok", "messages": [], "result": {"url": "...", "tests": [], ...}}
+
+The lists in the result of the trailer are empty. Appending the values of items to `result[key]` gives the same result as the usual output.
+"""
+
+import functools
+import json
+from typing import *
+
+import onlinejudge._implementation.profiling as profiling
+from onlinejudge.__about__ import __version__
+
+# emit(key, value) outputs an item of the list `key` in the result
+EmitFunction = Callable[[str, Dict[str, Any]], None]
+
+
+def get_appender(result: Dict[str, Any], key: str, *, emit: Optional[EmitFunction]) -> Callable[[Dict[str, Any]], None]:
+    """get_appender() initializes the list `result[key]`, and returns the function to add an item to the list.
+
+    :param emit: If given, items are emitted with this instead of appended to the list.
+    """
+
+    result[key] = []
+    if emit is None:
+        return result[key].append
+    return functools.partial(emit, key)
+
+
+class Writer:
+    def __init__(self, file: IO[str]):
+        self.file = file
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with profiling.phase('encoding'):
+            line = json.dumps(record)
+        self.file.write(line + '\n')
+        self.file.flush()
+
+    def write_header(self, *, subcommand: str) -> None:
+        self._write({
+            "type": "header",
+            "subcommand": subcommand,
+            "version": __version__,
+        })
+
+    def emit(self, key: str, value: Dict[str, Any]) -> None:
+        self._write({
+            "type": "item",
+            "key": key,
+            "value": value,
+        })
+
+    def write_trailer(self, wrapped: Dict[str, Any]) -> None:
+        self._write({
+            "type": "trailer",
+            **wrapped,
+        })
@@ -0,0 +1,51 @@
+import json
+import pathlib
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+
+import tests.judge_server as judge_server
+from onlinejudge_api.batch import HostScheduler
+
+
+class BatchTest(unittest.TestCase):
+    def test_batch(self):
+        with judge_server.JudgeServer(contests=5, tasks=2, latency=0.1) as server, tempfile.TemporaryDirectory() as tempdir:
+            requests = [{"jsonrpc": "2.0", "id": i, "method": "get-contest", "params": ["https://atcoder.jp/contests/synth{:04d}".format(i)]} for i in range(1, 6)]
+            requests += [{"jsonrpc": "2.0", "id": 6, "method": "get-contest", "params": ["https://codeforces.com/contest/3"]}]
+            requests += [{"jsonrpc": "2.0", "id": 7, "method": "get-problem", "params": ["https://example.com/"]}]
+            requests += [{"jsonrpc": "2.0", "id": 8, "method": "submit-code", "params": []}]
+            command = judge_server.oj_api_command(server.address, ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'batch', '--jobs-per-host', '2'])
+            proc = subprocess.run(command, input=''.join(json.dumps(request) + '\n' for request in requests).encode(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+        self.assertEqual(proc.returncode, 0)
+        responses = {response['id']: response for response in map(json.loads, proc.stdout.decode().splitlines())}
+        self.assertEqual(set(responses), set(range(1, 9)))
+        for i in range(1, 6):
+            self.assertEqual(responses[i]['result']['result']['name'], 'Synthetic Contest {}'.format(i))
+        self.assertEqual(responses[6]['result']['result']['name'], 'Synthetic Round #3')
+        self.assertEqual(responses[7]['result']['status'], 'error')
+        self.assertEqual(responses[8]['error']['code'], -32601)
+
+
+class HostSchedulerTest(unittest.TestCase):
+    def test_jobs_per_host(self):
+        lock = threading.Lock()
+        running = {'a': 0, 'b': 0}
+        peak = {'a': 0, 'b': 0}
+
+        def task(host):
+            with lock:
+                running[host] += 1
+                peak[host] = max(peak[host], running[host])
+            time.sleep(0.05)
+            with lock:
+                running[host] -= 1
+
+        scheduler = HostScheduler(jobs=8, jobs_per_host=2)
+        for _ in range(6):
+            scheduler.submit('a', lambda: task('a'))
+            scheduler.submit('b', lambda: task('b'))
+        scheduler.wait()
+        self.assertEqual(peak, {'a': 2, 'b': 2})
@@ -1,4 +1,8 @@
+import subprocess
+import sys
 import unittest
+import unittest.mock
+import urllib.parse
 
 from onlinejudge import dispatch, service
 
@@ -66,3 +70,68 @@ class InvalidDispatchTest(unittest.TestCase):
 
     def test_service_from_url(self):
         self.assertIsNone(dispatch.service_from_url('https://www.yahoo.co.jp/'))
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_get_module_names_for_url(self):
+        self.assertEqual(service.get_module_names_for_url('https://atcoder.jp/contests/agc039'), ('atcoder', ))
+        self.assertEqual(service.get_module_names_for_url('https://abc001.contest.atcoder.jp/'), ('atcoder', ))
+        self.assertEqual(service.get_module_names_for_url('https://open.kattis.com/problems/hello'), ('kattis', ))
+        self.assertEqual(service.get_module_names_for_url('https://'), ())
+        self.assertEqual(service.get_module_names_for_url('https://www.yahoo.co.jp/'), tuple(service.manifest.keys()))
+
+    def test_import_only_needed_modules(self):
+        code = 'import sys, onlinejudge; print(sorted(name for name in sys.modules if name.startswith("onlinejudge.service.") or name in ("asyncio", "bs4")))'
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b'[]')
+
+        code = 'import sys, onlinejudge; onlinejudge.dispatch.problem_from_url("https://atcoder.jp/contests/agc039/tasks/agc039_a"); print(sorted(name for name in sys.modules if name.startswith("onlinejudge.service.")))'
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b"['onlinejudge.service.atcoder']")
+
+    def test_import_on_attribute_access(self):
+        code = 'import sys, onlinejudge; print(onlinejudge.service.kattis.KattisProblem.__name__, sorted(name for name in sys.modules if name.startswith("onlinejudge.service.")))'
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b"KattisProblem ['onlinejudge.service.kattis']")
+
+    def test_cold_import_time(self):
+        # the check of imported modules above is what keeps the import fast. this only catches regressions by orders of magnitude, since wall-clock time depends on the machine
+        code = 'import time, requests; start = time.perf_counter(); import onlinejudge; print(time.perf_counter() - start)'
+        elapsed = float(subprocess.check_output([sys.executable, '-c', code]))
+        self.assertLess(elapsed, 2.0)
+
+
+class ClassifyURLTest(unittest.TestCase):
+    def test_classify_urls(self):
+        urls = [
+            'https://atcoder.jp/contests/agc039/tasks/agc039_a',
+            'https://atcoder.jp/contests/agc039',
+            'https://atcoder.jp/contests/agc039/tasks/agc039_a',
+            'https://www.yahoo.co.jp/',
+        ]
+        classified = dispatch.classify_urls(urls)
+        self.assertEqual([item.url for item in classified], urls)
+        self.assertIsInstance(classified[0].problem, service.atcoder.AtCoderProblem)
+        self.assertIsInstance(classified[0].contest, service.atcoder.AtCoderContest)
+        self.assertIsInstance(classified[0].service, service.atcoder.AtCoderService)
+        self.assertIsNone(classified[0].submission)
+        self.assertIsNone(classified[1].problem)
+        self.assertIsInstance(classified[1].contest, service.atcoder.AtCoderContest)
+        self.assertIs(classified[2], classified[0])
+        self.assertEqual(classified[3], dispatch.ClassifiedURL(url='https://www.yahoo.co.jp/', service=None, contest=None, problem=None, submission=None))
+
+    def test_no_errors_for_other_kinds(self):
+        with self.assertLogs('onlinejudge.dispatch', level='DEBUG') as logs:
+            dispatch.classify_url('https://atcoder.jp/contests/agc039')
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG'])
+
+    def test_service_from_url_lazily(self):
+        with unittest.mock.patch.object(service.atcoder.AtCoderSubmission, 'from_url') as submission_from_url, unittest.mock.patch.object(service.atcoder.AtCoderProblem, 'from_url') as problem_from_url:
+            self.assertIsInstance(dispatch.service_from_url('https://atcoder.jp/'), service.atcoder.AtCoderService)
+        submission_from_url.assert_not_called()
+        problem_from_url.assert_not_called()
+
+    def test_parse_url_once(self):
+        with unittest.mock.patch.object(urllib.parse, 'urlparse', wraps=urllib.parse.urlparse) as urlparse:
+            dispatch.classify_url('https://atcoder.jp/contests/agc040/tasks/agc040_a')
+        self.assertEqual(urlparse.call_count, 1)
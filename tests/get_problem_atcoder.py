@@ -1,8 +1,22 @@
+import pathlib
+import tempfile
 import unittest
 
+import tests.judge_server as judge_server
 from onlinejudge_api.main import main
 
 
+class GetProblemAtCoderRequestsTest(unittest.TestCase):
+    def test_single_request(self):
+        with judge_server.JudgeServer(contests=1, tasks=1) as server, judge_server.patch_oj_api(server.address), tempfile.TemporaryDirectory() as tempdir:
+            result = main(['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-problem', '--full', 'https://atcoder.jp/contests/synth0001/tasks/synth0001_a'], debug=True)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['result']['name'], 'Problem A')
+        self.assertEqual(result['result']['context'], {'contest': {'name': 'Synthetic Contest 1', 'url': 'https://atcoder.jp/contests/synth0001'}, 'alphabet': 'A'})
+        self.assertEqual(result['result']['tests'], [{'input': '26 0\n', 'output': '26\n'}])
+        self.assertEqual(dict(server.counter), {('atcoder.jp', '/contests/synth0001/tasks/synth0001_a'): 1})
+
+
 class DownloadAtCoderTest(unittest.TestCase):
     def test_icpc2013spring_a(self):
         """This problem contains both words `Input` and `Output` for the headings for sample outputs.
@@ -0,0 +1,115 @@
+import collections
+import datetime
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+
+import onlinejudge_api.get_service as get_service
+import requests
+import tests.judge_server as judge_server
+from onlinejudge_api.main import main
+
+from onlinejudge.service.atcoder import AtCoderContest, AtCoderService
+from onlinejudge.type import Contest, Service
+
+
+class GetServiceTest(unittest.TestCase):
+    def test_list_contests_from_archive(self):
+        with judge_server.JudgeServer(contests=60) as server, judge_server.patch_oj_api(server.address), tempfile.TemporaryDirectory() as tempdir:
+            result = main(['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-service', '--list-contests', 'https://atcoder.jp/'], debug=True)
+            paths = [path for (host, path) in server.counter]
+        self.assertEqual(result['status'], 'ok')
+        contests = result['result']['contests']
+        self.assertEqual(len(contests), 60)
+        self.assertEqual(contests[0], {'url': 'https://atcoder.jp/contests/synth0060', 'name': 'Synthetic Contest 60'})  # the English name, not the one in the archive with lang=ja
+        self.assertEqual([contest['name'] for contest in contests], ['Synthetic Contest {}'.format(i) for i in range(60, 0, -1)])
+        self.assertEqual(paths, ['/contests/archive'])  # no requests for each contest
+
+
+class AtCoderEnglishNamesTest(unittest.TestCase):
+    def test_stream(self):
+        with judge_server.JudgeServer(contests=500) as server:
+            session = judge_server.install(requests.Session(), server.address)
+            contests = get_service._iterate_contests_with_names(AtCoderService(), session=session, jobs=4)
+            try:
+                contest, name = next(contests)
+                self.assertEqual((contest.contest_id, name), ('synth0500', 'Synthetic Contest 500'))
+                self.assertLessEqual(server.counter['atcoder.jp', '/contests/archive'], 2 * (1 + 4))  # the first page and the pages fetched ahead, in each language
+            finally:
+                contests.close()
+
+    def test_japanese_local_contests(self):
+        def make(contest_id, name, day):
+            return _DummyAtCoderContestData(AtCoderContest.from_url('https://atcoder.jp/contests/' + contest_id), name, datetime.datetime(2020, 1, day, tzinfo=datetime.timezone.utc))
+
+        archives = {
+            'ja': [make('c4', 'コンテスト4', 4), make('c3', 'コンテスト3', 3), make('c2', 'コンテスト2', 2), make('c1', 'コンテスト1', 1)],
+            'en': [make('c4', 'Contest 4', 4), make('c2', 'Contest 2', 2), make('c1', 'Contest 1', 1)],
+        }
+        service = unittest.mock.Mock(iterate_contest_data=lambda *, lang, session: (data for data in archives[lang]))
+        contests = list(get_service._iterate_atcoder_contests_with_english_names(service, session=requests.Session()))
+        self.assertEqual([name for _, name in contests], ['Contest 4', 'コンテスト3', 'Contest 2', 'Contest 1'])
+
+
+_DummyAtCoderContestData = collections.namedtuple('_DummyAtCoderContestData', ['contest', 'name', 'start_time'])
+
+
+class _DummyContestData:
+    def __init__(self, name):
+        self.name = name
+
+
+class _DummyContest(Contest):
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def __init__(self, index):
+        self.index = index
+
+    def get_url(self):
+        return 'https://example.com/contests/{}'.format(self.index)
+
+    def get_service(self):
+        raise NotImplementedError
+
+    @classmethod
+    def from_url(cls, url):
+        return None
+
+    def download_data(self, *, session=None):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        time.sleep(0.01 * (self.index % 3))
+        with cls.lock:
+            cls.running -= 1
+        return _DummyContestData('Contest {}'.format(self.index))
+
+
+class _DummyService(Service):
+    def get_url(self):
+        return 'https://example.com/'
+
+    def get_name(self):
+        return 'Example'
+
+    @classmethod
+    def from_url(cls, url):
+        return None
+
+    def iterate_contests(self, *, session=None):
+        for i in range(20):
+            yield _DummyContest(i)
+
+
+class FallbackTest(unittest.TestCase):
+    def test_bounded_concurrency(self):
+        result = get_service.main(_DummyService(), does_list_contests=True, session=requests.Session(), jobs=3)
+        self.assertEqual([contest['name'] for contest in result['contests']], ['Contest {}'.format(i) for i in range(20)])
+        self.assertLessEqual(_DummyContest.peak, 3)
+        self.assertGreater(_DummyContest.peak, 1)
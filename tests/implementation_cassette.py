@@ -0,0 +1,125 @@
+import base64
+import gzip
+import json
+import pathlib
+import tempfile
+import textwrap
+import unittest
+
+import requests
+from onlinejudge_api.main import main
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.cassette as cassette
+import onlinejudge._implementation.utils as utils
+
+
+def write_cassette(path: pathlib.Path, responses: dict) -> None:
+    """write_cassette() makes a cassette from a dict from URLs to HTML strings.
+    """
+
+    with gzip.open(str(path), 'wb') as fh:
+        for url, html in responses.items():
+            interaction = {
+                'request': {
+                    'method': 'GET',
+                    'url': url,
+                    'body_sha256': None
+                },
+                'response': {
+                    'status': 200,
+                    'reason': 'OK',
+                    'headers': [['Content-Type', 'text/html; charset=utf-8']],
+                    'body': base64.b64encode(html.encode()).decode(),
+                },
+                'elapsed': 0.0,
+            }
+            fh.write((json.dumps(interaction) + '\n').encode())
+
+
+ATCODER_TASK_HTML = textwrap.dedent('''\
+    <html>
+    <head><title>A - Add</title></head>
+    <body>
+    <a class="contest-title" href="/contests/abc999">AtCoder Beginner Contest 999</a>
+    <span class="h2">A - Add</span>
+    <p>Time Limit: 2 sec / Memory Limit: 1024 MB</p>
+    <div id="task-statement">
+    <span class="lang"><span class="lang-en">
+    <div class="part"><section><h3>Input</h3><pre><var>A</var> <var>B</var></pre></section></div>
+    <div class="part"><section><h3>Sample Input 1</h3><pre>1 2
+    </pre></section></div>
+    <div class="part"><section><h3>Sample Output 1</h3><pre>3
+    </pre></section></div>
+    </span></span>
+    </div>
+    </body>
+    </html>
+    ''')
+
+ATCODER_CONTEST_HTML = textwrap.dedent('''\
+    <html>
+    <head><title>AtCoder Beginner Contest 999 - AtCoder</title></head>
+    <body>
+    <small class="contest-duration">Contest Duration:
+    <a href="http://www.timeanddate.com/worldclock/fixedtime.html?iso=20991231T2100&amp;p1=248">2099-12-31 21:00</a> -
+    <a href="http://www.timeanddate.com/worldclock/fixedtime.html?iso=20991231T2240&amp;p1=248">2099-12-31 22:40</a>
+    </small>
+    <span>Can Participate: All</span>
+    <span>Rated Range: ~ 1999</span>
+    <span>Penalty: 5 minutes</span>
+    </body>
+    </html>
+    ''')
+
+
+class _Handler(QuietHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/hello')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = ('hello from ' + self.path).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CassetteTest(unittest.TestCase):
+    def test_record_and_replay(self):
+        server = LocalHTTPServer(_Handler)
+        base_url = server.base_url
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'cassette.jsonl.gz'
+
+            # record
+            with server:
+                session = cassette.install(requests.Session(), record=path)
+                recorded = utils.request('GET', base_url + '/redirect', session=session)
+                utils.request('GET', base_url + '/foo', session=session)
+
+            # replay without the server
+            session = cassette.install(requests.Session(), replay=path)
+            replayed = utils.request('GET', base_url + '/redirect', session=session)
+            self.assertEqual(replayed.content, recorded.content)
+            self.assertEqual(replayed.url, base_url + '/hello')
+            self.assertEqual(len(replayed.history), 1)
+            self.assertEqual(utils.request('GET', base_url + '/foo', session=session).content, b'hello from /foo')
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                utils.request('GET', base_url + '/not-recorded', session=session)
+
+    def test_replay_get_problem(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'cassette.jsonl.gz'
+            write_cassette(path, {
+                'https://atcoder.jp/contests/abc999/tasks/abc999_a': ATCODER_TASK_HTML,
+                'https://atcoder.jp/contests/abc999?lang=en': ATCODER_CONTEST_HTML,
+            })
+            result = main(['--replay', str(path), '--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-problem', 'https://atcoder.jp/contests/abc999/tasks/abc999_a'], debug=True)
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(result['result']['name'], 'Add')
+            self.assertEqual(result['result']['context']['contest']['name'], 'AtCoder Beginner Contest 999')
+            self.assertEqual(result['result']['tests'], [{'input': '1 2\n', 'output': '3\n'}])
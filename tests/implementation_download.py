@@ -0,0 +1,135 @@
+import pathlib
+import re
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.download as download
+
+
+class _RangeHandler(QuietHTTPRequestHandler):
+    content = bytes(range(256)) * 4
+    etag = '"v1"'
+    truncate = 0  # the number of responses to cut in the middle
+    support_range = True
+    ranges = []  # type: list
+    delay = 0.0
+    running = 0
+    peak = 0  # the maximum number of concurrent responses
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            time.sleep(cls.delay)
+            self._respond()
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+    def _respond(self):
+        cls = type(self)
+        m = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if m and cls.support_range and self.headers.get('If-Range') == cls.etag:
+            start = int(m.group(1))
+            cls.ranges.append(start)
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(cls.content) - 1, len(cls.content)))
+        else:
+            start = 0
+            cls.ranges.append(None)
+            self.send_response(200)
+        body = cls.content[start:]
+        self.send_header('ETag', cls.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if cls.truncate:
+            cls.truncate -= 1
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        _RangeHandler.etag = '"v1"'
+        _RangeHandler.truncate = 0
+        _RangeHandler.support_range = True
+        _RangeHandler.ranges = []
+        _RangeHandler.delay = 0.0
+        _RangeHandler.peak = 0
+        self.server = LocalHTTPServer(_RangeHandler).start()
+        self.url = self.server.base_url + '/testcase.zip'
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.spool_dir = pathlib.Path(self.tempdir.name)
+
+    def tearDown(self):
+        self.server.stop()
+        self.tempdir.cleanup()
+
+    def test_resume(self):
+        _RangeHandler.truncate = 2
+        content = download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128)
+        self.assertEqual(content, _RangeHandler.content)
+        self.assertEqual(_RangeHandler.ranges, [None, 512, 768])
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+    def test_resume_in_next_call(self):
+        _RangeHandler.truncate = 1
+        with self.assertRaises(requests.exceptions.RequestException):
+            download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128, max_resumes=0)
+        content = download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128)
+        self.assertEqual(content, _RangeHandler.content)
+        self.assertEqual(_RangeHandler.ranges, [None, 512])
+
+    def test_changed_file(self):
+        _RangeHandler.truncate = 1
+        with self.assertRaises(requests.exceptions.RequestException):
+            download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128, max_resumes=0)
+        _RangeHandler.etag = '"v2"'
+        content = download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128)
+        self.assertEqual(content, _RangeHandler.content)
+        self.assertEqual(_RangeHandler.ranges, [None, None])
+
+    def test_range_not_supported(self):
+        _RangeHandler.truncate = 1
+        _RangeHandler.support_range = False
+        content = download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128)
+        self.assertEqual(content, _RangeHandler.content)
+        self.assertEqual(_RangeHandler.ranges, [None, None])
+
+    def test_keyed_by_login_state(self):
+        alice = requests.Session()
+        alice.cookies.set('session', 'alice')
+        bob = requests.Session()
+        bob.cookies.set('session', 'bob')
+        _RangeHandler.truncate = 1
+        with self.assertRaises(requests.exceptions.RequestException):
+            download.download(self.url, session=alice, spool_dir=self.spool_dir, chunk_size=128, max_resumes=0)
+        self.assertEqual(download.download(self.url, session=bob, spool_dir=self.spool_dir, chunk_size=128), _RangeHandler.content)
+        self.assertEqual(download.download(self.url, session=alice, spool_dir=self.spool_dir, chunk_size=128), _RangeHandler.content)
+        self.assertEqual(_RangeHandler.ranges, [None, None, 512])  # the partial file of alice is not used for bob
+
+    def test_concurrent_downloads(self):
+        _RangeHandler.delay = 0.2
+        contents = []
+
+        def worker():
+            contents.append(download.download(self.url, session=requests.Session(), spool_dir=self.spool_dir, chunk_size=128))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(contents, [_RangeHandler.content] * 3)
+        self.assertEqual(_RangeHandler.peak, 1)  # the spool is locked while a download is in progress
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
@@ -0,0 +1,149 @@
+import pathlib
+import tempfile
+import unittest
+
+import requests
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.http_cache as http_cache
+import onlinejudge._implementation.utils as utils
+
+
+class _Handler(QuietHTTPRequestHandler):
+    requests_received = []  # type: list
+
+    def do_GET(self):
+        type(self).requests_received.append((self.path, dict(self.headers)))
+        body = ('hello from ' + self.path).encode()
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+        elif self.path == '/max-age':
+            self.send_response(200)
+            self.send_header('Cache-Control', 'max-age=3600')
+        elif self.path == '/task':
+            if 'session=user' not in self.headers.get('Cookie', ''):
+                self.send_response(302)
+                self.send_header('Location', '/login')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', '"task"')
+            body = b'TASK PAGE'
+        elif self.path == '/login':
+            self.send_response(200)
+            self.send_header('ETag', '"login"')
+            self.send_header('Set-Cookie', 'csrf=token{}; Path=/'.format(len(type(self).requests_received)))
+            body = b'LOGIN PAGE'
+        elif self.path == '/no-store':
+            self.send_response(200)
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('ETag', '"v1"')
+        else:
+            self.send_response(200)
+            self.send_header('ETag', '"{}"'.format(self.path))
+            body = b'x' * 1000
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        type(self).requests_received.append((self.path, dict(self.headers)))
+        self.send_response(200)
+        self.send_header('Set-Cookie', 'session=user; Path=/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class HTTPCacheTest(unittest.TestCase):
+    def setUp(self):
+        _Handler.requests_received = []
+        self.server = LocalHTTPServer(_Handler).start()
+        self.base_url = self.server.base_url
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = http_cache.HTTPCache(pathlib.Path(self.tempdir.name), max_bytes=2500)
+        http_cache.set_default_cache(self.cache)
+
+    def tearDown(self):
+        http_cache.set_default_cache(None)
+        self.server.stop()
+        self.tempdir.cleanup()
+
+    def test_revalidate_with_etag(self):
+        session = requests.Session()
+        resp1 = utils.request('GET', self.base_url + '/etag', session=session)
+        resp2 = utils.request('GET', self.base_url + '/etag', session=session)
+        self.assertEqual(resp1.content, b'hello from /etag')
+        self.assertEqual(resp2.status_code, 200)
+        self.assertEqual(resp2.content, b'hello from /etag')
+        self.assertEqual(len(_Handler.requests_received), 2)
+        self.assertEqual(_Handler.requests_received[1][1].get('If-None-Match'), '"v1"')
+
+    def test_fresh_entry_without_network(self):
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/max-age', session=session)
+        resp = utils.request('GET', self.base_url + '/max-age', session=session)
+        self.assertEqual(resp.content, b'hello from /max-age')
+        self.assertEqual(len(_Handler.requests_received), 1)
+
+    def test_no_store(self):
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/no-store', session=session)
+        utils.request('GET', self.base_url + '/no-store', session=session)
+        self.assertEqual(len(_Handler.requests_received), 2)
+        self.assertNotIn('If-None-Match', _Handler.requests_received[1][1])
+
+    def test_lru_eviction(self):
+        session = requests.Session()
+        for path in ('/a', '/b', '/c'):
+            utils.request('GET', self.base_url + path, session=session)
+        self.assertIsNone(self.cache.lookup(self.base_url + '/a'))
+        self.assertIsNotNone(self.cache.lookup(self.base_url + '/b'))
+        self.assertIsNotNone(self.cache.lookup(self.base_url + '/c'))
+
+    def test_default_ttl(self):
+        http_cache.set_default_cache(http_cache.HTTPCache(pathlib.Path(self.tempdir.name), max_bytes=2500, default_ttl=60.0))
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/a', session=session)
+        resp = utils.request('GET', self.base_url + '/a', session=session)
+        self.assertEqual(resp.content, b'x' * 1000)
+        self.assertEqual(len(_Handler.requests_received), 1)
+
+    def test_login_state(self):
+        session = requests.Session()
+        resp = utils.request('GET', self.base_url + '/task', session=session)
+        self.assertEqual(resp.content, b'LOGIN PAGE')
+        self.assertIsNone(self.cache.lookup(self.base_url + '/task'))  # the redirected response is not stored for the URL before redirection
+
+        session.cookies.set('session', 'user', domain='127.0.0.1', path='/')
+        resp = utils.request('GET', self.base_url + '/task', session=session)
+        self.assertEqual(resp.content, b'TASK PAGE')
+
+        # the response for a logged-in session is not used for other sessions
+        resp = utils.request('GET', self.base_url + '/task', session=requests.Session())
+        self.assertEqual(resp.content, b'LOGIN PAGE')
+
+    def test_default_ttl_and_login(self):
+        http_cache.set_default_cache(http_cache.HTTPCache(pathlib.Path(self.tempdir.name), max_bytes=2500, default_ttl=60.0))
+        session = requests.Session()
+
+        # prefetch before logging in
+        self.assertEqual(utils.request('GET', self.base_url + '/task', session=session).content, b'LOGIN PAGE')
+
+        # log in with the form
+        utils.request('GET', self.base_url + '/login', session=session)
+        utils.request('POST', self.base_url + '/login', session=session)
+        self.assertEqual(utils.request('GET', self.base_url + '/task', session=session).content, b'TASK PAGE')
+
+        # the login form with a CSRF token is not used without revalidation
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/login', session=session)
+        session.cookies.clear()
+        utils.request('GET', self.base_url + '/login', session=session)
+        self.assertEqual([path for path, _ in _Handler.requests_received].count('/login'), 5)
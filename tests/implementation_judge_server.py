@@ -0,0 +1,59 @@
+import pathlib
+import tempfile
+import unittest
+
+import requests
+import tests.judge_server as judge_server
+from onlinejudge_api.main import main
+from tests.implementation_cassette import write_cassette
+
+import onlinejudge._implementation.utils as utils
+from onlinejudge.service.aoj import AOJProblem
+from onlinejudge.service.atcoder import AtCoderContest, AtCoderService
+from onlinejudge.service.codeforces import CodeforcesContest
+from onlinejudge.service.kattis import KattisProblem
+from onlinejudge.service.yukicoder import YukicoderProblem
+
+
+class JudgeServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = judge_server.JudgeServer(contests=120, tasks=3, submissions=45, testcases=3, testcase_bytes=100).start()
+        self.session = judge_server.install(requests.Session(), self.server.address)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_atcoder(self):
+        contests = list(AtCoderService().iterate_contest_data(session=self.session))
+        self.assertEqual(len(contests), 120)
+        self.assertEqual(contests[0].contest.contest_id, 'synth0120')
+        self.assertEqual(self.server.counter['atcoder.jp', '/contests/archive'], 3)
+
+        contest = AtCoderContest(contest_id='synth0001')
+        self.assertEqual([problem.problem_id for problem in contest.list_problems(session=self.session)], ['synth0001_a', 'synth0001_b', 'synth0001_c'])
+        self.assertEqual(len(list(contest.iterate_submissions(session=self.session))), 45)
+        problem = contest.list_problems(session=self.session)[0]
+        self.assertEqual(len(problem.download_sample_cases(session=self.session)), 1)
+
+    def test_other_services(self):
+        self.assertEqual(len(CodeforcesContest(contest_id=12).list_problems(session=self.session)), 3)
+        self.assertEqual([len(case.input_data) for case in AOJProblem(problem_id='DSL_1_A').download_system_cases(session=self.session)], [100, 100, 100])
+        self.assertEqual(len(YukicoderProblem(problem_no=1).download_system_cases(session=self.session)), 3)
+        self.assertEqual(len(KattisProblem(problem_id='hello').download_sample_cases(session=self.session)), 3)
+
+    def test_injected_error(self):
+        self.server.error_rate = 1.0
+        self.server.error_status = 500
+        with self.assertRaises(requests.exceptions.HTTPError):
+            utils.request('GET', 'https://atcoder.jp/contests/archive', session=self.session)
+
+    def test_fixtures_and_command(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'cassette.jsonl.gz'
+            write_cassette(path, {'https://atcoder.jp/contests/synth0001/tasks': '<html><body><table><tbody></tbody></table></body></html>'})
+            self.server.load_fixtures(path)
+            with judge_server.patch_oj_api(self.server.address):
+                result = main(['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-contest', 'https://atcoder.jp/contests/synth0001'], debug=True)
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(result['result']['name'], 'Synthetic Contest 1')
+            self.assertEqual(result['result']['problems'], [])
@@ -0,0 +1,29 @@
+import json
+import unittest
+
+import onlinejudge._implementation.profiling as profiling
+
+
+class ProfilingTest(unittest.TestCase):
+    def test_phase_without_profiler(self):
+        self.assertIsNone(profiling.get_current_profiler())
+        with profiling.phase('dispatch'):
+            pass
+
+    def test_summary(self):
+        profiler = profiling.Profiler()
+        profiler.start()
+        try:
+            with profiling.phase('dispatch'):
+                pass
+            with profiling.phase('dispatch'):
+                pass
+        finally:
+            profiler.stop()
+        self.assertIsNone(profiling.get_current_profiler())
+        summary = profiler.summary()
+        self.assertEqual(summary['phases']['dispatch']['count'], 2)
+        self.assertEqual(summary['network'], {})
+        self.assertEqual(summary['requests'], [])
+        self.assertEqual(summary['parsing'], {})
+        json.dumps(summary)
@@ -0,0 +1,62 @@
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+
+from onlinejudge._implementation.rate_limit import RateLimiter, TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_first_request_is_not_delayed(self):
+        bucket = TokenBucket(rate=1.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+
+    def test_interval(self):
+        bucket = TokenBucket(rate=10.0)
+        start = time.time()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.29)
+
+    def test_threads(self):
+        bucket = TokenBucket(rate=20.0)
+        timestamps = []
+        lock = threading.Lock()
+
+        def worker():
+            bucket.acquire()
+            with lock:
+                timestamps.append(time.time())
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        timestamps.sort()
+        self.assertGreaterEqual(timestamps[-1] - timestamps[0], 0.19)
+
+    def test_shared_with_file(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'example.com.json'
+            bucket1 = TokenBucket(rate=1.0, path=path)
+            bucket2 = TokenBucket(rate=1.0, path=path)
+            self.assertEqual(bucket1.acquire(), 0.0)
+            # the second bucket sees the token consumed by the first one
+            self.assertAlmostEqual(bucket2._reserve_with_file(path, now=time.time()), 1.0, delta=0.1)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_hosts_are_independent(self):
+        limiter = RateLimiter(interval=10.0)
+        self.assertEqual(limiter.acquire('https://atcoder.jp/contests/abc001'), 0.0)
+        self.assertEqual(limiter.acquire('https://codeforces.com/contest/1'), 0.0)
+
+    def test_configure(self):
+        limiter = RateLimiter(interval=10.0)
+        limiter.configure('atcoder.jp', interval=0.1, burst=2)
+        start = time.time()
+        for _ in range(3):
+            limiter.acquire('https://atcoder.jp/')
+        self.assertLess(time.time() - start, 1.0)
@@ -0,0 +1,139 @@
+import threading
+import time
+import unittest
+
+import requests
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.single_flight as single_flight
+import onlinejudge._implementation.utils as utils
+
+
+class _StallingHandler(QuietHTTPRequestHandler):
+    count = 0
+
+    def do_GET(self):
+        type(self).count += 1
+        if self.path == '/stall':
+            time.sleep(2.0)
+        if self.path == '/slow':
+            time.sleep(0.3)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+class DeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer(_StallingHandler).start()
+        self.base_url = self.server.base_url
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_deadline_exceeded(self):
+        session = requests.Session()
+        start = time.monotonic()
+        with utils.with_deadline(session, 0.5):
+            with self.assertRaises(requests.exceptions.Timeout):
+                utils.request('GET', self.base_url + '/stall', session=session)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_deadline_is_shared(self):
+        session = requests.Session()
+        with utils.with_deadline(session, 0.5):
+            utils.request('GET', self.base_url + '/', session=session)
+            time.sleep(0.6)
+            with self.assertRaises(utils.DeadlineExceededError):
+                utils.request('GET', self.base_url + '/', session=session)
+
+    def test_nested_deadline(self):
+        session = requests.Session()
+        with utils.with_deadline(session, 10.0):
+            with utils.with_deadline(session, 100.0):
+                self.assertLessEqual(utils.get_remaining_time(session), 10.0)
+            self.assertIsNotNone(utils.get_remaining_time(session))
+        self.assertIsNone(utils.get_remaining_time(session))
+
+
+class SingleFlightTest(unittest.TestCase):
+    def setUp(self):
+        _StallingHandler.count = 0
+        self.server = LocalHTTPServer(_StallingHandler).start()
+        self.base_url = self.server.base_url
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_concurrent_gets_are_coalesced(self):
+        session = requests.Session()
+        responses = []
+
+        def worker():
+            resp = utils.request('GET', self.base_url + '/slow', session=session)
+            resp.encoding = 'UTF-8'
+            responses.append(resp)
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(_StallingHandler.count, 1)
+        self.assertEqual(len(responses), 5)
+        self.assertEqual(len(set(map(id, responses))), 5)
+        self.assertTrue(all(resp.content == b'ok' for resp in responses))
+
+    def test_memoized_states_are_not_shared(self):
+        session = requests.Session()
+        responses = []
+
+        def worker():
+            resp = utils.request('GET', self.base_url + '/slow', session=session)
+            resp._onlinejudge_soup = object()  # memoized by the thread which got the response first
+            responses.append(resp)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(_StallingHandler.count, 1)
+        self.assertEqual(len(set(id(resp._onlinejudge_soup) for resp in responses)), 3)
+        self.assertEqual(len(set(id(resp.headers) for resp in responses)), 3)
+
+    def test_sequential_gets_are_not_coalesced(self):
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/', session=session)
+        utils.request('GET', self.base_url + '/', session=session)
+        self.assertEqual(_StallingHandler.count, 2)
+
+    def test_each_waiter_gets_its_own_exception(self):
+        flight = single_flight.SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.3)
+            raise requests.HTTPError('503 Server Error', response=requests.Response())
+
+        def worker():
+            try:
+                flight.do('key', fail)
+            except requests.HTTPError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait()
+        waiters = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in waiters:
+            thread.start()
+        for thread in [leader] + waiters:
+            thread.join()
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(len(set(map(id, errors))), 4)
+        self.assertTrue(all(e.args == ('503 Server Error', ) for e in errors))
+        self.assertEqual(len(set(id(e.response) for e in errors)), 1)
@@ -0,0 +1,97 @@
+import email.utils
+import time
+import unittest
+
+import requests
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.retry as retry
+import onlinejudge._implementation.utils as utils
+
+
+class _Handler(QuietHTTPRequestHandler):
+    failures = 0
+    count = 0
+
+    def _respond(self):
+        type(self).count += 1
+        if type(self).count <= type(self).failures:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', '0')))
+        self._respond()
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(retry.parse_retry_after('120'), 120.0)
+
+    def test_http_date(self):
+        now = time.time()
+        value = email.utils.formatdate(now + 30, usegmt=True)
+        self.assertAlmostEqual(retry.parse_retry_after(value, now=now), 30.0, delta=1.0)
+
+    def test_invalid(self):
+        self.assertIsNone(retry.parse_retry_after(None))
+        self.assertIsNone(retry.parse_retry_after('soon'))
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_backoff_is_bounded(self):
+        policy = retry.RetryPolicy(backoff_factor=1.0, max_backoff=10.0)
+        for attempt in range(10):
+            backoff = policy.get_backoff(attempt)
+            self.assertGreaterEqual(backoff, min(10.0, 2**attempt) / 2)
+            self.assertLessEqual(backoff, 10.0)
+
+    def test_budget(self):
+        policy = retry.RetryPolicy(total_budget=5.0)
+        resp = requests.Response()
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '10'
+        self.assertIsNone(policy.get_wait('GET', attempt=0, slept=0.0, response=resp))
+        resp.headers['Retry-After'] = '3'
+        self.assertEqual(policy.get_wait('GET', attempt=0, slept=0.0, response=resp), 3.0)
+        self.assertIsNone(policy.get_wait('GET', attempt=1, slept=3.0, response=resp))
+
+
+class RequestRetryTest(unittest.TestCase):
+    def setUp(self):
+        _Handler.count = 0
+        self.server = LocalHTTPServer(_Handler).start()
+        self.url = self.server.base_url + '/'
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_retry_get(self):
+        _Handler.failures = 2
+        resp = utils.request('GET', self.url, session=requests.Session())
+        self.assertEqual(resp.content, b'ok')
+        self.assertEqual(_Handler.count, 3)
+        self.assertGreaterEqual(retry.get_statistics()['127.0.0.1']['retry'], 2)
+
+    def test_give_up(self):
+        _Handler.failures = 10
+        policy = retry.RetryPolicy(max_retries=2)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            utils.request('GET', self.url, session=requests.Session(), retry_policy=policy)
+        self.assertEqual(_Handler.count, 3)
+
+    def test_post_is_not_retried(self):
+        _Handler.failures = 1
+        resp = utils.request('POST', self.url, session=requests.Session(), raise_for_status=False, data={'a': 'b'})
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(_Handler.count, 1)
@@ -0,0 +1,89 @@
+import json
+import pathlib
+import socket
+import tempfile
+import unittest
+
+import requests
+from tests.utils import LocalHTTPServer, QuietHTTPRequestHandler
+
+import onlinejudge._implementation.telemetry as telemetry
+import onlinejudge._implementation.utils as utils
+
+
+class _Handler(QuietHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'x' * 100
+        self.send_response(404 if self.path == '/404' else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TelemetryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer(_Handler).start()
+        self.base_url = self.server.base_url
+        self.sink = telemetry.AggregateSink()
+        telemetry.add_sink(self.sink)
+
+    def tearDown(self):
+        telemetry.remove_sink(self.sink)
+        self.server.stop()
+
+    def test_record(self):
+        session = requests.Session()
+        utils.request('GET', self.base_url + '/redirect', session=session)
+        self.assertEqual(len(self.sink.records), 1)
+        record = self.sink.records[0]
+        self.assertEqual(record.status_code, 200)
+        self.assertEqual(record.response_bytes, 100)
+        self.assertEqual(record.redirects, 1)
+        self.assertEqual(record.cache, 'bypass')
+        self.assertIsNotNone(record.ttfb_sec)
+        self.assertIsNone(record.caller)
+
+    def test_summary(self):
+        session = requests.Session()
+        for _ in range(3):
+            utils.request('GET', self.base_url + '/', session=session)
+        utils.request('GET', self.base_url + '/404', session=session, raise_for_status=False)
+        summary = self.sink.summary()
+        self.assertEqual(summary['127.0.0.1']['count'], 4)
+        self.assertEqual(summary['127.0.0.1']['bytes'], 400)
+        self.assertLessEqual(summary['127.0.0.1']['total_sec']['p50'], summary['127.0.0.1']['total_sec']['max'])
+
+    def test_error(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            url = 'http://127.0.0.1:{}/'.format(sock.getsockname()[1])  # nobody listens this port
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            utils.request('POST', url, session=requests.Session())
+        self.assertEqual(len(self.sink.records), 1)
+        self.assertIsNotNone(self.sink.records[0].error)
+
+    def test_json_lines_sink(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'requests.jsonl'
+            sink = telemetry.JSONLinesSink(path)
+            telemetry.add_sink(sink)
+            try:
+                utils.request('GET', self.base_url + '/', session=requests.Session())
+            finally:
+                telemetry.remove_sink(sink)
+            records = [json.loads(line) for line in path.read_text().splitlines()]
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0]['method'], 'GET')
+
+
+class PercentileTest(unittest.TestCase):
+    def test_percentile(self):
+        self.assertEqual(telemetry._percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.5), 3.0)
+        self.assertEqual(telemetry._percentile([1.0], 0.99), 1.0)
+        self.assertAlmostEqual(telemetry._percentile([0.0, 10.0], 0.9), 9.0)
@@ -0,0 +1,541 @@
+"""
+the module for a local stand-in server which emulates the endpoints of online judges, for tests and load testing
+
+The server dispatches requests with the `Host` header, so a single server emulates all hosts. It answers with the recorded responses in cassettes (see :py:mod:`onlinejudge._implementation.cassette`) if exist, and otherwise with synthetic pages whose sizes are configurable.
+Use :py:func:`install` to send requests of a session to the server instead of real judges, and :py:func:`patch_oj_api` or :py:func:`oj_api_command` to run `oj-api` with it.
+
+This is a development tool and is not installed with the library. Run `python3 -m tests.judge_server --help` in the repository to start it as a standalone process.
+"""
+
+import argparse
+import base64
+import collections
+import contextlib
+import datetime
+import hashlib
+import http.server
+import io
+import json
+import math
+import pathlib
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+import unittest.mock
+import urllib.parse
+import zipfile
+from logging import getLogger
+from typing import *
+
+import onlinejudge_api.main
+import requests
+import requests.adapters
+
+import onlinejudge._implementation.cassette as cassette
+
+logger = getLogger(__name__)
+
+# (status, headers, body)
+Reply = Tuple[int, List[Tuple[str, str]], bytes]
+
+ATCODER_ARCHIVE_PAGE_SIZE = 50
+ATCODER_SUBMISSIONS_PAGE_SIZE = 20
+
+_HTML = 'text/html; charset=utf-8'
+_JSON = 'application/json'
+
+
+def _html(body: str) -> Reply:
+    return 200, [('Content-Type', _HTML)], body.encode()
+
+
+def _json(data: Any) -> Reply:
+    return 200, [('Content-Type', _JSON)], json.dumps(data).encode()
+
+
+def _zip(files: Sequence[Tuple[str, bytes]]) -> Reply:
+    fh = io.BytesIO()
+    with zipfile.ZipFile(fh, 'w') as zf:
+        for name, content in files:
+            zf.writestr(name, content)
+    return 200, [('Content-Type', 'application/zip')], fh.getvalue()
+
+
+def _not_found() -> Reply:
+    return 404, [('Content-Type', 'text/plain')], b'Not Found'
+
+
+def _timeanddate_url(t: datetime.datetime) -> str:
+    return 'http://www.timeanddate.com/worldclock/fixedtime.html?iso={}&amp;p1=248'.format(t.strftime('%Y%m%dT%H%M'))
+
+
+class JudgeServer:
+    """JudgeServer is a threaded HTTP server which emulates online judges.
+
+    :ivar contests: the number of synthetic AtCoder and Codeforces contests
+    :ivar tasks: the number of problems in each synthetic contest
+    :ivar submissions: the number of submissions in each synthetic AtCoder contest
+    :ivar testcases: the number of system test cases of each synthetic AOJ, yukicoder or Kattis problem
+    :ivar testcase_bytes: the size of each synthetic system test case
+    :ivar latency: the injected latency for each response in seconds
+    :ivar error_rate: the probability to answer with an injected error
+    :ivar error_status: the status code of injected errors. If `0`, the connection is closed without any response.
+    :ivar renew_session: renew the session cookie `REVEL_SESSION` in every response for AtCoder, as the real server does
+    :ivar counter: the numbers of served requests for each `(host, path)`
+    """
+    def __init__(
+            self,
+            *,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            fixtures: Iterable[pathlib.Path] = (),
+            contests: int = 100,
+            tasks: int = 6,
+            submissions: int = 100,
+            testcases: int = 10,
+            testcase_bytes: int = 1024,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            error_status: int = 503,
+            renew_session: bool = False,
+            seed: Optional[int] = None,
+    ):
+        assert 1 <= tasks <= 26
+        self.contests = contests
+        self.tasks = tasks
+        self.submissions = submissions
+        self.testcases = testcases
+        self.testcase_bytes = testcase_bytes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.renew_session = renew_session
+        self._session_serial = 0
+        self.counter = collections.Counter()  # type: Counter[Tuple[str, str]]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fixtures = {}  # type: Dict[Tuple[str, str, str], Reply]
+        for path in fixtures:
+            self.load_fixtures(path)
+        self._routes = [
+            (r'atcoder\.jp', r'/contests/archive', self._atcoder_archive),
+            (r'atcoder\.jp', r'/contests/([\w\-]+)', self._atcoder_contest),
+            (r'atcoder\.jp', r'/contests/([\w\-]+)/tasks', self._atcoder_tasks),
+            (r'atcoder\.jp', r'/contests/([\w\-]+)/tasks/([\w\-]+)', self._atcoder_task),
+            (r'atcoder\.jp', r'/contests/([\w\-]+)/tasks_print', self._atcoder_tasks_print),
+            (r'atcoder\.jp', r'/contests/([\w\-]+)/submissions', self._atcoder_submissions),
+            (r'codeforces\.com', r'/api/contest\.list', self._codeforces_contest_list),
+            (r'codeforces\.com', r'/api/contest\.standings', self._codeforces_contest_standings),
+            (r'judgedat\.u-aizu\.ac\.jp', r'/testcases/samples/(\w+)', self._aoj_samples),
+            (r'judgedat\.u-aizu\.ac\.jp', r'/testcases/(\w+)/header', self._aoj_header),
+            (r'judgedat\.u-aizu\.ac\.jp', r'/testcases/(\w+)/(\d+)/(in|out)', self._aoj_testcase),
+            (r'yukicoder\.me', r'/?', self._yukicoder_top),
+            (r'yukicoder\.me', r'/problems/no/(\d+)', self._yukicoder_problem),
+            (r'yukicoder\.me', r'/problems/no/(\d+)/testcase\.zip', self._yukicoder_testcase_zip),
+            (r'[\w\-]+\.kattis\.com', r'/problems/([\w\-]+)/file/statement/samples\.zip', self._kattis_samples_zip),
+        ]  # type: List[Tuple[str, str, Callable[..., Reply]]]
+        self._server = None  # type: Optional[http.server.HTTPServer]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._address = (host, port)
+
+    def load_fixtures(self, path: pathlib.Path) -> None:
+        """load_fixtures() loads a cassette. Recorded responses take priority over synthetic ones.
+        """
+
+        for interaction in cassette.load_interactions(path):
+            request = interaction['request']
+            response = interaction['response']
+            url = urllib.parse.urlsplit(request['url'])
+            key = (request['method'], url.netloc, urllib.parse.urlunsplit(('', '', url.path or '/', url.query, '')))
+            headers = [(name, value) for name, value in response['headers'] if name.lower() not in ('set-cookie', )]
+            self._fixtures[key] = (response['status'], headers, base64.b64decode(response['body']))
+        logger.info('judge server: %d fixtures loaded', len(self._fixtures))
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def start(self) -> 'JudgeServer':
+        server = self
+
+        class Handler(_Handler):
+            judge_server = server
+
+        self._server = _ThreadingHTTPServer(self._address, Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info('judge server: listening on %s:%d', *self.address)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> 'JudgeServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def should_inject_error(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def handle(self, method: str, host: str, target: str) -> Reply:
+        url = urllib.parse.urlsplit(target)
+        with self._lock:
+            self.counter[host, url.path] += 1
+
+        if (method, host, target) in self._fixtures:
+            return self._fixtures[method, host, target]
+        if method != 'GET':
+            return _not_found()
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        hostname = host.split(':')[0]
+        for host_pattern, path_pattern, func in self._routes:
+            if re.fullmatch(host_pattern, hostname):
+                m = re.fullmatch(path_pattern, url.path)
+                if m:
+                    return func(*m.groups(), query=query)
+        return _not_found()
+
+    def get_session_cookie(self, host: str) -> Optional[str]:
+        """
+        :return: the value of `Set-Cookie` header to renew the session cookie, or `None`
+        """
+
+        if not self.renew_session or not re.fullmatch(r'atcoder\.jp', host.split(':')[0]):
+            return None
+        with self._lock:
+            self._session_serial += 1
+            serial = self._session_serial
+        data = urllib.parse.quote('\0csrf_token:synthetic\0\0_TS:{}\0'.format(1600000000 + serial))
+        return 'REVEL_SESSION={}-{}; Path=/; HttpOnly'.format(hashlib.sha1(data.encode()).hexdigest(), data)
+
+    # synthetic data
+
+    def _get_contest_index(self, contest_id: str) -> Optional[int]:
+        m = re.fullmatch(r'synth(\d+)', contest_id)
+        if m and 1 <= int(m.group(1)) <= self.contests:
+            return int(m.group(1))
+        return None
+
+    def _get_start_time(self, index: int) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, 21, 0) + datetime.timedelta(days=index)
+
+    def _get_sample(self, seed: int) -> Tuple[bytes, bytes]:
+        a, b = seed % 1000, seed // 1000 % 1000
+        return '{} {}\n'.format(a, b).encode(), '{}\n'.format(a + b).encode()
+
+    def _get_testcase(self, seed: int, i: int) -> Tuple[bytes, bytes]:
+        line = '{} {}\n'.format(seed, i).encode()
+        body = (line * (self.testcase_bytes // len(line) + 1))[:self.testcase_bytes]
+        return body, str(len(body)).encode() + b'\n'
+
+    def _atcoder_archive(self, *, query: Dict[str, str]) -> Reply:
+        page = int(query.get('page', '1'))
+        name_format = 'Synthetic Contest {}' if query.get('lang') == 'en' else '合成コンテスト {}'
+        last_page = max(1, math.ceil(self.contests / ATCODER_ARCHIVE_PAGE_SIZE))
+        rows = []
+        for i in range((page - 1) * ATCODER_ARCHIVE_PAGE_SIZE, min(page * ATCODER_ARCHIVE_PAGE_SIZE, self.contests)):
+            index = self.contests - i  # newer contests first
+            rows.append('<tr><td><a href="{}" target="blank"><time class="fixtime fixtime-full">{}</time></a></td><td><span>&#x24B6;</span> <a href="/contests/synth{:04d}">{}</a></td><td>01:40</td><td> - 1999</td></tr>'.format(_timeanddate_url(self._get_start_time(index)), self._get_start_time(index).strftime('%Y-%m-%d %H:%M:%S+0900'), index, name_format.format(index)))
+        pagination = ''.join('<li><a href="/contests/archive?page={0}">{0}</a></li>'.format(p) for p in sorted({1, page, last_page}))
+        return _html('<html><head><title>Contest Archive - AtCoder</title></head><body><ul class="pagination">{}</ul><table><thead><tr><th>Start Time</th><th>Contest Name</th><th>Duration</th><th>Rated Range</th></tr></thead><tbody>{}</tbody></table></body></html>'.format(pagination, ''.join(rows)))
+
+    def _atcoder_contest(self, contest_id: str, *, query: Dict[str, str]) -> Reply:
+        index = self._get_contest_index(contest_id)
+        if index is None:
+            return _not_found()
+        start_time = self._get_start_time(index)
+        end_time = start_time + datetime.timedelta(minutes=100)
+        return _html('<html><head><title>Synthetic Contest {} - AtCoder</title></head><body><small class="contest-duration">Contest Duration: <a href="{}">{}</a> - <a href="{}">{}</a></small><span>Can Participate: All</span><span>Rated Range: - 1999</span><span>Penalty: 5 minutes</span></body></html>'.format(index, _timeanddate_url(start_time), start_time, _timeanddate_url(end_time), end_time))
+
+    def _atcoder_tasks(self, contest_id: str, *, query: Dict[str, str]) -> Reply:
+        if self._get_contest_index(contest_id) is None:
+            return _not_found()
+        rows = []
+        for i in range(self.tasks):
+            alphabet = chr(ord('A') + i)
+            path = '/contests/{}/tasks/{}_{}'.format(contest_id, contest_id, alphabet.lower())
+            rows.append('<tr><td><a href="{0}">{1}</a></td><td><a href="{0}">Problem {1}</a></td><td>2 sec</td><td>1024 MB</td><td></td></tr>'.format(path, alphabet))
+        return _html('<html><head><title>Tasks - Synthetic Contest</title></head><body><table><tbody>{}</tbody></table></body></html>'.format(''.join(rows)))
+
+    def _atcoder_task_statement(self, index: int, alphabet: str) -> str:
+        sample_input, sample_output = self._get_sample(index * 26 + ord(alphabet.lower()) - ord('a'))
+        return '<span class="h2">{0} - Problem {0}</span><p>Time Limit: 2 sec / Memory Limit: 1024 MB</p><div id="task-statement"><span class="lang"><span class="lang-en"><p>Score : <var>100</var> points</p><div class="part"><section><h3>Input</h3><pre><var>A</var> <var>B</var></pre></section></div><div class="part"><section><h3>Sample Input 1</h3><pre>{1}</pre></section></div><div class="part"><section><h3>Sample Output 1</h3><pre>{2}</pre></section></div></span></span></div>'.format(alphabet, sample_input.decode(), sample_output.decode())
+
+    def _atcoder_task(self, contest_id: str, problem_id: str, *, query: Dict[str, str]) -> Reply:
+        index = self._get_contest_index(contest_id)
+        m = re.fullmatch(re.escape(contest_id) + r'_([a-z])', problem_id)
+        if index is None or not m or ord(m.group(1)) - ord('a') >= self.tasks:
+            return _not_found()
+        alphabet = m.group(1).upper()
+        return _html('<html><head><title>{1} - Problem {1}</title></head><body><a class="contest-title" href="/contests/{0}">Synthetic Contest {2}</a>{3}</body></html>'.format(contest_id, alphabet, index, self._atcoder_task_statement(index, alphabet)))
+
+    def _atcoder_tasks_print(self, contest_id: str, *, query: Dict[str, str]) -> Reply:
+        index = self._get_contest_index(contest_id)
+        if index is None:
+            return _not_found()
+        sections = ['<div class="col-sm-12">{}</div>'.format(self._atcoder_task_statement(index, chr(ord('A') + i))) for i in range(self.tasks)]
+        return _html('<html><head><title>Tasks - Synthetic Contest {}</title></head><body>{}</body></html>'.format(index, '<hr>'.join(sections)))
+
+    def _atcoder_submissions(self, contest_id: str, *, query: Dict[str, str]) -> Reply:
+        index = self._get_contest_index(contest_id)
+        if index is None:
+            return _not_found()
+        page = int(query.get('page', '1'))
+        ids = list(range(self.submissions))
+        if query.get('desc') == 'true':
+            ids.reverse()
+        ids = ids[(page - 1) * ATCODER_SUBMISSIONS_PAGE_SIZE:page * ATCODER_SUBMISSIONS_PAGE_SIZE]
+        if not ids:
+            return _html('<html><head><title>Submissions - Synthetic Contest</title></head><body><p>No Submissions</p></body></html>')
+        rows = []
+        for i in ids:
+            alphabet = chr(ord('a') + i % self.tasks)
+            submitted = self._get_start_time(index) + datetime.timedelta(seconds=i)
+            rows.append('<tr><td><time class="fixtime fixtime-second">{0}</time></td><td><a href="/contests/{1}/tasks/{1}_{2}">{3} - Problem {3}</a></td><td><a href="/users/user{4}">user{4}</a> <a href="/contests/{1}/submissions?f.User=user{4}"><span class="glyphicon glyphicon-search" aria-hidden="true"></span></a></td><td>Python (3.8.2)</td><td>100</td><td>42 Byte</td><td><span class="label label-success">AC</span></td><td>17 ms</td><td>9000 KB</td><td class="text-center"><a href="/contests/{1}/submissions/{5}">Detail</a></td></tr>'.format(submitted.strftime('%Y-%m-%d %H:%M:%S+0900'), contest_id, alphabet, alphabet.upper(), i % 100, index * 1000000 + i))
+        return _html('<html><head><title>Submissions - Synthetic Contest</title></head><body><table><tbody>{}</tbody></table></body></html>'.format(''.join(rows)))
+
+    def _codeforces_contest(self, index: int) -> Dict[str, Any]:
+        return {
+            'id': index,
+            'name': 'Synthetic Round #{}'.format(index),
+            'type': 'CF',
+            'phase': 'FINISHED',
+            'frozen': False,
+            'durationSeconds': 7200,
+            'startTimeSeconds': int(self._get_start_time(index).replace(tzinfo=datetime.timezone.utc).timestamp()),
+            'relativeTimeSeconds': 86400,
+        }
+
+    def _codeforces_contest_list(self, *, query: Dict[str, str]) -> Reply:
+        return _json({'status': 'OK', 'result': [self._codeforces_contest(index) for index in range(self.contests, 0, -1)]})
+
+    def _codeforces_contest_standings(self, *, query: Dict[str, str]) -> Reply:
+        index = int(query.get('contestId', '0'))
+        if not 1 <= index <= self.contests:
+            return 400, [('Content-Type', _JSON)], json.dumps({'status': 'FAILED', 'comment': 'contestId: Contest with id {} not found'.format(index)}).encode()
+        problems = [{
+            'contestId': index,
+            'index': chr(ord('A') + i),
+            'name': 'Problem {}'.format(chr(ord('A') + i)),
+            'type': 'PROGRAMMING',
+            'points': 500.0 * (i + 1),
+            'tags': [],
+        } for i in range(self.tasks)]
+        return _json({'status': 'OK', 'result': {'contest': self._codeforces_contest(index), 'problems': problems, 'rows': []}})
+
+    def _aoj_samples(self, problem_id: str, *, query: Dict[str, str]) -> Reply:
+        sample_input, sample_output = self._get_sample(sum(map(ord, problem_id)))
+        return _json([{'problemId': problem_id, 'serial': 1, 'in': sample_input.decode(), 'out': sample_output.decode()}])
+
+    def _aoj_header(self, problem_id: str, *, query: Dict[str, str]) -> Reply:
+        headers = [{'serial': i + 1, 'name': 'case{}'.format(i + 1), 'inputSize': self.testcase_bytes, 'outputSize': 0, 'score': 1} for i in range(self.testcases)]
+        return _json({'problemId': problem_id, 'headers': headers})
+
+    def _aoj_testcase(self, problem_id: str, serial: str, kind: str, *, query: Dict[str, str]) -> Reply:
+        if not 1 <= int(serial) <= self.testcases:
+            return _not_found()
+        testcase_input, testcase_output = self._get_testcase(sum(map(ord, problem_id)), int(serial))
+        return 200, [('Content-Type', 'text/plain')], (testcase_input if kind == 'in' else testcase_output)
+
+    def _yukicoder_top(self, *, query: Dict[str, str]) -> Reply:
+        return _html('<html><head><title>yukicoder</title></head><body><a href="/users/1">synthetic user</a></body></html>')
+
+    def _yukicoder_problem(self, problem_no: str, *, query: Dict[str, str]) -> Reply:
+        sample_input, sample_output = self._get_sample(int(problem_no))
+        return _html('<html><head><title>No.{0} Problem {0} - yukicoder</title></head><body><div id="content"><div class="sample"><h5 class="underline">サンプル1</h5><div class="paragraph"><h6>入力</h6><pre>{1}</pre><h6>出力</h6><pre>{2}</pre></div></div></div></body></html>'.format(problem_no, sample_input.decode(), sample_output.decode()))
+
+    def _yukicoder_testcase_zip(self, problem_no: str, *, query: Dict[str, str]) -> Reply:
+        files = []
+        for i in range(self.testcases):
+            testcase_input, testcase_output = self._get_testcase(int(problem_no), i)
+            files.append(('test_in/{:02d}.txt'.format(i + 1), testcase_input))
+            files.append(('test_out/{:02d}.txt'.format(i + 1), testcase_output))
+        return _zip(files)
+
+    def _kattis_samples_zip(self, problem_id: str, *, query: Dict[str, str]) -> Reply:
+        files = []
+        for i in range(self.testcases):
+            sample_input, sample_output = self._get_sample(sum(map(ord, problem_id)) + i)
+            files.append(('{}.in'.format(i + 1), sample_input))
+            files.append(('{}.ans'.format(i + 1), sample_output))
+        return _zip(files)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections alive as real servers do
+    judge_server = None  # type: JudgeServer
+
+    def _reply(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        server = self.judge_server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.should_inject_error():
+            if server.error_status == 0:
+                self.close_connection = True
+                return
+            self.send_response(server.error_status)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        host = self.headers.get('Host', '')
+        status, headers, body = server.handle(self.command, host, self.path)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        session_cookie = server.get_session_cookie(host)
+        if session_cookie is not None:
+            self.send_header('Set-Cookie', session_cookie)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = _reply
+    do_HEAD = _reply
+    do_POST = _reply
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug('judge server: ' + format, *args)
+
+
+class HostOverrideAdapter(requests.adapters.HTTPAdapter):
+    """HostOverrideAdapter sends requests to the given address instead of the hosts in URLs.
+
+    The original host is sent as the `Host` header. The URLs of responses are restored, so cookies and redirects work as if they came from the real hosts.
+    """
+    def __init__(self, address: Tuple[str, int], *, hosts: Optional[Container[str]] = None, **kwargs):
+        """
+        :param hosts: hostnames to override. If `None`, all hosts are overridden.
+        """
+
+        super().__init__(**kwargs)
+        self.address = address
+        self.hosts = hosts
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:  # type: ignore
+        url = urllib.parse.urlsplit(request.url or '')
+        if self.hosts is not None and url.hostname not in self.hosts:
+            return super().send(request, **kwargs)
+        overridden = request.copy()
+        overridden.url = urllib.parse.urlunsplit(('http', '{}:{}'.format(*self.address), url.path, url.query, ''))
+        overridden.headers['Host'] = url.netloc
+        kwargs['proxies'] = {}
+        resp = super().send(overridden, **kwargs)
+        resp.url = request.url or ''
+        resp.request = request
+        return resp
+
+
+def install(session: requests.Session, address: Tuple[str, int], *, hosts: Optional[Container[str]] = None) -> requests.Session:
+    """install() mounts :py:class:`HostOverrideAdapter` to the session.
+    """
+
+    logger.info('send requests to the judge server at %s:%d', *address)
+    adapter = HostOverrideAdapter(address, hosts=hosts)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def parse_address(s: str) -> Tuple[str, int]:
+    """
+    :param s: a string like `127.0.0.1:8080` or `8080`
+    """
+
+    host, _, port = s.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+@contextlib.contextmanager
+def patch_oj_api(address: Tuple[str, int]) -> Iterator[None]:
+    """patch_oj_api() makes :py:func:`onlinejudge_api.main.main` in this process send all requests to the server.
+    """
+
+    prepare_session = onlinejudge_api.main.prepare_session
+
+    def wrapped(parsed: argparse.Namespace, *, parser: argparse.ArgumentParser) -> requests.Session:
+        return install(prepare_session(parsed, parser=parser), address)
+
+    with unittest.mock.patch.object(onlinejudge_api.main, 'prepare_session', wrapped):
+        yield
+
+
+def oj_api_command(address: Tuple[str, int], args: List[str]) -> List[str]:
+    """
+    :return: the command line to run `oj-api` as a subprocess which sends all requests to the server. The subprocess must run in the root directory of the repository.
+    """
+
+    return [sys.executable, '-m', 'tests.judge_server', '--oj-api', '{}:{}'.format(*address), '--', *args]
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='a local stand-in server for online judges')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', type=pathlib.Path, action='append', default=[], help='a cassette recorded with `oj-api --record`. This option can be specified more than once.')
+    parser.add_argument('--contests', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=6)
+    parser.add_argument('--submissions', type=int, default=100, help='the number of submissions for each contest')
+    parser.add_argument('--testcases', type=int, default=10)
+    parser.add_argument('--testcase-bytes', type=int, default=1024)
+    parser.add_argument('--latency', type=float, default=0.0, help='in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503, help='use 0 to close connections without responses')
+    parser.add_argument('--renew-session', action='store_true', help='renew the session cookie of AtCoder in every response')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--oj-api', metavar='HOST:PORT', type=parse_address, help='run `oj-api` with the arguments after `--`, sending all requests to the server already running at the address, instead of starting a server')
+    parser.add_argument('oj_api_args', nargs='*', help=argparse.SUPPRESS)
+    parsed = parser.parse_args(args=args)
+
+    if parsed.oj_api is not None:
+        with patch_oj_api(parsed.oj_api):
+            onlinejudge_api.main.main(parsed.oj_api_args)
+        return
+
+    server = JudgeServer(
+        host=parsed.host,
+        port=parsed.port,
+        fixtures=parsed.fixtures,
+        contests=parsed.contests,
+        tasks=parsed.tasks,
+        submissions=parsed.submissions,
+        testcases=parsed.testcases,
+        testcase_bytes=parsed.testcase_bytes,
+        latency=parsed.latency,
+        error_rate=parsed.error_rate,
+        error_status=parsed.error_status,
+        renew_session=parsed.renew_session,
+        seed=parsed.seed,
+    )
+    with server:
+        print('listening on {}:{}'.format(*server.address), flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import json
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+import onlinejudge_api.main
+import tests.judge_server as judge_server
+
+import onlinejudge._implementation.http_cache as http_cache
+from onlinejudge.service.atcoder import AtCoderContest, AtCoderProblemDetailedData
+from onlinejudge.type import SampleParseError
+
+
+class SchemaExampleTest(unittest.TestCase):
+    def test_schema_examples(self):
+        onlinejudge_api.main.check_schema_examples()
+
+
+class StartupTest(unittest.TestCase):
+    def test_jsonschema_is_not_imported(self):
+        code = 'import sys, onlinejudge_api.main; onlinejudge_api.main.get_parser(); print("jsonschema" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b'False')
+
+    def test_epilog_is_built_for_help(self):
+        output = subprocess.check_output([sys.executable, '-m', 'onlinejudge_api.main', 'get-contest', '--help'])
+        self.assertIn(b'JSON schema:', output)
+
+
+class GetProblemOutputDirTest(unittest.TestCase):
+    def test_output_dir(self):
+        with judge_server.JudgeServer(contests=1, tasks=2, testcases=3) as server, judge_server.patch_oj_api(server.address), tempfile.TemporaryDirectory() as tempdir:
+            output_dir = pathlib.Path(tempdir) / 'test'
+            args = ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-problem', '--system', '--output-dir', str(output_dir), '--format', '%s.%e', 'https://yukicoder.me/problems/no/1']
+            result = onlinejudge_api.main.main(args, debug=True)
+            self.assertEqual(result['status'], 'ok')
+            tests = result['result']['tests']
+            self.assertEqual(len(tests), 3)
+            for test in tests:
+                self.assertNotIn('input', test)
+                with open(test['inputPath'], 'rb') as fh:
+                    self.assertEqual(len(fh.read()), test['inputSize'])
+                self.assertTrue(pathlib.Path(test['outputPath']).is_file())
+            self.assertEqual(sorted(path.name for path in output_dir.iterdir()), ['01.txt.in', '01.txt.out', '02.txt.in', '02.txt.out', '03.txt.in', '03.txt.out'])
+
+            # existing files are not overwritten
+            result = onlinejudge_api.main.main(args, debug=True)
+            self.assertEqual(result['status'], 'error')
+
+
+class GetContestWithSamplesTest(unittest.TestCase):
+    def test_atcoder(self):
+        with judge_server.JudgeServer(contests=1, tasks=3) as server, judge_server.patch_oj_api(server.address), tempfile.TemporaryDirectory() as tempdir:
+            args = ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-contest', '--with-samples', 'https://atcoder.jp/contests/synth0001']
+            result = onlinejudge_api.main.main(args, debug=True)
+            paths = sorted(path for (host, path) in server.counter)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual([problem['tests'] for problem in result['result']['problems']], [
+            [{
+                'input': '26 0\n',
+                'output': '26\n'
+            }],
+            [{
+                'input': '27 0\n',
+                'output': '27\n'
+            }],
+            [{
+                'input': '28 0\n',
+                'output': '28\n'
+            }],
+        ])
+        self.assertEqual(paths, ['/contests/synth0001', '/contests/synth0001/tasks', '/contests/synth0001/tasks_print'])  # no requests for each task
+
+    def run_get_contest(self, server, tempdir):
+        args = ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), 'get-contest', '--with-samples', 'https://atcoder.jp/contests/synth0001']
+        with judge_server.patch_oj_api(server.address):
+            return onlinejudge_api.main.main(args, debug=True)
+
+    def test_atcoder_broken_samples(self):
+        with judge_server.JudgeServer(contests=1, tasks=3) as server, tempfile.TemporaryDirectory() as tempdir:
+            with unittest.mock.patch.object(AtCoderProblemDetailedData, '_parse_sample_cases', side_effect=SampleParseError()):
+                result = self.run_get_contest(server, tempdir)
+            paths = sorted(path for (host, path) in server.counter)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual([problem.get('tests') for problem in result['result']['problems']], [None, None, None])
+        self.assertEqual(paths, ['/contests/synth0001', '/contests/synth0001/tasks', '/contests/synth0001/tasks_print'])
+
+    def test_atcoder_missing_samples(self):
+        with judge_server.JudgeServer(contests=1, tasks=3) as server, tempfile.TemporaryDirectory() as tempdir:
+            with unittest.mock.patch.object(AtCoderContest, 'download_all_sample_cases', return_value={'A': None}):
+                result = self.run_get_contest(server, tempdir)
+            paths = sorted(path for (host, path) in server.counter)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual([problem.get('tests') for problem in result['result']['problems']], [
+            None,
+            [{
+                'input': '27 0\n',
+                'output': '27\n'
+            }],
+            [{
+                'input': '28 0\n',
+                'output': '28\n'
+            }],
+        ])
+        self.assertEqual(paths, ['/contests/synth0001', '/contests/synth0001/tasks', '/contests/synth0001/tasks/synth0001_b', '/contests/synth0001/tasks/synth0001_c'])
+
+
+class PrefetchTest(unittest.TestCase):
+    def tearDown(self):
+        http_cache.set_default_cache(None)
+
+    def test_prefetch(self):
+        with judge_server.JudgeServer(contests=1, tasks=3) as server, judge_server.patch_oj_api(server.address), tempfile.TemporaryDirectory() as tempdir:
+            options = ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), '--http-cache-dir', str(pathlib.Path(tempdir) / 'http'), '--http-cache-ttl', '3600']
+            result = onlinejudge_api.main.main([*options, 'prefetch', 'https://atcoder.jp/contests/synth0001'], debug=True)
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual([problem['status'] for problem in result['result']['problems']], ['ok', 'ok', 'ok'])
+            self.assertEqual(server.counter['atcoder.jp', '/contests/synth0001/tasks/synth0001_b'], 1)
+
+            # later commands are served from the cache
+            counter = dict(server.counter)
+            result = onlinejudge_api.main.main([*options, '--http-cache', 'get-problem', 'https://atcoder.jp/contests/synth0001/tasks/synth0001_b'], debug=True)
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(result['result']['tests'], [{'input': '27 0\n', 'output': '27\n'}])
+            self.assertEqual(dict(server.counter), counter)
+
+    def test_prefetch_with_renewed_session_cookies(self):
+        with judge_server.JudgeServer(contests=1, tasks=3, renew_session=True) as server, tempfile.TemporaryDirectory() as tempdir:
+            options = ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), '--http-cache-dir', str(pathlib.Path(tempdir) / 'http'), '--http-cache-ttl', '3600']
+            proc = subprocess.run(judge_server.oj_api_command(server.address, [*options, 'prefetch', 'https://atcoder.jp/contests/synth0001']), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+            self.assertEqual(proc.returncode, 0)
+
+            # another process, which sends the renewed cookie, gets a cache hit
+            counter = dict(server.counter)
+            proc = subprocess.run(judge_server.oj_api_command(server.address, [*options, '--http-cache', 'get-problem', 'https://atcoder.jp/contests/synth0001/tasks/synth0001_b']), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+            self.assertEqual(proc.returncode, 0)
+            self.assertEqual(json.loads(proc.stdout)['result']['tests'], [{'input': '27 0\n', 'output': '27\n'}])
+            self.assertEqual(dict(server.counter), counter)
+
+
+class StreamTest(unittest.TestCase):
+    def run_command(self, server, tempdir, args):
+        command = judge_server.oj_api_command(server.address, ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), '--stream', *args])
+        proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+        return proc.returncode, [json.loads(line) for line in proc.stdout.decode().splitlines()]
+
+    def test_get_contest(self):
+        with judge_server.JudgeServer(contests=1, tasks=3) as server, tempfile.TemporaryDirectory() as tempdir:
+            returncode, records = self.run_command(server, tempdir, ['get-contest', 'https://atcoder.jp/contests/synth0001'])
+        self.assertEqual(returncode, 0)
+        self.assertEqual([record['type'] for record in records], ['header', 'item', 'item', 'item', 'trailer'])
+        self.assertEqual(records[0]['subcommand'], 'get-contest')
+        self.assertEqual({record['key'] for record in records[1:-1]}, {'problems'})
+        self.assertEqual([record['value']['context']['alphabet'] for record in records[1:-1]], ['A', 'B', 'C'])
+        self.assertEqual(records[-1]['status'], 'ok')
+        self.assertEqual(records[-1]['result']['name'], 'Synthetic Contest 1')
+        self.assertEqual(records[-1]['result']['problems'], [])
+
+    def test_error(self):
+        with judge_server.JudgeServer(contests=1) as server, tempfile.TemporaryDirectory() as tempdir:
+            returncode, records = self.run_command(server, tempdir, ['get-problem', 'https://example.com/'])
+        self.assertEqual(returncode, 1)
+        self.assertEqual([record['type'] for record in records], ['header', 'trailer'])
+        self.assertEqual(records[-1]['status'], 'error')
+
+
+class ProfileTest(unittest.TestCase):
+    def test_profile(self):
+        with judge_server.JudgeServer(contests=1, tasks=1) as server, tempfile.TemporaryDirectory() as tempdir:
+            profile_output = pathlib.Path(tempdir) / 'profile.out'
+            command = judge_server.oj_api_command(server.address, ['--wait', '0', '--cookie', str(pathlib.Path(tempdir) / 'cookie.jar'), '--profile-output', str(profile_output), 'get-problem', 'https://atcoder.jp/contests/synth0001/tasks/synth0001_a'])
+            proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+            self.assertEqual(proc.returncode, 0)
+            self.assertTrue(profile_output.exists())
+        self.assertEqual(json.loads(proc.stdout.decode())['status'], 'ok')
+        summary = json.loads(proc.stderr.decode().splitlines()[-1])
+        self.assertEqual(set(summary['phases']), {'dispatch', 'cookie.save', 'validation', 'encoding'})
+        self.assertEqual(list(summary['network']), ['atcoder.jp'])
+        self.assertTrue(any(name.startswith('onlinejudge/service/atcoder.py:') for name in summary['parsing']))
@@ -0,0 +1,92 @@
+import json
+import pathlib
+import socket
+import subprocess
+import tempfile
+import time
+import unittest
+
+import tests.judge_server as judge_server
+from onlinejudge_api.serve import Server
+
+
+class ServeTest(unittest.TestCase):
+    def setUp(self):
+        self.server = judge_server.JudgeServer(contests=3, tasks=2).start()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.command = judge_server.oj_api_command(self.server.address, ['--wait', '0', '--cookie', str(pathlib.Path(self.tempdir.name) / 'cookie.jar'), 'serve'])
+
+    def tearDown(self):
+        self.server.stop()
+        self.tempdir.cleanup()
+
+    def test_stdio(self):
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "get-contest",
+                "params": ["https://atcoder.jp/contests/synth0001"]
+            },
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "get-problem",
+                "params": ["https://atcoder.jp/contests/synth0001/tasks/synth0001_b"]
+            },
+            {
+                "jsonrpc": "2.0",
+                "id": 3,
+                "method": "get-problem",
+                "params": ["--no-such-option"]
+            },
+            {
+                "jsonrpc": "2.0",
+                "id": 4,
+                "method": "serve",
+                "params": []
+            },
+        ]
+        proc = subprocess.run(self.command, input=''.join(json.dumps(request) + '\n' for request in requests).encode(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+        responses = [json.loads(line) for line in proc.stdout.decode().splitlines()]
+        self.assertEqual([response['id'] for response in responses], [1, 2, 3, 4])
+        self.assertEqual(responses[0]['result']['status'], 'ok')
+        self.assertEqual(len(responses[0]['result']['result']['problems']), 2)
+        self.assertEqual(responses[1]['result']['result']['tests'][0]['output'], '27\n')
+        self.assertEqual(responses[2]['result']['status'], 'error')
+        self.assertEqual(responses[3]['error']['code'], -32601)
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are required')
+    def test_unix_socket(self):
+        path = pathlib.Path(self.tempdir.name) / 'oj-api.sock'
+        cookie_path = pathlib.Path(self.tempdir.name) / 'cookie.jar'
+        cookie_path.write_text('#LWP-Cookies-2.0\n')
+        cookie_path.chmod(0o644)
+        proc = subprocess.Popen(self.command + ['--socket', str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                if path.exists():
+                    break
+                time.sleep(0.1)
+            with socket.socket(socket.AF_UNIX) as sock:
+                sock.connect(str(path))
+                fh = sock.makefile('rw')
+                for i in range(2):
+                    fh.write(json.dumps({"jsonrpc": "2.0", "id": i, "method": "get-contest", "params": ["https://atcoder.jp/contests/synth0002"]}) + '\n')
+                    fh.flush()
+                    response = json.loads(fh.readline())
+                    self.assertEqual(response['result']['result']['name'], 'Synthetic Contest 2')
+            self.assertEqual(cookie_path.stat().st_mode & 0o777, 0o600)  # saved after each request, before the server exits
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+class ServerTest(unittest.TestCase):
+    def test_process(self):
+        server = Server(lambda subcommand, args: {"status": "ok", "messages": [], "result": [subcommand, *args]})
+        self.assertEqual(server.process('{"jsonrpc": "2.0", "id": "a", "method": "get-service", "params": ["x"]}'), {"jsonrpc": "2.0", "id": "a", "result": {"status": "ok", "messages": [], "result": ["get-service", "x"]}})
+        self.assertIsNone(server.process('{"jsonrpc": "2.0", "method": "get-service"}'))
+        self.assertEqual(server.process('{')['error']['code'], -32700)
+        self.assertEqual(server.process('[]')['error']['code'], -32600)
+        self.assertEqual(server.process('{"jsonrpc": "2.0", "id": 1, "method": "get-service", "params": {"url": "x"}}')['error']['code'], -32602)
@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
+import datetime
+import pathlib
+import tempfile
 import unittest
+import unittest.mock
 
+import bs4
 import requests
+import tests.judge_server as judge_server
 
+import onlinejudge.service.atcoder as atcoder
 from onlinejudge.service.atcoder import AtCoderContest, AtCoderProblem, AtCoderProblemDetailedData, AtCoderService, AtCoderSubmission
 from onlinejudge.type import TestCase
 
@@ -203,6 +210,94 @@ class AtCoderSubmissionTest(unittest.TestCase):
         self.assertEqual(AtCoderSubmission.from_url('https://qupc2014.contest.atcoder.jp/submissions/1444440').submission_id, 1444440)
 
 
+class AtCoderContestArchiveTest(unittest.TestCase):
+    def iterate_contest_ids(self, server, **kwargs):
+        session = requests.Session()
+        judge_server.install(session, server.address)
+        return [data.contest.contest_id for data in AtCoderService().iterate_contest_data(session=session, **kwargs)]
+
+    def test_iterate_contest_data(self):
+        with judge_server.JudgeServer(contests=120) as server:
+            contest_ids = self.iterate_contest_ids(server, jobs=2)
+            self.assertEqual(contest_ids, ['synth{:04d}'.format(index) for index in range(120, 0, -1)])
+            self.assertEqual(server.counter['atcoder.jp', '/contests/archive'], 3)
+
+    def test_since_and_until(self):
+        start_time = lambda index: (datetime.datetime(2020, 1, 1, 21, 0) + datetime.timedelta(days=index)).replace(tzinfo=datetime.timezone(datetime.timedelta(hours=9)))
+        with judge_server.JudgeServer(contests=120) as server:
+            contest_ids = self.iterate_contest_ids(server, since=start_time(80), until=start_time(100))
+            self.assertEqual(contest_ids, ['synth{:04d}'.format(index) for index in range(100, 79, -1)])
+            self.assertEqual(server.counter['atcoder.jp', '/contests/archive'], 1)  # the first page already reaches the bound
+
+
+class AtCoderIncrementalSubmissionsTest(unittest.TestCase):
+    def test_iterate_new_submission_data_where(self):
+        with judge_server.JudgeServer(contests=1, submissions=50) as server, tempfile.TemporaryDirectory() as tempdir:
+            session = requests.Session()
+            judge_server.install(session, server.address)
+            contest = AtCoderContest.from_url('https://atcoder.jp/contests/synth0001')
+            checkpoint_path = pathlib.Path(tempdir) / 'checkpoint.json'
+            crawl = lambda: [data.submission.submission_id % 1000000 for data in contest.iterate_new_submission_data_where(checkpoint_path=checkpoint_path, session=session)]
+
+            self.assertEqual(crawl(), list(range(49, -1, -1)))
+            self.assertEqual(server.counter['atcoder.jp', '/contests/synth0001/submissions'], 4)  # 3 pages and the empty page
+
+            # only new submissions are listed
+            server.submissions = 55
+            self.assertEqual(crawl(), list(range(54, 49, -1)))
+            self.assertEqual(crawl(), [])
+
+            # resume an interrupted crawl
+            server.submissions = 100
+            iterator = contest.iterate_new_submission_data_where(checkpoint_path=checkpoint_path, session=session)
+            listed = [next(iterator).submission.submission_id % 1000000 for _ in range(25)]
+            iterator.close()  # the first page and the first 5 submissions of the second page are recorded
+            listed += crawl()
+            self.assertEqual(listed, list(range(99, 54, -1)))
+
+            # stop with break
+            server.submissions = 130
+            listed = []
+            for data in contest.iterate_new_submission_data_where(checkpoint_path=checkpoint_path, session=session):
+                listed.append(data.submission.submission_id % 1000000)
+                if len(listed) == 3:
+                    break
+            listed += crawl()
+            self.assertEqual(listed, list(range(129, 99, -1)))
+
+
+class AtCoderLoginStateTest(unittest.TestCase):
+    def test_get_login_state(self):
+        self.assertEqual(atcoder._get_login_state({}), '')
+        self.assertEqual(atcoder._get_login_state({'REVEL_SESSION': 'c0ffee-%00csrf_token%3Afoo%00%00_TS%3A1600000000%00'}), '')
+        self.assertEqual(atcoder._get_login_state({'REVEL_SESSION': 'c0ffee-%00csrf_token%3Afoo%00%00UserScreenName%3Akimiyuki%00%00_TS%3A1600000001%00'}), 'kimiyuki')
+        self.assertIsNone(atcoder._get_login_state({'REVEL_SESSION': 'unknown'}))
+
+
+class AtCoderParseOnceTest(unittest.TestCase):
+    def test_alert_and_parser_share_the_tree(self):
+        resp = requests.Response()
+        resp._content = '<html><body><div role="alert">ログインしてください</div></body></html>'.encode()
+        resp.encoding = 'UTF-8'
+        with unittest.mock.patch.object(bs4, 'BeautifulSoup', wraps=bs4.BeautifulSoup) as mock:
+            self.assertEqual(atcoder._list_alert(resp), ['ログインしてください'])
+            soup = atcoder._get_soup(resp)
+            self.assertEqual(mock.call_count, 1)
+            self.assertIsNot(atcoder._get_soup(resp), soup)  # the tree is released after it is handed
+            self.assertEqual(mock.call_count, 2)
+
+    def test_download_data(self):
+        with judge_server.JudgeServer(contests=1, tasks=1) as server:
+            session = requests.Session()
+            judge_server.install(session, server.address)
+            problem = AtCoderProblem.from_url('https://atcoder.jp/contests/synth0001/tasks/synth0001_a')
+            with unittest.mock.patch.object(bs4, 'BeautifulSoup', wraps=bs4.BeautifulSoup) as mock:
+                data = problem.download_data(session=session)
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(data.name, 'Problem A')
+            self.assertEqual(len(data.sample_cases), 1)
+
+
 class AtCoderProblemDataTest(unittest.TestCase):
     def test_from_html_very_old(self):
         url = 'https://atcoder.jp/contests/utpc2011/tasks/utpc2011_1'
@@ -1,7 +1,13 @@
+import asyncio
+import threading
+import time
 import unittest
 
+import onlinejudge._implementation.async_utils as async_utils
+import onlinejudge.type
+import onlinejudge.utils
 from onlinejudge.dispatch import problem_from_url, service_from_url, submission_from_url
-from onlinejudge.type import Problem, Service, Submission
+from onlinejudge.type import Contest, Problem, Service, Submission
 
 
 class TypeTest(unittest.TestCase):
@@ -22,3 +28,121 @@ class TypeTest(unittest.TestCase):
     def test_submission_eq(self):
         self.assertEqual(submission_from_url('https://atcoder.jp/contests/abc143/submissions/8264863'), submission_from_url('https://atcoder.jp/contests/abc143/submissions/8264863'))
         self.assertNotEqual(submission_from_url('https://atcoder.jp/contests/abc143/submissions/8264863'), submission_from_url('https://atcoder.jp/contests/abc143/submissions/8264897'))
+
+
+class _DummyProblem(Problem):
+    def __init__(self, url):
+        self.url = url
+
+    def download_sample_cases(self, *, session=None):
+        return [onlinejudge.type.TestCase('sample-1', 'input', self.url.encode(), 'output', b'')]
+
+    def get_url(self):
+        return self.url
+
+    def get_service(self):
+        raise NotImplementedError
+
+    @classmethod
+    def from_url(cls, url):
+        return cls(url)
+
+
+class _DummyContest(Contest):
+    def iterate_submissions(self, *, session=None):
+        yield from ['a', 'b', 'c']
+
+    def get_url(self):
+        return 'https://example.com/contest'
+
+    def get_service(self):
+        raise NotImplementedError
+
+    @classmethod
+    def from_url(cls, url):
+        return cls()
+
+
+class _ClosingContest(_DummyContest):
+    closed_on = None  # type: threading.Thread
+
+    def iterate_submissions(self, *, session=None):
+        try:
+            yield from ['a', 'b', 'c']
+        finally:
+            type(self).closed_on = threading.current_thread()
+
+
+class AsyncTest(unittest.TestCase):
+    def test_download_sample_cases_async(self):
+        async def main():
+            problems = [_DummyProblem('https://example.com/{}'.format(i)) for i in range(100)]
+            return await asyncio.gather(*[problem.download_sample_cases_async() for problem in problems])
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(main())
+        finally:
+            loop.close()
+        self.assertEqual(len(results), 100)
+        self.assertEqual(results[3][0].input_data, b'https://example.com/3')
+
+    def test_iterate_submissions_async(self):
+        async def main():
+            return [submission async for submission in _DummyContest().iterate_submissions_async()]
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(main()), ['a', 'b', 'c'])
+        finally:
+            loop.close()
+
+    def test_close_iterator_on_thread_pool(self):
+        async def main():
+            iterator = _ClosingContest().iterate_submissions_async()
+            submission = await iterator.__anext__()
+            await iterator.aclose()
+            return submission
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(main()), 'a')
+        finally:
+            loop.close()
+        self.assertIsNotNone(_ClosingContest.closed_on)
+        self.assertIsNot(_ClosingContest.closed_on, threading.current_thread())  # not on the thread of the event loop
+
+    def test_max_workers(self):
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        class Problem(_DummyProblem):
+            def download_sample_cases(self, *, session=None):
+                nonlocal running, peak
+                with lock:
+                    running += 1
+                    peak = max(peak, running)
+                time.sleep(0.01)
+                with lock:
+                    running -= 1
+                return []
+
+        async def main():
+            return await asyncio.gather(*[Problem('https://example.com/{}'.format(i)).download_sample_cases_async() for i in range(20)])
+
+        onlinejudge.utils.set_async_max_workers(3)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(main())
+        finally:
+            loop.close()
+            onlinejudge.utils.set_async_max_workers(async_utils.default_max_workers)
+        self.assertEqual(peak, 3)
+
+    def test_not_implemented(self):
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertRaises(NotImplementedError, lambda: loop.run_until_complete(_DummyProblem('https://example.com/').download_system_cases_async()))
+        finally:
+            loop.close()
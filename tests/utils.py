@@ -1,3 +1,7 @@
+import http.server
+import socketserver
+import threading
+
 from onlinejudge_api.main import main
 
 import onlinejudge.dispatch as dispatch
@@ -13,3 +17,36 @@ def is_logged_in(url: str, *, memo={}) -> bool:
         result = main(['login-service', '--check', url], debug=True)
         memo[url] = bool((result.get('result') or {}).get('loggedIn'))
     return memo[url]
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class QuietHTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LocalHTTPServer:
+    """LocalHTTPServer runs an HTTP server on a random port of 127.0.0.1 in a background thread.
+
+    Use this as a context manager, or call `start()` in `setUp()` and `stop()` in `tearDown()`.
+    """
+    def __init__(self, handler: type):
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.base_url = 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def start(self) -> 'LocalHTTPServer':
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'LocalHTTPServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()